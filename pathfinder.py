@@ -1,17 +1,197 @@
+import hashlib
 import heapq
 import math
+import time
+from array import array
+
+# Intervalo (em expansões) entre as consultas ao relógio nas buscas com prazo
+DEADLINE_CHECK_INTERVAL = 256
+
+# Movimentos possíveis (reto, diagonal) e seus custos
+# (dr, dc, custo_movimento)
+SQRT2 = math.sqrt(2)
+MOVES = (
+    (-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1),  # Retos
+    (-1, -1, SQRT2), (-1, 1, SQRT2),  # Diagonais
+    (1, -1, SQRT2), (1, 1, SQRT2)
+)
+
+#-- Modelo de grid compacto --
+class Grid:
+    """
+    Labirinto compacto armazenado em arrays planos (índice = r * cols + c).
+
+    Substitui a lista de listas nas buscas: cada célula ocupa 1 byte na
+    máscara de passagem (`passable`) e 4 bytes no custo de terreno (`cost`,
+    float32), e 'S'/'E' ficam guardados à parte como coordenadas. Os custos
+    seguem as mesmas regras de `get_terrain_cost`; células com valor 1 ou com
+    custo infinito são obstáculos.
+
+    Atributos:
+        rows, cols (int): Dimensões do labirinto.
+        passable (bytearray): 1 se a célula pode ser visitada, 0 caso contrário.
+        cost (array('f')): Custo de terreno de cada célula.
+        start, end (tuple | None): Coordenadas de 'S' e 'E'.
+        connectivity (ConnectivityIndex | None): Índice de componentes
+            conexas ligado ao grid (ver `pathfinder_connectivity`).
+        version (int): Contador incrementado a cada `set_cell`; caches
+            derivadas do grid comparam com ele para saber se estão velhas.
+    """
+
+    __slots__ = ("rows", "cols", "passable", "cost", "start", "end", "connectivity",
+                 "version")
+
+    def __init__(self, rows, cols, passable=None, cost=None, start=None, end=None):
+        size = rows * cols
+        self.rows = rows
+        self.cols = cols
+        self.passable = passable if passable is not None else bytearray(b"\x01") * size
+        self.cost = cost if cost is not None else array("f", [1.0]) * size
+        self.start = start
+        self.end = end
+        self.connectivity = None
+        self.version = 0
+
+    @classmethod
+    def from_maze(cls, maze):
+        """
+        Converte um labirinto no formato de lista de listas para um Grid.
+
+        Argumentos:
+            maze (list[list]): A matriz 2D do labirinto ('S', 'E', 0, 1, 5...).
+
+        Retorna:
+            Grid: O labirinto compacto equivalente.
+        """
+        rows = len(maze)
+        cols = len(maze[0]) if rows else 0
+        grid = cls(rows, cols)
+        passable = grid.passable
+        cost = grid.cost
+        idx = 0
+        for r, row in enumerate(maze):
+            for c, cell in enumerate(row):
+                if cell == 'S':
+                    grid.start = (r, c)
+                elif cell == 'E':
+                    grid.end = (r, c)
+                terrain = get_terrain_cost(cell)
+                if cell == 1 or terrain == float('inf'):
+                    passable[idx] = 0
+                    cost[idx] = float('inf')
+                elif terrain != 1:
+                    cost[idx] = terrain
+                idx += 1
+        return grid
+
+    def index(self, r, c):
+        """Retorna o índice plano da célula (r, c)."""
+        return r * self.cols + c
+
+    def coords(self, idx):
+        """Retorna as coordenadas (linha, coluna) de um índice plano."""
+        return divmod(idx, self.cols)
+
+    def in_bounds(self, r, c):
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_passable(self, r, c):
+        return self.in_bounds(r, c) and self.passable[r * self.cols + c] == 1
+
+    def terrain_cost(self, r, c):
+        """Custo de entrar na célula (r, c), como em `get_terrain_cost`."""
+        return self.cost[r * self.cols + c]
+
+    def cell_value(self, r, c):
+        """
+        Reconstrói o valor da célula no formato original ('S', 'E', 0, 1, 5...).
+        """
+        if (r, c) == self.start:
+            return 'S'
+        if (r, c) == self.end:
+            return 'E'
+        idx = r * self.cols + c
+        if not self.passable[idx]:
+            return 1
+        terrain = self.cost[idx]
+        if terrain == 1:
+            return 0
+        return int(terrain) if terrain == int(terrain) else terrain
+
+    def to_maze(self):
+        """Converte o Grid de volta para uma lista de listas."""
+        return [[self.cell_value(r, c) for c in range(self.cols)]
+                for r in range(self.rows)]
+
+    def set_cell(self, r, c, value):
+        """
+        Altera a célula (r, c) usando os valores do formato original
+        ('S', 'E', 0, 1, 5...). Sobrescrever 'S' ou 'E' remove o ponto.
+        """
+        idx = r * self.cols + c
+        if (r, c) == self.start:
+            self.start = None
+        if (r, c) == self.end:
+            self.end = None
+        if value == 'S':
+            self.start = (r, c)
+        elif value == 'E':
+            self.end = (r, c)
+
+        was_passable = self.passable[idx]
+        terrain = get_terrain_cost(value)
+        if value == 1 or terrain == float('inf'):
+            self.passable[idx] = 0
+            self.cost[idx] = float('inf')
+        else:
+            self.passable[idx] = 1
+            self.cost[idx] = terrain
+
+        self.version += 1
+        if self.connectivity is not None and was_passable != self.passable[idx]:
+            self.connectivity.cell_changed(r, c)
+
+    def content_hash(self):
+        """
+        Hash (hex) das dimensões, da máscara de passagem e dos custos.
+        'S' e 'E' não entram no hash, pois não alteram o terreno.
+        """
+        digest = hashlib.sha1()
+        digest.update(f"{self.rows}x{self.cols}".encode())
+        digest.update(self.passable)
+        digest.update(self.cost.tobytes())
+        return digest.hexdigest()
+
+    def neighbors(self, node):
+        """
+        Vizinhos válidos (8 direções) de `node`, no mesmo formato de
+        `get_neighbors`: lista de ((linha, coluna), custo_movimento).
+        """
+        (r, c) = node
+        rows = self.rows
+        cols = self.cols
+        passable = self.passable
+        neighbors = []
+        for dr, dc, move_cost in MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and passable[nr * cols + nc]:
+                neighbors.append(((nr, nc), move_cost))
+        return neighbors
 
 def find_start_and_end(maze):
     """
     Encontra as coordenadas (linha, coluna) dos pontos de início 'S' e fim 'E'.
     
     Argumentos:
-        maze (list[list]): A matriz 2D do labirinto.
+        maze (list[list] | Grid): A matriz 2D do labirinto.
 
     Retorna:
         tuple: (start, end) onde start e end são tuplas (linha, coluna)
                Retorna (None, None) se 'S' ou 'E' não forem encontrados.
     """
+    if isinstance(maze, Grid):
+        return maze.start, maze.end
+
     start = None
     end = None
     
@@ -58,20 +238,15 @@ def get_neighbors(maze, node):
         list: Uma lista de tuplas (vizinho, custo_movimento)
               onde vizinho é (linha, coluna) e custo_movimento é 1 ou sqrt(2).
     """
+    if isinstance(maze, Grid):
+        return maze.neighbors(node)
+
     neighbors = []
     (r, c) = node
     num_rows = len(maze)
     num_cols = len(maze[0])
     
-    # Movimentos possíveis (reto, diagonal) e seus custos
-    # (dr, dc, custo_movimento)
-    moves = [
-        (-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1),  # Retos
-        (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)),  # Diagonais
-        (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2))
-    ]
-    
-    for dr, dc, move_cost in moves:
+    for dr, dc, move_cost in MOVES:
         nr, nc = r + dr, c + dc
         
         if 0 <= nr < num_rows and 0 <= nc < num_cols:
@@ -94,50 +269,491 @@ def get_terrain_cost(cell_value):
 
 
 
-def a_star_search(maze, start, end):
+#-- Estatísticas de busca --
+class SearchStats:
     """
-    Executa o algoritmo A* para encontrar o menor caminho.
+    Contadores e tempos de uma busca, preenchidos pelo `SearchEngine`.
+
+    Atributos:
+        expansions (int): Nós retirados da heap e expandidos.
+        pushes (int): Entradas inseridas na heap.
+        stale_pops (int): Entradas obsoletas descartadas ao sair da heap.
+        relaxations (int): Arestas examinadas (vizinhos transitáveis).
+        max_open_set (int): Maior tamanho da heap (com entradas obsoletas).
+        reset_time (float): Segundos gastos reiniciando o estado.
+        search_time (float): Segundos gastos no laço principal.
+        path_time (float): Segundos gastos reconstruindo o caminho.
+    """
+
+    __slots__ = ("expansions", "pushes", "stale_pops", "relaxations", "max_open_set",
+                 "reset_time", "search_time", "path_time")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.expansions = 0
+        self.pushes = 0
+        self.stale_pops = 0
+        self.relaxations = 0
+        self.max_open_set = 0
+        self.reset_time = 0.0
+        self.search_time = 0.0
+        self.path_time = 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SearchStats({fields})"
+
+class SparseArray(dict):
+    """
+    Substituto esparso de um array indexado por célula: dicionário
+    índice -> valor que devolve `default` para os índices ausentes. Usado no
+    estado das buscas sobre grids enormes (`Grid.sparse`), em que alocar um
+    valor por célula não cabe na memória.
+    """
+
+    __slots__ = ("default",)
+
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, idx):
+        return self.default
+
+#-- Motor de busca com estado em arrays planos --
+class SearchEngine:
+    """
+    Motor A* reutilizável sobre um `Grid`.
+
+    O estado da busca (g_score, came_from e o conjunto fechado) fica em arrays
+    pré-alocados indexados por r * cols + c, em vez de dicionários com tuplas.
+    A fila de prioridade usa remoção preguiçosa: uma melhora de g_score insere
+    uma nova entrada na heap e a entrada antiga, ao sair, é descartada pelo
+    conjunto fechado. Entre buscas só as células tocadas são reiniciadas.
+
+    A busca pode ser feita de uma vez (`search`) ou em etapas (`begin` e
+    depois `run(max_expansions=...)` quantas vezes for preciso), que é o que
+    a visualização usa para desenhar a exploração passo a passo.
+
+    Argumentos:
+        grid (Grid): O labirinto.
+        stats (SearchStats | None): Objeto a ser preenchido a cada busca
+                                    (por padrão, um novo).
+
+    Os contadores da última busca ficam em `stats` e também como
+    `expansions`, `pushes` e `stale_pops`.
     """
-    open_set = []
-    heapq.heappush(open_set, (0, start)) # (f_score, nó)
-    
-    came_from = {start: None}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, end)}
-    
-    open_set_hash = {start}
 
+    def __init__(self, grid, stats=None):
+        size = grid.rows * grid.cols
+        self.grid = grid
+        self.stats = stats if stats is not None else SearchStats()
+        if getattr(grid, "sparse", False):
+            # Mundo em blocos (ver `pathfinder_tiles`): estado só das células tocadas
+            self.g_score = SparseArray(float('inf'))
+            self.came_from = SparseArray(-1)
+            self.closed = SparseArray(0)
+        else:
+            self.g_score = array("d", [float('inf')]) * size
+            self.came_from = array("i", [-1]) * size
+            self.closed = bytearray(size)
+        self._touched = []
+        self.goal = -1
+        self.open_set = []
+        self.inconsistent = []
+        self._start = -1
+        self._end = None
+        self._h = None
+        self._weight = 1.0
+        self._on_expand = None
+        self._on_push = None
+        cols = grid.cols
+        self._moves = tuple((dr, dc, dr * cols + dc, move_cost)
+                            for dr, dc, move_cost in MOVES)
+
+    @property
+    def expansions(self):
+        return self.stats.expansions
+
+    @property
+    def pushes(self):
+        return self.stats.pushes
+
+    @property
+    def stale_pops(self):
+        return self.stats.stale_pops
+
+    def _reset(self):
+        """Reinicia apenas as células tocadas pela busca anterior."""
+        t0 = time.perf_counter()
+        g_score = self.g_score
+        came_from = self.came_from
+        closed = self.closed
+        inf = float('inf')
+        if isinstance(g_score, SparseArray):
+            g_score.clear()
+            came_from.clear()
+            closed.clear()
+        else:
+            for idx in self._touched:
+                g_score[idx] = inf
+                came_from[idx] = -1
+                closed[idx] = 0
+        self._touched = []
+        self.goal = -1
+        self.open_set = []
+        self.inconsistent = []
+        self.stats.reset()
+        self.stats.reset_time = time.perf_counter() - t0
+
+    def begin(self, start, end, h=None, on_expand=None, on_push=None, weight=1.0):
+        """
+        Prepara uma busca de `start` até `end` sem expandir nenhum nó.
+
+        Argumentos:
+            h (callable | None): Heurística alternativa h(índice) -> estimativa
+                                 até `end` (ex.: `LandmarkHeuristic.for_goal`).
+                                 Por padrão usa a distância octile.
+            weight (float): Fator epsilon >= 1 aplicado à heurística (A*
+                            ponderado): o caminho custa no máximo `weight`
+                            vezes o ótimo, em troca de menos expansões. Com
+                            peso, nós fechados não são reabertos; os que
+                            melhoram depois de fechados ficam em
+                            `inconsistent`.
+            on_expand (callable | None): Chamado como on_expand(índice, g) a
+                                         cada nó expandido.
+            on_push (callable | None): Chamado como on_push(índice, g, f) a
+                                       cada entrada inserida na heap.
+
+        Sem ganchos, o laço só paga um teste de None por expansão e por
+        inserção; nenhuma chamada de função extra é feita.
+        """
+        self._reset()
+        self._end = None
+        grid = self.grid
+        if grid.connectivity is not None and not grid.connectivity.connected(start, end):
+            # Componentes diferentes: sem solução, sem explorar nada
+            return
+        cols = grid.cols
+        start_idx = start[0] * cols + start[1]
+        self._start = start_idx
+        self._end = (end[0], end[1])
+        self._h = h
+        self._weight = weight
+        self._on_expand = on_expand
+        self._on_push = on_push
+        self.g_score[start_idx] = 0
+        self._touched.append(start_idx)
+        f_score = weight * (heuristic(start, end) if h is None else h(start_idx))
+        self.open_set = [(f_score, start_idx)]
+        self.stats.pushes = 1
+        if on_push is not None:
+            on_push(start_idx, 0.0, f_score)
+
+    def run(self, max_expansions=None, deadline=None):
+        """
+        Continua a busca preparada por `begin`.
+
+        Argumentos:
+            max_expansions (int | None): Pausa depois de expandir esta
+                                         quantidade de nós nesta chamada.
+            deadline (float | None): Pausa ao passar deste instante de
+                                     `time.perf_counter()` (verificado a cada
+                                     DEADLINE_CHECK_INTERVAL expansões).
+
+        Retorna:
+            bool | None: True se o objetivo foi alcançado, False se não há
+                         caminho e None se a busca foi pausada. Pausada, a
+                         busca continua de onde parou na próxima chamada;
+                         `best_node()` e `frontier()` mostram o progresso.
+        """
+        if self.goal != -1:
+            return True
+        if self._end is None:
+            return False
+        t0 = time.perf_counter()
+        grid = self.grid
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        cost = grid.cost
+        g_score = self.g_score
+        came_from = self.came_from
+        closed = self.closed
+        touched = self._touched
+        moves = self._moves
+        open_set = self.open_set
+        h = self._h
+        weight = self._weight
+        inconsistent = self.inconsistent
+        on_expand = self._on_expand
+        on_push = self._on_push
+        stats = self.stats
+        last_r = rows - 1
+        last_c = cols - 1
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        (er, ec) = self._end
+        start_idx = self._start
+        end_idx = er * cols + ec
+
+        pushes = stats.pushes
+        expansions = stats.expansions
+        stale_pops = stats.stale_pops
+        relaxations = stats.relaxations
+        max_open_set = stats.max_open_set
+        stop_at = -1 if max_expansions is None else expansions + max_expansions
+        limit = stop_at
+        if deadline is not None and (stop_at == -1 or stop_at > expansions + DEADLINE_CHECK_INTERVAL):
+            limit = expansions + DEADLINE_CHECK_INTERVAL
+        result = False
+
+        while open_set:
+            if expansions == limit:
+                # Um único teste por nó cobre os dois limites: o relógio só é
+                # consultado a cada DEADLINE_CHECK_INTERVAL expansões
+                if limit == stop_at or time.perf_counter() >= deadline:
+                    result = None
+                    break
+                limit = expansions + DEADLINE_CHECK_INTERVAL
+                if stop_at != -1 and stop_at < limit:
+                    limit = stop_at
+            if len(open_set) > max_open_set:
+                max_open_set = len(open_set)
+            current = heappop(open_set)[1]
+            if closed[current]:
+                # Entrada obsoleta: o nó já saiu com um g_score melhor
+                stale_pops += 1
+                continue
+            closed[current] = 1
+            expansions += 1
+            current_g = g_score[current]
+            if on_expand is not None:
+                on_expand(current, current_g)
+
+            if current == end_idx:
+                self.goal = current
+                result = True
+                break
+
+            r, c = divmod(current, cols)
+            interior = 0 < r < last_r and 0 < c < last_c
+            for dr, dc, offset, move_cost in moves:
+                nr = r + dr
+                nc = c + dc
+                if not interior and not (0 <= nr < rows and 0 <= nc < cols):
+                    continue
+                neighbor = current + offset
+                if not passable[neighbor]:
+                    continue
+                relaxations += 1
+
+                tentative_g_score = current_g + move_cost * cost[neighbor]
+                if tentative_g_score < g_score[neighbor]:
+                    if came_from[neighbor] == -1 and neighbor != start_idx:
+                        touched.append(neighbor)
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    if closed[neighbor]:
+                        if weight != 1.0:
+                            # O A* ponderado não reabre nós: o custo melhor fica
+                            # registrado e o nó entra no cálculo do limite
+                            inconsistent.append(neighbor)
+                            continue
+                        # Com heurística consistente isto não reabre nós fechados,
+                        # mas custos de terreno < 1 podem exigir reabertura
+                        closed[neighbor] = 0
+
+                    if h is not None:
+                        estimate = h(neighbor)
+                    else:
+                        dr = nr - er if nr > er else er - nr
+                        dc = nc - ec if nc > ec else ec - nc
+                        if dr > dc:
+                            estimate = (dr - dc) + SQRT2 * dc
+                        else:
+                            estimate = (dc - dr) + SQRT2 * dr
+                    f_score = tentative_g_score + weight * estimate
+                    heappush(open_set, (f_score, neighbor))
+                    pushes += 1
+                    if on_push is not None:
+                        on_push(neighbor, tentative_g_score, f_score)
+
+        stats.expansions = expansions
+        stats.pushes = pushes
+        stats.stale_pops = stale_pops
+        stats.relaxations = relaxations
+        stats.max_open_set = max_open_set
+        stats.search_time += time.perf_counter() - t0
+        return result
+
+    def best_node(self):
+        """
+        Nó já expandido mais próximo do objetivo pela distância octile (em
+        empate, o de menor g_score), ou None. Numa busca pausada, `path(nó)`
+        dá o caminho parcial até ele.
+        """
+        if self._end is None:
+            return None
+        cols = self.grid.cols
+        closed = self.closed
+        g_score = self.g_score
+        end = self._end
+        best = None
+        best_key = None
+        for idx in self._touched:
+            if closed[idx]:
+                node = divmod(idx, cols)
+                key = (heuristic(node, end), g_score[idx])
+                if best_key is None or key < best_key:
+                    best = node
+                    best_key = key
+        return best
+
+    def frontier(self):
+        """Nós [(linha, coluna), ...] no conjunto aberto da busca atual."""
+        cols = self.grid.cols
+        closed = self.closed
+        return [divmod(idx, cols) for idx in dict.fromkeys(idx for _, idx in self.open_set)
+                if not closed[idx]]
+
+    def search(self, start, end, h=None, on_expand=None, on_push=None, weight=1.0):
+        """
+        Executa o A* de `start` até `end` de uma vez (`begin` + `run`).
+
+        Retorna:
+            bool: True se `end` foi alcançado. O caminho fica disponível
+                  em `path()` / `came_from_dict()` e os números em `stats`.
+        """
+        self.begin(start, end, h, on_expand, on_push, weight)
+        return self.run()
+
+    def path(self, node=None):
+        """
+        Caminho [(linha, coluna), ...] do início até `node` (por padrão, o
+        objetivo da última busca). Retorna [] se não houver caminho.
+        """
+        idx = self.goal if node is None else node[0] * self.grid.cols + node[1]
+        if idx == -1:
+            return []
+        t0 = time.perf_counter()
+        cols = self.grid.cols
+        came_from = self.came_from
+        path = []
+        while idx != -1:
+            path.append(divmod(idx, cols))
+            idx = came_from[idx]
+        path.reverse()
+        self.stats.path_time = time.perf_counter() - t0
+        return path
+
+    def came_from_dict(self):
+        """
+        Cadeia {nó: nó_anterior} do caminho encontrado, no formato esperado
+        por `reconstruct_path`. Retorna None se não houver caminho.
+        """
+        path = self.path()
+        if not path:
+            return None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from
+
+def distance_field(grid, source, reverse=False):
+    """
+    Dijkstra completo a partir de `source` sobre um `Grid`.
+
+    Argumentos:
+        grid (Grid): O labirinto.
+        source (tuple): Célula de origem (linha, coluna).
+        reverse (bool): Se True, calcula o custo de cada célula ATÉ `source`
+                        (o custo de terreno é cobrado ao entrar na célula).
+
+    Retorna:
+        tuple: (dist, parent) em arrays planos. `dist` é inf nas células
+               inalcançáveis; `parent` é o próximo índice no caminho de volta
+               à origem (-1 na origem e nas inalcançáveis).
+    """
+    rows = grid.rows
+    cols = grid.cols
+    passable = grid.passable
+    cost = grid.cost
+    size = rows * cols
+    dist = array("d", [float('inf')]) * size
+    parent = array("i", [-1]) * size
+    source_idx = source[0] * cols + source[1]
+    if not passable[source_idx]:
+        return dist, parent
+
+    dist[source_idx] = 0.0
+    open_set = [(0.0, source_idx)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
     while open_set:
-        current = heapq.heappop(open_set)[1]
-        open_set_hash.remove(current)
-        
-        if current == end:
-            # Caminho encontrado! Retorna os dados para reconstrução
-            return came_from, current 
+        d, current = heappop(open_set)
+        if d > dist[current]:
+            continue
+        r, c = divmod(current, cols)
+        for dr, dc, move_cost in MOVES:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols):
+                continue
+            neighbor = nr * cols + nc
+            if not passable[neighbor]:
+                continue
+            nd = d + move_cost * (cost[current] if reverse else cost[neighbor])
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                parent[neighbor] = current
+                heappush(open_set, (nd, neighbor))
+    return dist, parent
 
-        # iteramos sobre vizinhos E o custo do movimento
-        for neighbor, move_cost in get_neighbors(maze, current):
-            
-            # Pega o custo do terreno do vizinho
-            terrain_cost = get_terrain_cost(maze[neighbor[0]][neighbor[1]])
-            
-            # O custo total do passo é o custo do movimento * peso do terreno
-            # (Se o terreno for 5 e o movimento for diagonal, o custo é 5 * sqrt(2))
-            step_cost = move_cost * terrain_cost
-            
-            tentative_g_score = g_score[current] + step_cost
-            
-            if tentative_g_score < g_score.get(neighbor, float('inf')):
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, end)
-                
-                if neighbor not in open_set_hash:
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-                    open_set_hash.add(neighbor)
+def a_star_search(maze, start, end, stats=None):
+    """
+    Executa o algoritmo A* para encontrar o menor caminho.
+    Aceita tanto a lista de listas quanto um `Grid` (listas são convertidas;
+    para muitas consultas no mesmo labirinto, reutilize um `SearchEngine`).
 
-    # Sem solução
-    return None, None
+    Argumentos:
+        stats (SearchStats | None): Se informado, recebe os contadores e os
+                                    tempos da busca.
+
+    Retorna:
+        tuple: (came_from, end) para `reconstruct_path`, ou (None, None)
+               se não houver solução.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = SearchEngine(grid, stats)
+    if not engine.search(start, end):
+        # Sem solução
+        return None, None
+    return engine.came_from_dict(), tuple(end)
+
+def path_cost(maze, path):
+    """
+    Custo total de um caminho célula a célula: para cada passo, custo do
+    movimento (1 ou sqrt(2)) vezes o custo de terreno da célula de chegada.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        path (list): A lista de coordenadas [(linha, coluna), ...].
+    """
+    total = 0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        move_cost = SQRT2 if r1 != r2 and c1 != c2 else 1
+        if isinstance(maze, Grid):
+            terrain_cost = maze.terrain_cost(r2, c2)
+        else:
+            terrain_cost = get_terrain_cost(maze[r2][c2])
+        total += move_cost * terrain_cost
+    return total
 
 # Exibição dos resultados
 def reconstruct_path(came_from, current):
@@ -166,13 +782,15 @@ def display_maze_with_path(maze, path, start, end):
     Exibe o labirinto com o caminho destacado ('*').
     
     Argumentos:
-        maze (list[list]): O labirinto original.
+        maze (list[list] | Grid): O labirinto original.
         path (list): A lista de coordenadas do caminho.
         start (tuple): Coordenadas de 'S'.
         end (tuple): Coordenadas de 'E'.
     """
     # Cria uma cópia do labirinto para não modificar o original
     # Converte tudo para string para facilitar a impressão
+    if isinstance(maze, Grid):
+        maze = maze.to_maze()
     display_maze = [list(map(str, row)) for row in maze]
     
     # Itera pelo caminho e marca com '*'
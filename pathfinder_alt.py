@@ -0,0 +1,174 @@
+import pickle
+import random
+from array import array
+
+from pathfinder import Grid, SearchEngine, SQRT2, distance_field
+
+#-- Heurística ALT (A*, Landmarks, desigualdade Triangular) --
+# A distância octile ignora o custo do terreno. Com K pontos de referência
+# (landmarks) e as distâncias exatas de e até cada um deles, a desigualdade
+# triangular dá limites inferiores que já incluem o terreno:
+#     d(v, t) >= d(L, t) - d(L, v)      e      d(v, t) >= d(v, L) - d(t, L)
+# Como o custo é cobrado ao entrar na célula, d(L, v) != d(v, L) e as duas
+# tabelas são guardadas. O resultado é combinado com a octile via max().
+
+FORMAT_VERSION = 1
+
+# As tabelas são float32; cada limite é reduzido por esta fração dos valores
+# envolvidos para cobrir o arredondamento e manter a heurística admissível
+FLOAT32_TOLERANCE = 1.2e-7
+
+class LandmarkHeuristic:
+    """
+    Tabelas de distância para a heurística ALT sobre um `Grid`.
+
+    Atributos:
+        landmarks (list): Índices planos dos landmarks.
+        from_landmark (list[array('f')]): d(L, v) para cada landmark.
+        to_landmark (list[array('f')]): d(v, L) para cada landmark.
+    """
+
+    def __init__(self, grid, k=8, seed=0, build=True):
+        self.grid = grid
+        self.landmarks = []
+        self.from_landmark = []
+        self.to_landmark = []
+        if build:
+            self.build(k, seed)
+
+    def build(self, k=8, seed=0):
+        """
+        Escolhe `k` landmarks por seleção do mais distante (cada novo landmark
+        é a célula alcançável mais longe dos já escolhidos) e calcula as tabelas.
+        """
+        grid = self.grid
+        cols = grid.cols
+        passable = grid.passable
+        free = [idx for idx in range(grid.rows * cols) if passable[idx]]
+        self.landmarks = []
+        self.from_landmark = []
+        self.to_landmark = []
+        if not free:
+            return
+
+        rng = random.Random(seed)
+        nearest = None
+        candidate = rng.choice(free)
+        for _ in range(min(k, len(free))):
+            node = divmod(candidate, cols)
+            dist_from, _ = distance_field(grid, node)
+            dist_to, _ = distance_field(grid, node, reverse=True)
+            self.landmarks.append(candidate)
+            self.from_landmark.append(array("f", dist_from))
+            self.to_landmark.append(array("f", dist_to))
+
+            # Distância de cada célula ao landmark mais próximo; as
+            # inalcançáveis contam como as mais distantes
+            if nearest is None:
+                nearest = array("d", dist_from)
+            else:
+                for idx in free:
+                    if dist_from[idx] < nearest[idx]:
+                        nearest[idx] = dist_from[idx]
+            candidate = max(free, key=nearest.__getitem__)
+            if candidate in self.landmarks:
+                break
+
+    def for_goal(self, end):
+        """
+        Heurística h(índice) para o objetivo `end`, pronta para
+        `SearchEngine.search(start, end, h=...)`.
+        """
+        cols = self.grid.cols
+        (er, ec) = end
+        goal = er * cols + ec
+        inf = float('inf')
+        tables = []
+        for from_l, to_l in zip(self.from_landmark, self.to_landmark):
+            # Só entram os landmarks que alcançam o objetivo nos dois sentidos
+            if from_l[goal] != inf and to_l[goal] != inf:
+                tables.append((from_l, from_l[goal], to_l, to_l[goal]))
+
+        def h(idx):
+            r, c = divmod(idx, cols)
+            dr = r - er if r > er else er - r
+            dc = c - ec if c > ec else ec - c
+            if dr > dc:
+                best = (dr - dc) + SQRT2 * dc
+            else:
+                best = (dc - dr) + SQRT2 * dr
+            for from_l, from_goal, to_l, to_goal in tables:
+                from_v = from_l[idx]
+                to_v = to_l[idx]
+                if from_v != inf:
+                    bound = from_goal - from_v - FLOAT32_TOLERANCE * (from_goal + from_v)
+                    if bound > best:
+                        best = bound
+                if to_v != inf:
+                    bound = to_v - to_goal - FLOAT32_TOLERANCE * (to_v + to_goal)
+                    if bound > best:
+                        best = bound
+            return best
+
+        return h
+
+    def save(self, filename):
+        """Grava as tabelas em disco junto com o hash do grid."""
+        data = {
+            "version": FORMAT_VERSION,
+            "content_hash": self.grid.content_hash(),
+            "landmarks": self.landmarks,
+            "from_landmark": self.from_landmark,
+            "to_landmark": self.to_landmark,
+        }
+        with open(filename, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename, grid):
+        """
+        Carrega tabelas gravadas por `save` para o mesmo `grid`.
+        Só carregue arquivos de origem confiável (o formato é pickle).
+
+        Levanta:
+            ValueError: Se o arquivo for de outra versão ou de outro grid.
+        """
+        with open(filename, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Versão de arquivo ALT não suportada: {data.get('version')}")
+        if data["content_hash"] != grid.content_hash():
+            raise ValueError("O arquivo ALT foi gerado para outro labirinto.")
+        heuristic = cls(grid, build=False)
+        heuristic.landmarks = data["landmarks"]
+        heuristic.from_landmark = data["from_landmark"]
+        heuristic.to_landmark = data["to_landmark"]
+        return heuristic
+
+def alt_search(maze, start, end, landmarks):
+    """
+    A* com a heurística ALT. Mesmo retorno de `a_star_search`:
+    (came_from, end) ou (None, None).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = SearchEngine(grid)
+    if not engine.search(start, end, h=landmarks.for_goal(end)):
+        return None, None
+    return engine.came_from_dict(), tuple(end)
+
+def compare_expansions(engine, landmarks, start, end):
+    """
+    Executa a mesma consulta com a octile e com a ALT.
+
+    Retorna:
+        dict: Expansões de cada uma e a redução relativa obtida pela ALT.
+    """
+    engine.search(start, end)
+    octile = engine.expansions
+    engine.search(start, end, h=landmarks.for_goal(end))
+    alt = engine.expansions
+    return {
+        "octile_expansions": octile,
+        "alt_expansions": alt,
+        "reduction": 1 - alt / octile if octile else 0.0,
+    }
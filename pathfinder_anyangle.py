@@ -0,0 +1,359 @@
+import heapq
+import math
+from array import array
+
+from pathfinder import Grid, MOVES, SQRT2, SparseArray
+
+#-- Caminhos em qualquer ângulo (Theta* / Lazy Theta*) --
+# O caminho deixa de seguir a grade: cada nó pode ter como pai qualquer nó
+# anterior visível em linha reta, e o resultado é uma lista curta de pontos
+# de virada ligados por segmentos retos entre centros de células.
+#
+# Linha de visão: o segmento de a até b percorre as células que cruza (se
+# passar exatamente por um canto, vai direto à célula diagonal, como o
+# movimento diagonal da grade). Todas precisam ser transitáveis.
+#
+# Custo de um segmento: comprimento euclidiano vezes o MAIOR custo de terreno
+# entre as células cruzadas (sem contar a de partida). Para um movimento
+# entre vizinhos isso é exatamente o custo da grade (movimento vezes terreno
+# da célula de chegada), e em terreno uniforme é o comprimento da reta.
+#
+# `CompactPath` guarda um caminho como os índices planos dos pontos de virada
+# num array int32, e só reconstrói as células quando elas são percorridas.
+
+def line_cells(a, b):
+    """
+    Gera as células (linha, coluna) cruzadas pelo segmento do centro de `a`
+    ao centro de `b`, sem incluir `a`.
+    """
+    r, c = a
+    r1, c1 = b
+    dr = r1 - r
+    dc = c1 - c
+    step_r = (dr > 0) - (dr < 0)
+    step_c = (dc > 0) - (dc < 0)
+    abs_r = abs(dr)
+    abs_c = abs(dc)
+    moved_r = 0
+    moved_c = 0
+    while moved_r < abs_r or moved_c < abs_c:
+        # Compara onde a reta cruza a próxima linha vertical e a próxima
+        # horizontal da grade (frações multiplicadas em cruz, só inteiros)
+        decision = (1 + 2 * moved_c) * abs_r - (1 + 2 * moved_r) * abs_c
+        if decision == 0:
+            r += step_r
+            c += step_c
+            moved_r += 1
+            moved_c += 1
+        elif decision < 0:
+            c += step_c
+            moved_c += 1
+        else:
+            r += step_r
+            moved_r += 1
+        yield r, c
+
+def line_cost(grid, a, b):
+    """
+    Custo do segmento reto de `a` até `b` (inf se não houver linha de visão).
+    """
+    cols = grid.cols
+    passable = grid.passable
+    cost = grid.cost
+    worst = 0.0
+    for r, c in line_cells(a, b):
+        idx = r * cols + c
+        if not passable[idx]:
+            return float('inf')
+        if cost[idx] > worst:
+            worst = cost[idx]
+    return worst * math.hypot(b[0] - a[0], b[1] - a[1])
+
+class AnyAngleEngine:
+    """
+    Theta* (ou Lazy Theta*, com `lazy=True`) reutilizável sobre um `Grid`.
+
+    Depois de `search`, `path()` traz os pontos de virada, `cost` o custo
+    total (soma de `line_cost` dos segmentos) e `expansions` / `line_checks`
+    os contadores. O Lazy Theta* supõe linha de visão ao gerar um vizinho e
+    só a verifica ao expandi-lo, o que faz bem menos verificações.
+    """
+
+    def __init__(self, grid, lazy=True):
+        size = grid.rows * grid.cols
+        self.grid = grid
+        self.lazy = lazy
+        if getattr(grid, "sparse", False):
+            # Mundo em blocos (ver `pathfinder_tiles`): estado só das células tocadas
+            self.g_score = SparseArray(float('inf'))
+            self.came_from = SparseArray(-1)
+            self.closed = SparseArray(0)
+        else:
+            self.g_score = array("d", [float('inf')]) * size
+            self.came_from = array("i", [-1]) * size
+            self.closed = bytearray(size)
+        self._touched = []
+        self.goal = -1
+        self.cost = float('inf')
+        self.expansions = 0
+        self.line_checks = 0
+
+    def _reset(self):
+        inf = float('inf')
+        if isinstance(self.g_score, SparseArray):
+            self.g_score.clear()
+            self.came_from.clear()
+            self.closed.clear()
+        else:
+            for idx in self._touched:
+                self.g_score[idx] = inf
+                self.came_from[idx] = -1
+                self.closed[idx] = 0
+        self._touched = []
+        self.goal = -1
+        self.cost = float('inf')
+        self.expansions = 0
+        self.line_checks = 0
+
+    def _line_cost(self, a_idx, b_idx):
+        self.line_checks += 1
+        cols = self.grid.cols
+        return line_cost(self.grid, divmod(a_idx, cols), divmod(b_idx, cols))
+
+    def _neighbors(self, idx):
+        """Vizinhos transitáveis (índice, custo do passo) de `idx`."""
+        grid = self.grid
+        cols = grid.cols
+        r, c = divmod(idx, cols)
+        for dr, dc, move_cost in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < grid.rows and 0 <= nc < cols:
+                neighbor = nr * cols + nc
+                if grid.passable[neighbor]:
+                    yield neighbor, move_cost * grid.cost[neighbor]
+
+    def _set_vertex(self, idx):
+        """
+        Lazy Theta*: confirma o pai suposto de `idx` ao expandi-lo; se não
+        houver linha de visão (ou o custo real for maior), escolhe o melhor
+        vizinho já fechado.
+        """
+        g_score = self.g_score
+        parent = self.came_from[idx]
+        if parent == -1:
+            return
+        cols = self.grid.cols
+        terrain = self.grid.cost[idx]
+        r, c = divmod(idx, cols)
+        best = g_score[parent] + self._line_cost(parent, idx)
+        best_parent = parent
+        for neighbor, _ in self._neighbors(idx):
+            if self.closed[neighbor]:
+                # O passo neighbor -> idx paga o terreno de idx
+                nr, nc = divmod(neighbor, cols)
+                step = (SQRT2 if r != nr and c != nc else 1) * terrain
+                if g_score[neighbor] + step < best:
+                    best = g_score[neighbor] + step
+                    best_parent = neighbor
+        g_score[idx] = best
+        self.came_from[idx] = best_parent
+
+    def search(self, start, end):
+        """
+        Executa o Theta* de `start` até `end`.
+
+        Retorna:
+            bool: True se `end` foi alcançado.
+        """
+        self._reset()
+        grid = self.grid
+        if grid.connectivity is not None and not grid.connectivity.connected(start, end):
+            return False
+        cols = grid.cols
+        g_score = self.g_score
+        came_from = self.came_from
+        closed = self.closed
+        touched = self._touched
+        lazy = self.lazy
+        (er, ec) = end
+        start_idx = start[0] * cols + start[1]
+        end_idx = er * cols + ec
+
+        def estimate(idx):
+            r, c = divmod(idx, cols)
+            return math.hypot(r - er, c - ec)
+
+        g_score[start_idx] = 0.0
+        touched.append(start_idx)
+        open_set = [(estimate(start_idx), start_idx)]
+
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if closed[current]:
+                continue
+            if lazy:
+                self._set_vertex(current)
+            closed[current] = 1
+            self.expansions += 1
+            if current == end_idx:
+                self.goal = current
+                self.cost = g_score[current]
+                break
+
+            current_g = g_score[current]
+            parent = came_from[current]
+            for neighbor, step in self._neighbors(current):
+                if closed[neighbor]:
+                    continue
+                # Caminho 1: pela célula atual, como no A*
+                best = current_g + step
+                best_parent = current
+                if parent != -1:
+                    # Caminho 2: direto do pai da célula atual
+                    if lazy:
+                        r, c = divmod(parent, cols)
+                        nr, nc = divmod(neighbor, cols)
+                        # Suposição otimista, confirmada em `_set_vertex`
+                        through = g_score[parent] + math.hypot(nr - r, nc - c) * grid.cost[neighbor]
+                    else:
+                        through = g_score[parent] + self._line_cost(parent, neighbor)
+                    if through < best:
+                        best = through
+                        best_parent = parent
+                if best < g_score[neighbor]:
+                    if g_score[neighbor] == float('inf'):
+                        touched.append(neighbor)
+                    g_score[neighbor] = best
+                    came_from[neighbor] = best_parent
+                    heapq.heappush(open_set, (best + estimate(neighbor), neighbor))
+
+        return self.goal != -1
+
+    def path(self):
+        """Pontos de virada [(linha, coluna), ...] da última busca."""
+        if self.goal == -1:
+            return []
+        cols = self.grid.cols
+        points = []
+        idx = self.goal
+        while idx != -1:
+            points.append(divmod(idx, cols))
+            idx = self.came_from[idx]
+        points.reverse()
+        return points
+
+    def compact_path(self):
+        """O caminho da última busca como `CompactPath`."""
+        return CompactPath.from_points(self.path(), self.grid.cols)
+
+    def came_from_dict(self):
+        """Cadeia {ponto: ponto_anterior} no formato de `reconstruct_path`."""
+        path = self.path()
+        if not path:
+            return None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from
+
+def theta_star_search(maze, start, end, lazy=True):
+    """
+    Alternativa a `a_star_search` com caminhos em qualquer ângulo. Mesmo
+    retorno, (came_from, end) ou (None, None), mas `reconstruct_path` devolve
+    só os pontos de virada.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = AnyAngleEngine(grid, lazy)
+    if not engine.search(start, end):
+        return None, None
+    return engine.came_from_dict(), tuple(end)
+
+#-- Representação compacta de caminhos --
+
+class CompactPath:
+    """
+    Caminho guardado só pelos pontos de virada, em índices planos int32
+    (4 bytes por ponto, contra dezenas de bytes por tupla numa lista).
+
+    Serve tanto para caminhos célula a célula (os trechos retos em uma das
+    8 direções viram um único segmento) quanto para os de `AnyAngleEngine`.
+    `cells()` reconstrói as células sob demanda, segmento a segmento.
+    """
+
+    __slots__ = ("cols", "points")
+
+    def __init__(self, cols, points=None):
+        self.cols = cols
+        self.points = points if points is not None else array("i")
+
+    @classmethod
+    def from_points(cls, points, cols):
+        """A partir de uma lista de pontos de virada [(linha, coluna), ...]."""
+        return cls(cols, array("i", (r * cols + c for r, c in points)))
+
+    @classmethod
+    def from_path(cls, path, cols):
+        """
+        A partir de um caminho célula a célula (ex.: `reconstruct_path`),
+        guardando só as células onde a direção muda.
+        """
+        points = array("i")
+        direction = None
+        for i, (r, c) in enumerate(path):
+            if i + 1 < len(path):
+                nr, nc = path[i + 1]
+                step = (nr - r, nc - c)
+            else:
+                step = None
+            if step != direction:
+                points.append(r * cols + c)
+                direction = step
+        return cls(cols, points)
+
+    def __len__(self):
+        return len(self.points)
+
+    def waypoints(self):
+        """Pontos de virada [(linha, coluna), ...]."""
+        return [divmod(idx, self.cols) for idx in self.points]
+
+    def cells(self):
+        """Gera as células (linha, coluna) do caminho, do início ao fim."""
+        points = self.waypoints()
+        if not points:
+            return
+        yield points[0]
+        for a, b in zip(points, points[1:]):
+            yield from line_cells(a, b)
+
+    def run_lengths(self):
+        """
+        Caminho célula a célula como [(código da direção em MOVES, passos)].
+        Cada segmento entre pontos de virada precisa ser reto numa das 8
+        direções (caso de `from_path`).
+        """
+        codes = {(dr, dc): code for code, (dr, dc, _) in enumerate(MOVES)}
+        runs = []
+        for (r, c), (nr, nc) in zip(self.waypoints(), self.waypoints()[1:]):
+            dr = nr - r
+            dc = nc - c
+            steps = max(abs(dr), abs(dc))
+            if dr and dc and abs(dr) != abs(dc):
+                raise ValueError("Segmento fora das 8 direções: use cells().")
+            runs.append((codes[((dr > 0) - (dr < 0), (dc > 0) - (dc < 0))], steps))
+        return runs
+
+    @property
+    def nbytes(self):
+        return self.points.itemsize * len(self.points)
+
+    def to_bytes(self):
+        """Pontos em int32 (ordem de bytes da máquina), prontos para envio."""
+        return self.points.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, cols):
+        points = array("i")
+        points.frombytes(data)
+        return cls(cols, points)
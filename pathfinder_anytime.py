@@ -0,0 +1,324 @@
+import heapq
+import time
+from array import array
+
+from pathfinder import DEADLINE_CHECK_INTERVAL, Grid, MOVES, SQRT2, SearchEngine, path_cost
+
+#-- Busca subótima limitada e anytime (A* ponderado e ARA*) --
+# O A* ponderado ordena a fila por g + epsilon * h: expande bem menos nós e
+# devolve um caminho que custa no máximo epsilon vezes o ótimo.
+#
+# O ARA* (Anytime Repairing A*) começa com um epsilon alto, para ter um
+# primeiro caminho depressa, e vai reduzindo epsilon enquanto houver tempo.
+# Cada rodada reaproveita os g_score da anterior: os nós que melhoraram
+# depois de fechados vão para a lista INCONS e voltam à fila na rodada
+# seguinte, em vez de a busca recomeçar do zero.
+#
+# Todo caminho devolvido vem com o seu limite de subotimalidade: custo /
+# limite inferior do ótimo, nunca maior que o epsilon usado. O custo é o do
+# caminho percorrido (`path_cost`), não o g do objetivo: os dois algoritmos
+# trocam o pai de nós já fechados sem corrigir o g dos seus descendentes, e
+# o g do objetivo pode ficar acima do custo real do caminho.
+
+# Situação de cada célula na rodada atual do ARA*
+_NEW, _OPEN, _CLOSED, _INCONS = 0, 1, 2, 3
+
+def _octile(idx, cols, er, ec):
+    r, c = divmod(idx, cols)
+    dr = r - er if r > er else er - r
+    dc = c - ec if c > ec else ec - c
+    if dr > dc:
+        return (dr - dc) + SQRT2 * dc
+    return (dc - dr) + SQRT2 * dr
+
+def _bound(cost, lower):
+    """Limite de subotimalidade custo / limite inferior (1.0 se for ótimo)."""
+    if cost <= lower or lower <= 0:
+        return 1.0
+    return cost / lower
+
+def weighted_bound(engine, epsilon):
+    """
+    Limite de subotimalidade da última busca ponderada de `engine`.
+
+    O primeiro nó do caminho ótimo cujo sucessor ainda não tem g ótimo está
+    aberto ou em `engine.inconsistent` com g ótimo, então o menor g + h entre
+    esses nós é um limite inferior do custo ótimo. O limite devolvido é o
+    menor entre custo do caminho / esse valor e `epsilon`.
+    """
+    cost = path_cost(engine.grid, engine.path())
+    cols = engine.grid.cols
+    er, ec = divmod(engine.goal, cols)
+    g_score = engine.g_score
+    closed = engine.closed
+    lower = cost
+    candidates = [idx for _, idx in engine.open_set if not closed[idx]]
+    for idx in candidates + engine.inconsistent:
+        f_score = g_score[idx] + _octile(idx, cols, er, ec)
+        if f_score < lower:
+            lower = f_score
+    return min(epsilon, _bound(cost, lower))
+
+def weighted_a_star_search(maze, start, end, epsilon=1.5):
+    """
+    A* ponderado: g + epsilon * h.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        start, end (tuple): Células de início e fim.
+        epsilon (float): Fator >= 1 sobre a heurística octile.
+
+    Retorna:
+        tuple: (came_from, end, bound) para `reconstruct_path`, com o limite
+               de subotimalidade do caminho, ou (None, None, None) se não
+               houver solução.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = SearchEngine(grid)
+    if not engine.search(start, end, weight=epsilon):
+        return None, None, None
+    return engine.came_from_dict(), tuple(end), weighted_bound(engine, epsilon)
+
+class AnytimeEngine:
+    """
+    Motor ARA* reutilizável sobre um `Grid`.
+
+    Depois de `search`, `path()` e `came_from_dict()` trazem o melhor caminho
+    encontrado, `cost` o seu custo e `bound` o seu limite de subotimalidade
+    (1.0 quando provadamente ótimo). `epsilons` lista o epsilon de cada
+    rodada concluída; `expansions` e `pushes` somam todas as rodadas.
+    """
+
+    def __init__(self, grid):
+        size = grid.rows * grid.cols
+        self.grid = grid
+        self.g_score = array("d", [float('inf')]) * size
+        self.came_from = array("i", [-1]) * size
+        self.status = bytearray(size)
+        self._touched = []
+        self.goal = -1
+        self.cost = float('inf')
+        self.bound = float('inf')
+        self.epsilons = []
+        self._best_path = []
+        self.expansions = 0
+        self.pushes = 0
+
+    def _reset(self):
+        g_score = self.g_score
+        came_from = self.came_from
+        status = self.status
+        inf = float('inf')
+        for idx in self._touched:
+            g_score[idx] = inf
+            came_from[idx] = -1
+            status[idx] = _NEW
+        self._touched = []
+        self.goal = -1
+        self.cost = float('inf')
+        self.bound = float('inf')
+        self.epsilons = []
+        self._best_path = []
+        self.expansions = 0
+        self.pushes = 0
+
+    def _improve_path(self, open_set, epsilon, end_idx, deadline):
+        """
+        Uma rodada do ARA*: expande até que nenhum nó da fila tenha chave
+        menor que g(objetivo).
+
+        Retorna:
+            bool: False se o prazo acabou antes do fim da rodada.
+        """
+        grid = self.grid
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        cost = grid.cost
+        g_score = self.g_score
+        came_from = self.came_from
+        status = self.status
+        touched = self._touched
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        er, ec = divmod(end_idx, cols)
+        expansions = 0
+        pushes = 0
+        completed = True
+
+        while open_set and open_set[0][0] < g_score[end_idx]:
+            if deadline is not None and expansions % DEADLINE_CHECK_INTERVAL == 0 \
+               and time.perf_counter() >= deadline:
+                completed = False
+                break
+            _, entry_g, current = heappop(open_set)
+            if status[current] != _OPEN or entry_g != g_score[current]:
+                continue # Entrada obsoleta
+            status[current] = _CLOSED
+            expansions += 1
+
+            current_g = entry_g
+            r, c = divmod(current, cols)
+            for dr, dc, move_cost in MOVES:
+                nr = r + dr
+                nc = c + dc
+                if not (0 <= nr < rows and 0 <= nc < cols):
+                    continue
+                neighbor = nr * cols + nc
+                if not passable[neighbor]:
+                    continue
+                tentative_g_score = current_g + move_cost * cost[neighbor]
+                if tentative_g_score < g_score[neighbor]:
+                    if g_score[neighbor] == float('inf'):
+                        touched.append(neighbor)
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = current
+                    if status[neighbor] == _CLOSED or status[neighbor] == _INCONS:
+                        # Já fechado nesta rodada: fica para a próxima
+                        status[neighbor] = _INCONS
+                    else:
+                        status[neighbor] = _OPEN
+                        dr = nr - er if nr > er else er - nr
+                        dc = nc - ec if nc > ec else ec - nc
+                        if dr > dc:
+                            estimate = (dr - dc) + SQRT2 * dc
+                        else:
+                            estimate = (dc - dr) + SQRT2 * dr
+                        heappush(open_set, (tentative_g_score + epsilon * estimate,
+                                            tentative_g_score, neighbor))
+                        pushes += 1
+
+        self.expansions += expansions
+        self.pushes += pushes
+        return completed
+
+    def _lower_bound(self, end_idx):
+        """Menor g + h entre os nós abertos e inconsistentes."""
+        cols = self.grid.cols
+        er, ec = divmod(end_idx, cols)
+        g_score = self.g_score
+        status = self.status
+        lower = g_score[end_idx]
+        for idx in self._touched:
+            if status[idx] == _OPEN or status[idx] == _INCONS:
+                f_score = g_score[idx] + _octile(idx, cols, er, ec)
+                if f_score < lower:
+                    lower = f_score
+        return lower
+
+    def _next_round(self, epsilon, end_idx):
+        """Fila da próxima rodada: abertos e inconsistentes com o novo epsilon."""
+        cols = self.grid.cols
+        er, ec = divmod(end_idx, cols)
+        g_score = self.g_score
+        status = self.status
+        open_set = []
+        for idx in self._touched:
+            state = status[idx]
+            if state == _OPEN or state == _INCONS:
+                status[idx] = _OPEN
+                g = g_score[idx]
+                open_set.append((g + epsilon * _octile(idx, cols, er, ec), g, idx))
+            elif state == _CLOSED:
+                status[idx] = _NEW
+        heapq.heapify(open_set)
+        return open_set
+
+    def solutions(self, start, end, epsilon=3.0, step=0.5, deadline=None):
+        """
+        Gera (caminho, custo, limite) a cada melhora da solução, reduzindo
+        epsilon em `step` por rodada até 1 ou até `deadline` (instante de
+        `time.perf_counter()`). O prazo só vale depois da primeira solução:
+        sem ela não haveria o que devolver.
+        """
+        self._reset()
+        grid = self.grid
+        if grid.connectivity is not None and not grid.connectivity.connected(start, end):
+            return
+        cols = grid.cols
+        start_idx = start[0] * cols + start[1]
+        end_idx = end[0] * cols + end[1]
+        er, ec = end
+        epsilon = max(1.0, epsilon)
+        self.g_score[start_idx] = 0.0
+        self._touched.append(start_idx)
+        self.status[start_idx] = _OPEN
+        open_set = [(epsilon * _octile(start_idx, cols, er, ec), 0.0, start_idx)]
+        self.pushes = 1
+
+        while True:
+            first = self.goal == -1
+            completed = self._improve_path(open_set, epsilon, end_idx,
+                                           None if first else deadline)
+            if self.g_score[end_idx] == float('inf'):
+                return # Sem caminho
+            path = self._path_to(end_idx)
+            cost = path_cost(grid, path)
+            if completed:
+                self.epsilons.append(epsilon)
+                bound = min(epsilon, _bound(cost, self._lower_bound(end_idx)))
+            else:
+                bound = min(self.bound, _bound(cost, self._lower_bound(end_idx)))
+            if cost < self.cost or bound < self.bound:
+                self.goal = end_idx
+                self.cost = cost
+                self.bound = bound
+                # As rodadas seguintes mudam came_from: o caminho fica guardado
+                self._best_path = path
+                yield list(path), cost, bound
+            if not completed or bound <= 1.0:
+                return
+            epsilon = max(1.0, min(epsilon - step, bound))
+            open_set = self._next_round(epsilon, end_idx)
+
+    def search(self, start, end, time_limit=None, epsilon=3.0, step=0.5):
+        """
+        Executa o ARA* e fica com a melhor solução obtida em `time_limit`
+        segundos (sem limite: até provar a otimalidade).
+
+        Retorna:
+            bool: True se algum caminho foi encontrado.
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        for _ in self.solutions(start, end, epsilon, step, deadline):
+            pass
+        return self.goal != -1
+
+    def path(self):
+        """Melhor caminho [(linha, coluna), ...] encontrado ([] se nenhum)."""
+        return list(self._best_path)
+
+    def _path_to(self, idx):
+        cols = self.grid.cols
+        came_from = self.came_from
+        path = []
+        while idx != -1:
+            path.append(divmod(idx, cols))
+            idx = came_from[idx]
+        path.reverse()
+        return path
+
+    def came_from_dict(self):
+        """Cadeia {nó: nó_anterior} no formato de `reconstruct_path`."""
+        path = self.path()
+        if not path:
+            return None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from
+
+def ara_star_search(maze, start, end, time_limit=0.05, epsilon=3.0, step=0.5):
+    """
+    ARA*: primeiro caminho rápido com `epsilon` alto, melhorado enquanto
+    `time_limit` (segundos) permitir.
+
+    Retorna:
+        tuple: (came_from, end, bound) com o melhor caminho obtido no prazo e
+               o seu limite de subotimalidade, ou (None, None, None).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = AnytimeEngine(grid)
+    if not engine.search(start, end, time_limit, epsilon, step):
+        return None, None, None
+    return engine.came_from_dict(), tuple(end), engine.bound
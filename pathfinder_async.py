@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from pathfinder import Grid, SearchEngine
+
+#-- Buscas com orçamento e execução cooperativa (asyncio) --
+# Uma consulta sem solução num labirinto grande pode expandir o mapa inteiro.
+# Com um orçamento (número máximo de expansões e/ou prazo) a busca para no
+# limite e devolve um resultado parcial: o nó expandido mais próximo do
+# objetivo, o caminho até ele e o tamanho da fronteira. O estado fica no
+# motor, então `resume_search` continua exatamente de onde parou.
+#
+# `async_search` faz o mesmo em fatias de `every` expansões, devolvendo o
+# controle ao loop de eventos entre elas; cancelar a tarefa interrompe a
+# busca na fatia seguinte. Cada busca simultânea precisa do seu próprio
+# `SearchEngine` (o estado da busca vive nele).
+
+def _result(engine, found):
+    """
+    Resultado em dicionário:
+        status: "found", "no_path" ou "budget" (orçamento esgotado).
+        path: Caminho até o objetivo ("found") ou até `best_node` ("budget").
+        best_node, frontier_size: Progresso de uma busca interrompida.
+        stats: `engine.stats.as_dict()`.
+    """
+    result = {"status": "no_path", "path": [], "best_node": None,
+              "frontier_size": 0, "stats": engine.stats.as_dict()}
+    if found:
+        result["status"] = "found"
+        result["path"] = engine.path()
+    elif found is None:
+        best = engine.best_node()
+        result["status"] = "budget"
+        result["best_node"] = best
+        result["path"] = engine.path(best) if best is not None else []
+        result["frontier_size"] = len(engine.frontier())
+    return result
+
+def budgeted_search(engine, start, end, max_expansions=None, deadline=None, h=None):
+    """
+    A* de `start` até `end` limitado por `max_expansions` e/ou `deadline`
+    (instante de `time.perf_counter()`).
+
+    Argumentos:
+        engine (SearchEngine): Motor que guarda o estado da busca.
+
+    Retorna:
+        dict: Ver `_result`. Com status "budget", `resume_search(engine)`
+              continua a mesma busca.
+    """
+    engine.begin(start, end, h)
+    return resume_search(engine, max_expansions, deadline)
+
+def resume_search(engine, max_expansions=None, deadline=None):
+    """Continua uma busca interrompida por orçamento, com um novo orçamento."""
+    return _result(engine, engine.run(max_expansions, deadline))
+
+async def async_search(engine, start, end, every=1000, max_expansions=None, deadline=None, h=None):
+    """
+    Versão cooperativa de `budgeted_search`: expande no máximo `every` nós
+    por vez e cede o loop de eventos (`await asyncio.sleep(0)`) entre as
+    fatias. Pode ser cancelada como qualquer tarefa do asyncio.
+
+    Retorna:
+        dict: O mesmo resultado de `budgeted_search`.
+    """
+    engine.begin(start, end, h)
+    stats = engine.stats
+    while True:
+        chunk = every
+        if max_expansions is not None:
+            chunk = min(every, max_expansions - stats.expansions)
+        found = engine.run(chunk, deadline)
+        if found is not None:
+            return _result(engine, found)
+        if (max_expansions is not None and stats.expansions >= max_expansions) or \
+           (deadline is not None and time.perf_counter() >= deadline):
+            return _result(engine, None)
+        await asyncio.sleep(0)
+
+async def async_a_star_search(maze, start, end, every=1000):
+    """
+    Alternativa assíncrona a `a_star_search`. Mesmo retorno:
+    (came_from, end) ou (None, None).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = SearchEngine(grid)
+    result = await async_search(engine, start, end, every)
+    if result["status"] != "found":
+        return None, None
+    return engine.came_from_dict(), tuple(end)
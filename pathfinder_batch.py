@@ -0,0 +1,120 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from pathfinder import Grid, SearchEngine
+
+#-- Consultas em lote com processos e memória compartilhada --
+# O grid é copiado uma única vez para um bloco de `shared_memory`
+# (custos float32 seguidos da máscara de passagem); cada processo do pool
+# monta um `Grid` sobre esse bloco sem copiar nada e mantém o seu próprio
+# `SearchEngine`. Para os processos só viajam os pares (início, fim).
+
+# Estado de cada processo do pool (preenchido por `_init_worker`)
+_worker_shm = None
+_worker_engine = None
+
+def _init_worker(shm_name, rows, cols):
+    global _worker_shm, _worker_engine
+    # Os processos do pool herdam o resource_tracker do processo principal,
+    # que é quem cria e libera (unlink) o bloco
+    shm = shared_memory.SharedMemory(name=shm_name)
+    size = rows * cols
+    buf = shm.buf
+    grid = Grid(rows, cols, passable=buf[4 * size:5 * size], cost=buf[:4 * size].cast("f"))
+    _worker_shm = shm
+    _worker_engine = SearchEngine(grid)
+
+def _solve(engine, start, end, return_paths):
+    if not engine.search(start, end):
+        return None
+    if return_paths:
+        return engine.path()
+    return engine.g_score[engine.goal]
+
+def _run_chunk(offset, pairs, return_paths):
+    engine = _worker_engine
+    return offset, [_solve(engine, start, end, return_paths) for start, end in pairs]
+
+def _plane(values, size):
+    """
+    Os `size` valores de um plano do grid. Planos que não são buffers (como os
+    de `TiledGrid`) são lidos por índice: iterá-los não teria fim.
+    """
+    if isinstance(values, (array, memoryview, bytes, bytearray)):
+        return values
+    return map(values.__getitem__, range(size))
+
+def _share_grid(grid):
+    """
+    Copia custos (convertidos para float32) e máscara de passagem do grid
+    para um bloco compartilhado. Se a cópia falhar, o bloco é liberado.
+    """
+    size = grid.rows * grid.cols
+    shm = shared_memory.SharedMemory(create=True, size=max(5 * size, 1))
+    try:
+        shm.buf[:4 * size] = array("f", _plane(grid.cost, size)).tobytes()
+        shm.buf[4 * size:5 * size] = bytes(_plane(grid.passable, size))
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm
+
+def iter_batch_search(maze, pairs, workers=None, chunksize=64, return_paths=True):
+    """
+    Versão em streaming de `batch_search`: gera (índice, resultado) à medida
+    que os lotes terminam, fora da ordem de entrada.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        pairs (list): Pares (início, fim), cada um uma tupla (linha, coluna).
+        workers (int | None): Número de processos (padrão: os.cpu_count()).
+                              Com 1 ou menos, executa no próprio processo.
+        chunksize (int): Quantos pares cada tarefa enviada ao pool carrega.
+        return_paths (bool): Se False, retorna só o custo de cada caminho.
+
+    Gera:
+        tuple: (índice do par em `pairs`, caminho/custo ou None sem solução).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    pairs = list(pairs)
+    workers = os.cpu_count() if workers is None else workers
+
+    if workers <= 1:
+        engine = SearchEngine(grid)
+        for i, (start, end) in enumerate(pairs):
+            yield i, _solve(engine, start, end, return_paths)
+        return
+
+    shm = _share_grid(grid)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, grid.rows, grid.cols)) as pool:
+            futures = [pool.submit(_run_chunk, offset, pairs[offset:offset + chunksize], return_paths)
+                       for offset in range(0, len(pairs), chunksize)]
+            for future in as_completed(futures):
+                offset, results = future.result()
+                for i, result in enumerate(results):
+                    yield offset + i, result
+    finally:
+        shm.close()
+        shm.unlink()
+
+def batch_search(maze, pairs, workers=None, chunksize=64, return_paths=True):
+    """
+    Resolve muitas consultas (início, fim) no mesmo labirinto em paralelo.
+
+    Os argumentos são os de `iter_batch_search`.
+
+    Retorna:
+        list: Um resultado por par, na ordem de entrada: o caminho
+              [(linha, coluna), ...] (ou o custo, se `return_paths` for
+              False), ou None quando não há solução.
+    """
+    pairs = list(pairs)
+    results = [None] * len(pairs)
+    for i, result in iter_batch_search(maze, pairs, workers, chunksize, return_paths):
+        results[i] = result
+    return results
@@ -0,0 +1,296 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from pathfinder import Grid, SearchEngine, path_cost
+from pathfinder_bidirectional import BidirectionalEngine
+from pathfinder_bucket import BucketEngine
+from pathfinder_hpa import HierarchicalGraph
+from pathfinder_jps import JumpPointEngine
+
+#-- Benchmark dos motores de busca --
+# Gera labirintos reproduzíveis (mesma semente -> mesmo labirinto), roda cada
+# motor nas mesmas consultas e grava um JSON com tempo, expansões, inserções
+# na heap, pico de memória e custo do caminho. Um JSON anterior pode ser
+# passado como base para apontar regressões.
+#
+# Uso:
+#     python pathfinder_bench.py --sizes 100 500 --out baseline.json
+#     python pathfinder_bench.py --sizes 100 500 --baseline baseline.json
+
+ENGINES = {
+    "astar": SearchEngine,
+    "jps": JumpPointEngine,
+    "bidirectional": BidirectionalEngine,
+    "hpa": HierarchicalGraph,
+    "bucket": BucketEngine,
+}
+
+# --- Geradores de labirintos ---
+
+def _open_near(grid, r, c):
+    """Célula transitável mais próxima de (r, c), varrendo em anéis."""
+    for radius in range(max(grid.rows, grid.cols)):
+        for nr in range(max(r - radius, 0), min(r + radius + 1, grid.rows)):
+            for nc in range(max(c - radius, 0), min(c + radius + 1, grid.cols)):
+                if grid.passable[nr * grid.cols + nc]:
+                    return (nr, nc)
+    return None
+
+def _place_endpoints(grid):
+    grid.start = _open_near(grid, 0, 0)
+    grid.end = _open_near(grid, grid.rows - 1, grid.cols - 1)
+    return grid
+
+def random_obstacles(rows, cols, density, seed=0):
+    """Campo com obstáculos (1) espalhados com a densidade dada."""
+    rng = random.Random(seed)
+    grid = Grid(rows, cols)
+    passable = grid.passable
+    cost = grid.cost
+    for idx in range(rows * cols):
+        if rng.random() < density:
+            passable[idx] = 0
+            cost[idx] = float('inf')
+    return _place_endpoints(grid)
+
+def recursive_backtracker(rows, cols, seed=0):
+    """
+    Labirinto perfeito (um único corredor entre dois pontos quaisquer) gerado
+    por backtracking iterativo: as células de coordenadas ímpares são salas e
+    as demais são paredes até serem escavadas.
+    """
+    rng = random.Random(seed)
+    grid = Grid(rows, cols)
+    passable = grid.passable
+    cost = grid.cost
+    for idx in range(rows * cols):
+        passable[idx] = 0
+        cost[idx] = float('inf')
+
+    def carve(r, c):
+        passable[r * cols + c] = 1
+        cost[r * cols + c] = 1.0
+
+    if rows < 2 or cols < 2:
+        return _place_endpoints(grid)
+    carve(1, 1)
+    stack = [(1, 1)]
+    while stack:
+        r, c = stack[-1]
+        options = [(dr, dc) for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                   if 0 < r + dr < rows - 1 and 0 < c + dc < cols - 1
+                   and not passable[(r + dr) * cols + c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        dr, dc = rng.choice(options)
+        carve(r + dr // 2, c + dc // 2)
+        carve(r + dr, c + dc)
+        stack.append((r + dr, c + dc))
+    return _place_endpoints(grid)
+
+def weighted_field(rows, cols, patches=None, density=0.05, seed=0):
+    """
+    Campo aberto com manchas retangulares de terreno difícil (custos 2 a 9)
+    e alguns obstáculos.
+    """
+    rng = random.Random(seed)
+    grid = random_obstacles(rows, cols, density, seed)
+    patches = patches if patches is not None else max(1, rows * cols // 2000)
+    for _ in range(patches):
+        height = rng.randint(1, max(1, rows // 5))
+        width = rng.randint(1, max(1, cols // 5))
+        r0 = rng.randrange(rows)
+        c0 = rng.randrange(cols)
+        terrain = rng.randint(2, 9)
+        for r in range(r0, min(r0 + height, rows)):
+            for c in range(c0, min(c0 + width, cols)):
+                idx = r * cols + c
+                if grid.passable[idx]:
+                    grid.cost[idx] = terrain
+    return _place_endpoints(grid)
+
+MAZES = {
+    "random_10": lambda size, seed: random_obstacles(size, size, 0.10, seed),
+    "random_30": lambda size, seed: random_obstacles(size, size, 0.30, seed),
+    "backtracker": lambda size, seed: recursive_backtracker(size, size, seed),
+    "weighted": lambda size, seed: weighted_field(size, size, seed=seed),
+}
+
+# --- Execução ---
+
+def _queries(grid, count, seed):
+    """Consulta S -> E mais `count` pares aleatórios de células transitáveis."""
+    queries = [(grid.start, grid.end)]
+    rng = random.Random(seed)
+    cols = grid.cols
+    for _ in range(count):
+        pair = []
+        while len(pair) < 2:
+            idx = rng.randrange(grid.rows * cols)
+            if grid.passable[idx]:
+                pair.append(divmod(idx, cols))
+        queries.append(tuple(pair))
+    return queries
+
+def run_query(engine, start, end, measure_memory=True):
+    """
+    Roda uma consulta e mede tempo, contadores, custo e (opcionalmente) o pico
+    de memória, que é medido numa segunda execução para não distorcer o tempo.
+    """
+    t0 = time.perf_counter()
+    found = engine.search(start, end)
+    elapsed = time.perf_counter() - t0
+    path = engine.path() if found else []
+    result = {
+        "found": found,
+        "time_s": elapsed,
+        "expansions": engine.expansions,
+        "pushes": engine.pushes,
+        "cost": path_cost(engine.grid, path) if found else None,
+        "path_length": len(path),
+    }
+    stats = getattr(engine, "stats", None)
+    if stats is not None:
+        result["relaxations"] = stats.relaxations
+        result["max_open_set"] = stats.max_open_set
+    if measure_memory:
+        tracemalloc.start()
+        engine.search(start, end)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+def run_benchmark(sizes, mazes=None, engines=None, queries=2, seed=0, measure_memory=True,
+                  log=None):
+    """
+    Roda todos os motores em todos os labirintos.
+
+    Retorna:
+        dict: Metadados e a lista `results`, um registro por
+              (labirinto, tamanho, motor, consulta).
+    """
+    mazes = mazes or list(MAZES)
+    engines = engines or ["astar", "jps", "bidirectional", "bucket"]
+    results = []
+    for size in sizes:
+        for maze_name in mazes:
+            grid = MAZES[maze_name](size, seed)
+            if grid.start is None or grid.end is None:
+                continue
+            maze_queries = _queries(grid, queries, seed)
+            for engine_name in engines:
+                t0 = time.perf_counter()
+                engine = ENGINES[engine_name](grid)
+                setup = time.perf_counter() - t0
+                for i, (start, end) in enumerate(maze_queries):
+                    record = {"maze": maze_name, "size": size, "engine": engine_name,
+                              "query": i, "start": list(start), "end": list(end),
+                              "setup_s": setup}
+                    record.update(run_query(engine, start, end, measure_memory))
+                    results.append(record)
+                    if log is not None:
+                        log(record)
+    return {
+        "python": platform.python_version(),
+        "seed": seed,
+        "sizes": list(sizes),
+        "results": results,
+    }
+
+def speedups(report, reference="astar"):
+    """
+    Aceleração de cada motor em relação a `reference`: tempo total do motor
+    de referência / tempo total do motor, nas consultas que ambos rodaram.
+
+    Retorna:
+        dict: {motor: aceleração}.
+    """
+    def key(record):
+        return (record["maze"], record["size"], record["query"])
+
+    reference_times = {key(record): record["time_s"] for record in report["results"]
+                       if record["engine"] == reference}
+    totals = {}
+    for record in report["results"]:
+        if record["engine"] != reference and key(record) in reference_times:
+            ref_total, total = totals.get(record["engine"], (0.0, 0.0))
+            totals[record["engine"]] = (ref_total + reference_times[key(record)],
+                                        total + record["time_s"])
+    return {engine: ref_total / total for engine, (ref_total, total) in totals.items() if total > 0}
+
+def compare(current, baseline, time_tolerance=0.25):
+    """
+    Compara dois resultados de `run_benchmark`.
+
+    Retorna:
+        list: Mensagens de regressão (tempo acima da tolerância, mais
+              expansões ou custo diferente para a mesma consulta).
+    """
+    def key(record):
+        return (record["maze"], record["size"], record["engine"], record["query"])
+
+    previous = {key(record): record for record in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        old = previous.get(key(record))
+        if old is None:
+            continue
+        name = "{}/{}/{}#{}".format(*key(record))
+        if record["time_s"] > old["time_s"] * (1 + time_tolerance):
+            regressions.append(f"{name}: tempo {old['time_s']:.4f}s -> {record['time_s']:.4f}s")
+        if record["expansions"] > old["expansions"]:
+            regressions.append(f"{name}: expansões {old['expansions']} -> {record['expansions']}")
+        if (record["cost"] is None) != (old["cost"] is None) or \
+           (record["cost"] is not None and abs(record["cost"] - old["cost"]) > 1e-6):
+            regressions.append(f"{name}: custo {old['cost']} -> {record['cost']}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de busca do PathFinder.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500],
+                        help="Lados dos labirintos quadrados (ex.: 100 1000 4000).")
+    parser.add_argument("--mazes", nargs="+", choices=sorted(MAZES), default=None)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=None)
+    parser.add_argument("--queries", type=int, default=2,
+                        help="Consultas aleatórias extras por labirinto, além de S -> E.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Não mede o pico de memória (mais rápido).")
+    parser.add_argument("--out", help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument("--baseline", help="JSON anterior para apontar regressões.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Aumento de tempo tolerado em relação à base (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    def log(record):
+        print("{maze:>12} {size:>5} {engine:>13} #{query} {time_s:8.4f}s "
+              "exp={expansions} push={pushes}".format(**record), file=sys.stderr)
+
+    report = run_benchmark(args.sizes, args.mazes, args.engines, args.queries, args.seed,
+                           not args.no_memory, log)
+    for engine, speedup in sorted(speedups(report).items()):
+        print(f"{engine:>13}: {speedup:.2f}x em relação ao astar", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for message in regressions:
+            print("REGRESSÃO:", message, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+import time
+from array import array
+
+from pathfinder import Grid, MOVES, SQRT2, SearchStats, SparseArray
+
+#-- A* com fila de baldes (Dial) e custos em ponto fixo --
+# Os custos de passo são terreno (inteiros pequenos) vezes 1 ou sqrt(2). Em
+# ponto fixo, com `scale` unidades por passo reto e sqrt(2) ~ `diagonal` /
+# `scale`, todo custo e toda prioridade viram inteiros, e a heap pode ser
+# trocada por uma fila de baldes: uma lista por valor de f, sem comparações
+# de tuplas.
+#
+# Com a heurística octile nas mesmas unidades (consistente, pois todo terreno
+# é >= 1), f nunca diminui e um nó inserido tem f no máximo 2 * (maior custo
+# de passo) acima do f atual; por isso basta um anel com esse número de
+# baldes, percorrido em ordem. Um bytearray marca os baldes ocupados, e os
+# vazios são pulados com `bytearray.find` (em C) em vez de um laço em Python.
+# Dentro de um balde a saída é LIFO, que em empates de f favorece os nós mais
+# fundos.
+#
+# O caminho é ótimo para os custos arredondados. Se cada custo de passo
+# arredondado difere do real por uma fração de no máximo d, o custo real do
+# caminho fica a no máximo (1 + d) / (1 - d) - 1 do ótimo (`tolerance`). Com o
+# padrão 99/70 (uma das frações de Pell para sqrt(2)) a tolerância fica em
+# torno de 0.01%; `PELL_FRACTIONS` troca precisão por menos baldes.
+
+# Aproximações de sqrt(2) por frações de Pell: (scale, diagonal)
+PELL_FRACTIONS = ((2, 3), (5, 7), (12, 17), (29, 41), (70, 99), (169, 239), (408, 577))
+
+_UNREACHED = 1 << 62
+
+class _StepCosts(dict):
+    """Custo de passo em ponto fixo por valor de terreno, calculado sob demanda."""
+
+    def __init__(self, unit):
+        super().__init__()
+        self.unit = unit
+
+    def __missing__(self, terrain):
+        if terrain < 1:
+            raise ValueError(f"A fila de baldes exige terrenos >= 1 (encontrado {terrain}).")
+        step = self[terrain] = round(terrain * self.unit)
+        return step
+
+class BucketEngine:
+    """
+    Motor A* com fila de baldes sobre um `Grid`; mesma interface de busca do
+    `SearchEngine` (`search`, `path`, `came_from_dict`, `stats`).
+
+    Argumentos:
+        grid (Grid): O labirinto (terrenos >= 1).
+        scale (int): Unidades por passo reto.
+        diagonal (int | None): Unidades por passo diagonal (padrão: sqrt(2) *
+                               `scale` arredondado). Ver `PELL_FRACTIONS`.
+
+    `g_score` guarda os custos em unidades inteiras; `cost` é o custo da
+    última busca convertido de volta (g / scale).
+    """
+
+    def __init__(self, grid, scale=70, diagonal=None, stats=None):
+        size = grid.rows * grid.cols
+        self.grid = grid
+        self.scale = scale
+        self.diagonal = diagonal if diagonal is not None else round(SQRT2 * scale)
+        self.stats = stats if stats is not None else SearchStats()
+        if getattr(grid, "sparse", False):
+            self.g_score = SparseArray(_UNREACHED)
+            self.came_from = SparseArray(-1)
+            self.closed = SparseArray(0)
+        else:
+            self.g_score = array("q", [_UNREACHED]) * size
+            self.came_from = array("i", [-1]) * size
+            self.closed = bytearray(size)
+        self._touched = []
+        self._buckets = []
+        self._occupied = bytearray()
+        self.goal = -1
+        self.cost = float('inf')
+        self._straight = _StepCosts(scale)
+        # Passos diagonais em múltiplos de `diagonal`: com terreno >= 1 nenhum
+        # fica abaixo da heurística, que continua consistente
+        self._diagonal = _StepCosts(self.diagonal)
+        cols = grid.cols
+        self._moves = tuple((dr, dc, dr * cols + dc, self._diagonal if dr and dc else self._straight)
+                            for dr, dc, _ in MOVES)
+
+    @property
+    def expansions(self):
+        return self.stats.expansions
+
+    @property
+    def pushes(self):
+        return self.stats.pushes
+
+    @property
+    def tolerance(self):
+        """
+        Fração máxima acima do ótimo do custo real dos caminhos encontrados,
+        considerando os terrenos vistos até agora.
+        """
+        worst = 0.0
+        for table, move_cost in ((self._straight, 1.0), (self._diagonal, SQRT2)):
+            for terrain, step in table.items():
+                exact = terrain * move_cost * self.scale
+                worst = max(worst, abs(step - exact) / exact)
+        return (1 + worst) / (1 - worst) - 1
+
+    def _reset(self):
+        t0 = time.perf_counter()
+        g_score = self.g_score
+        came_from = self.came_from
+        closed = self.closed
+        if isinstance(g_score, SparseArray):
+            g_score.clear()
+            came_from.clear()
+            closed.clear()
+        else:
+            for idx in self._touched:
+                g_score[idx] = _UNREACHED
+                came_from[idx] = -1
+                closed[idx] = 0
+        for bucket in self._buckets:
+            bucket.clear()
+        self._occupied[:] = bytes(len(self._occupied))
+        self._touched = []
+        self.goal = -1
+        self.cost = float('inf')
+        self.stats.reset()
+        self.stats.reset_time = time.perf_counter() - t0
+
+    def _ring(self):
+        """Anel de baldes com folga para o maior custo de passo já visto."""
+        largest = max(list(self._straight.values()) + list(self._diagonal.values()) +
+                      [self.scale, self.diagonal])
+        size = 2 * largest + 1
+        if len(self._buckets) < size:
+            self._buckets = [[] for _ in range(size)]
+            self._occupied = bytearray(size)
+        return self._buckets, self._occupied
+
+    def search(self, start, end):
+        """
+        Executa o A* de `start` até `end`.
+
+        Retorna:
+            bool: True se `end` foi alcançado.
+
+        Levanta:
+            ValueError: Se a busca encontrar um terreno com custo < 1.
+        """
+        self._reset()
+        grid = self.grid
+        if grid.connectivity is not None and not grid.connectivity.connected(start, end):
+            return False
+        t0 = time.perf_counter()
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        cost = grid.cost
+        g_score = self.g_score
+        came_from = self.came_from
+        closed = self.closed
+        touched = self._touched
+        moves = self._moves
+        straight_unit = self.scale
+        diagonal_unit = self.diagonal
+        last_r = rows - 1
+        last_c = cols - 1
+        (er, ec) = end
+        start_idx = start[0] * cols + start[1]
+        end_idx = er * cols + ec
+
+        buckets, occupied = self._ring()
+        ring = len(buckets)
+        dr = abs(start[0] - er)
+        dc = abs(start[1] - ec)
+        current_f = straight_unit * abs(dr - dc) + diagonal_unit * min(dr, dc)
+        g_score[start_idx] = 0
+        touched.append(start_idx)
+        buckets[current_f % ring].append(start_idx)
+        occupied[current_f % ring] = 1
+        queued = 1
+        pushes = 1
+        expansions = 0
+        stale_pops = 0
+        relaxations = 0
+        max_open_set = 1
+
+        while queued:
+            slot = current_f % ring
+            bucket = buckets[slot]
+            while not bucket:
+                # Pula os baldes vazios com a busca em C de `bytearray.find`
+                occupied[slot] = 0
+                following = occupied.find(1, slot)
+                if following == -1:
+                    following = occupied.find(1)
+                current_f += (following - slot) % ring
+                slot = following
+                bucket = buckets[slot]
+            current = bucket.pop()
+            queued -= 1
+            if closed[current]:
+                stale_pops += 1
+                continue
+            closed[current] = 1
+            expansions += 1
+            if current == end_idx:
+                self.goal = current
+                break
+
+            current_g = g_score[current]
+            r, c = divmod(current, cols)
+            interior = 0 < r < last_r and 0 < c < last_c
+            for dr, dc, offset, steps in moves:
+                nr = r + dr
+                nc = c + dc
+                if not interior and not (0 <= nr < rows and 0 <= nc < cols):
+                    continue
+                neighbor = current + offset
+                if not passable[neighbor] or closed[neighbor]:
+                    continue
+                relaxations += 1
+                tentative_g_score = current_g + steps[cost[neighbor]]
+                if tentative_g_score < g_score[neighbor]:
+                    if g_score[neighbor] == _UNREACHED:
+                        touched.append(neighbor)
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = current
+                    dr = nr - er if nr > er else er - nr
+                    dc = nc - ec if nc > ec else ec - nc
+                    if dr > dc:
+                        f_score = tentative_g_score + straight_unit * (dr - dc) + diagonal_unit * dc
+                    else:
+                        f_score = tentative_g_score + straight_unit * (dc - dr) + diagonal_unit * dr
+                    if f_score - current_f >= ring:
+                        # Terreno novo maior que os já vistos: o anel precisa crescer
+                        buckets, occupied = self._regrow(buckets, current_f)
+                        ring = len(buckets)
+                    slot = f_score % ring
+                    buckets[slot].append(neighbor)
+                    occupied[slot] = 1
+                    queued += 1
+                    pushes += 1
+            if queued > max_open_set:
+                max_open_set = queued
+
+        stats = self.stats
+        stats.expansions = expansions
+        stats.pushes = pushes
+        stats.stale_pops = stale_pops
+        stats.relaxations = relaxations
+        stats.max_open_set = max_open_set
+        stats.search_time = time.perf_counter() - t0
+        if self.goal == -1:
+            return False
+        self.cost = g_score[self.goal] / straight_unit
+        return True
+
+    def _regrow(self, buckets, current_f):
+        """Redistribui as entradas num anel maior, preservando os valores de f."""
+        ring = len(buckets)
+        entries = []
+        for offset in range(ring):
+            f_score = current_f + offset
+            bucket = buckets[f_score % ring]
+            entries.extend((f_score, idx) for idx in bucket)
+            bucket.clear()
+        buckets, occupied = self._ring()
+        size = len(buckets)
+        for f_score, idx in entries:
+            buckets[f_score % size].append(idx)
+            occupied[f_score % size] = 1
+        return buckets, occupied
+
+    def path(self):
+        """Caminho [(linha, coluna), ...] da última busca ([] se nenhum)."""
+        if self.goal == -1:
+            return []
+        cols = self.grid.cols
+        path = []
+        idx = self.goal
+        while idx != -1:
+            path.append(divmod(idx, cols))
+            idx = self.came_from[idx]
+        path.reverse()
+        return path
+
+    def came_from_dict(self):
+        """Cadeia {nó: nó_anterior} no formato de `reconstruct_path`."""
+        path = self.path()
+        if not path:
+            return None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from
+
+def bucket_a_star_search(maze, start, end, scale=70):
+    """
+    Alternativa a `a_star_search` com fila de baldes. Mesmo retorno:
+    (came_from, end) ou (None, None); o custo fica a no máximo
+    `BucketEngine.tolerance` do ótimo.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = BucketEngine(grid, scale)
+    if not engine.search(start, end):
+        return None, None
+    return engine.came_from_dict(), tuple(end)
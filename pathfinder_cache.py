@@ -0,0 +1,136 @@
+import sys
+from array import array
+from collections import OrderedDict
+
+from pathfinder import Grid, SearchEngine
+
+#-- Cache de caminhos com versão, LRU e reaproveitamento de sufixos --
+# Os resultados ficam guardados por (versão do grid, início, fim). Como todo
+# sufixo de um caminho ótimo também é ótimo, cada caminho guardado responde
+# ainda às consultas que começam em qualquer uma das suas células e terminam
+# no mesmo objetivo. Editar o grid (`Grid.set_cell`) muda `grid.version` e
+# invalida tudo.
+
+# Estimativa do custo de memória de cada célula no índice de sufixos
+# (entrada de dicionário + tupla (chave, posição))
+SUFFIX_ENTRY_BYTES = 120
+
+class PathCache:
+    """
+    Camada de cache em volta de um motor de busca (`SearchEngine` por padrão).
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        max_entries (int): Número máximo de caminhos guardados.
+        max_bytes (int): Memória máxima estimada do cache.
+        engine: Motor com a interface de `SearchEngine` (`search`/`path`).
+
+    Contadores:
+        hits, subpath_hits, misses, evictions, invalidations (int).
+    """
+
+    def __init__(self, maze, max_entries=1024, max_bytes=64 * 1024 * 1024, engine=None):
+        self.grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+        self.engine = engine if engine is not None else SearchEngine(self.grid)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.clear()
+
+    def clear(self):
+        """Descarta todos os caminhos guardados (os contadores continuam)."""
+        # (início, fim) -> (caminho em índices planos, bytes estimados)
+        self._entries = OrderedDict()
+        # fim -> {célula: ((início, fim), posição no caminho)}
+        self._suffixes = {}
+        self._bytes = 0
+        self._version = self.grid.version
+
+    def stats(self):
+        """Contadores e ocupação atual do cache."""
+        return {
+            "hits": self.hits,
+            "subpath_hits": self.subpath_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _store(self, key, path):
+        size = sys.getsizeof(path) + SUFFIX_ENTRY_BYTES * len(path)
+        self._entries[key] = (path, size)
+        self._bytes += size
+        suffixes = self._suffixes.setdefault(key[1], {})
+        for position, cell in enumerate(path):
+            suffixes[cell] = (key, position)
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._bytes > self.max_bytes):
+            self._evict()
+
+    def _evict(self):
+        key, (path, size) = self._entries.popitem(last=False)
+        self._bytes -= size
+        self.evictions += 1
+        suffixes = self._suffixes.get(key[1])
+        if suffixes is None:
+            return
+        for cell in path:
+            entry = suffixes.get(cell)
+            if entry is not None and entry[0] == key:
+                del suffixes[cell]
+        if not suffixes:
+            del self._suffixes[key[1]]
+
+    def find_path(self, start, end):
+        """
+        Caminho [(linha, coluna), ...] de `start` até `end`, do cache quando
+        possível. Retorna [] se não houver solução.
+        """
+        grid = self.grid
+        if grid.version != self._version:
+            self.invalidations += 1
+            self.clear()
+
+        cols = grid.cols
+        key = (start[0] * cols + start[1], end[0] * cols + end[1])
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return [divmod(idx, cols) for idx in entry[0]]
+
+        suffix = self._suffixes.get(key[1], {}).get(key[0])
+        if suffix is not None:
+            # Sufixo de um caminho ótimo já guardado
+            self.subpath_hits += 1
+            owner, position = suffix
+            self._entries.move_to_end(owner)
+            return [divmod(idx, cols) for idx in self._entries[owner][0][position:]]
+
+        self.misses += 1
+        engine = self.engine
+        if engine.search(start, end):
+            path = engine.path()
+        else:
+            path = []
+        # Consultas sem solução também ficam guardadas (caminho vazio)
+        self._store(key, array("i", (r * cols + c for r, c in path)))
+        return path
+
+    def a_star_search(self, start, end):
+        """
+        Mesmo retorno de `a_star_search`: (came_from, end) ou (None, None).
+        """
+        path = self.find_path(start, end)
+        if not path:
+            return None, None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from, tuple(end)
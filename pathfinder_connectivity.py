@@ -0,0 +1,198 @@
+from array import array
+from collections import deque
+
+from pathfinder import Grid, MOVES
+
+#-- Índice de conectividade --
+# Rotula as componentes conexas das células transitáveis (8 direções, mesmas
+# regras de `get_neighbors`). Com o índice ligado ao grid, uma consulta entre
+# componentes diferentes é recusada em O(1), sem explorar nada. Abrir uma
+# célula une as componentes vizinhas (union-find); bloquear uma célula só
+# refaz rótulos quando ela realmente separa a componente, e apenas na parte
+# que ficou isolada.
+
+class ConnectivityIndex:
+    """
+    Rótulos de componente conexa por célula, mantidos em dia com o grid.
+
+    Atributos:
+        labels (array('i')): Rótulo de cada célula (-1 para obstáculos).
+                             Rótulos diferentes podem pertencer à mesma
+                             componente após uniões; use `component`.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.labels = array("i", [-1]) * (grid.rows * grid.cols)
+        # union-find sobre os rótulos
+        self._parent = []
+        self.relabel()
+
+    def _new_label(self):
+        self._parent.append(len(self._parent))
+        return len(self._parent) - 1
+
+    def _find(self, label):
+        parent = self._parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def _neighbors(self, idx):
+        grid = self.grid
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        r, c = divmod(idx, cols)
+        for dr, dc, _ in MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                neighbor = nr * cols + nc
+                if passable[neighbor]:
+                    yield neighbor
+
+    def relabel(self):
+        """Recalcula todos os rótulos do zero (O(células))."""
+        passable = self.grid.passable
+        labels = self.labels
+        self._parent = []
+        for idx in range(len(labels)):
+            labels[idx] = -1
+        for idx in range(len(labels)):
+            if not passable[idx] or labels[idx] != -1:
+                continue
+            label = self._new_label()
+            labels[idx] = label
+            stack = [idx]
+            while stack:
+                current = stack.pop()
+                for neighbor in self._neighbors(current):
+                    if labels[neighbor] == -1:
+                        labels[neighbor] = label
+                        stack.append(neighbor)
+
+    def component(self, node):
+        """Identificador da componente de `node` (None se for obstáculo)."""
+        label = self.labels[node[0] * self.grid.cols + node[1]]
+        return None if label == -1 else self._find(label)
+
+    def connected(self, a, b):
+        """True se existe caminho entre as células `a` e `b`."""
+        component = self.component(a)
+        return component is not None and component == self.component(b)
+
+    def cell_changed(self, r, c):
+        """
+        Atualiza os rótulos depois que a célula (r, c) passou de transitável
+        para obstáculo ou vice-versa. Chamado por `Grid.set_cell`.
+        """
+        idx = r * self.grid.cols + c
+        if self.grid.passable[idx]:
+            self._open(idx)
+        else:
+            self._block(idx)
+
+    def _open(self, idx):
+        labels = self.labels
+        parent = self._parent
+        root = None
+        for neighbor in self._neighbors(idx):
+            other = self._find(labels[neighbor])
+            if root is None:
+                root = other
+            elif other != root:
+                parent[other] = root
+        labels[idx] = root if root is not None else self._new_label()
+
+    def _block(self, idx):
+        labels = self.labels
+        old_label = labels[idx]
+        labels[idx] = -1
+        if old_label == -1:
+            return
+
+        # Agrupa os vizinhos que continuam ligados entre si dentro do 3x3
+        neighbors = list(self._neighbors(idx))
+        cols = self.grid.cols
+        groups = []
+        for neighbor in neighbors:
+            nr, nc = divmod(neighbor, cols)
+            touching = [g for g in groups
+                        if any(max(abs(nr - r), abs(nc - c)) == 1
+                               for r, c in (divmod(m, cols) for m in g))]
+            merged = [neighbor]
+            for g in touching:
+                merged.extend(g)
+                groups.remove(g)
+            groups.append(merged)
+        if len(groups) <= 1:
+            return
+
+        # A célula pode ter separado a componente: buscas em largura
+        # intercaladas, uma por grupo. Buscas que se encontram são unidas; a
+        # que se esgota primeiro é uma parte isolada e ganha um rótulo novo.
+        # O custo é proporcional às partes menores, não à componente toda.
+        owner = {}
+        search_parent = list(range(len(groups)))
+
+        def find(s):
+            while search_parent[s] != s:
+                s = search_parent[s]
+            return s
+
+        frontiers = []
+        visited = []
+        for s, group in enumerate(groups):
+            rep = group[0]
+            owner[rep] = s
+            frontiers.append(deque([rep]))
+            visited.append([rep])
+        active = set(range(len(groups)))
+
+        while len(active) > 1:
+            for s in list(active):
+                if s not in active:
+                    continue
+                frontier = frontiers[s]
+                if not frontier:
+                    # Parte isolada: recebe um rótulo novo
+                    label = self._new_label()
+                    for cell in visited[s]:
+                        labels[cell] = label
+                    active.discard(s)
+                    if len(active) <= 1:
+                        break
+                    continue
+                current = frontier.popleft()
+                for neighbor in self._neighbors(current):
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = s
+                        frontier.append(neighbor)
+                        visited[s].append(neighbor)
+                        continue
+                    other = find(other)
+                    if other != s:
+                        # As buscas se encontraram: unem-se numa só
+                        search_parent[other] = s
+                        frontier.extend(frontiers[other])
+                        visited[s].extend(visited[other])
+                        frontiers[other] = deque()
+                        visited[other] = []
+                        active.discard(other)
+
+def attach_connectivity(maze):
+    """
+    Cria um `ConnectivityIndex` e o liga ao grid: a partir daí os motores de
+    busca recusam consultas sem solução em O(1) e `Grid.set_cell` mantém o
+    índice atualizado.
+
+    Retorna:
+        Grid: O grid com o índice (listas são convertidas).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    grid.connectivity = ConnectivityIndex(grid)
+    return grid
@@ -0,0 +1,230 @@
+import heapq
+from array import array
+
+from pathfinder import Grid, MOVES, heuristic
+
+#-- Replanejamento incremental (D* Lite) --
+# A busca é feita de trás para frente, a partir de 'E', e o estado (g, rhs e a
+# fila de prioridade) é mantido entre chamadas. Quando uma célula muda, só ela
+# e suas vizinhas são reavaliadas e o reparo se espalha apenas até onde os
+# custos realmente mudaram; quando o robô anda, o deslocamento `km` corrige as
+# chaves antigas sem refazer a fila.
+
+# Tolerância na condição de parada: somas de sqrt(2) feitas em ordens
+# diferentes podem diferir no último bit, e parar cedo demais deixaria g
+# desatualizado. Continuar um pouco além é sempre seguro.
+KEY_EPSILON = 1e-9
+
+class IncrementalPlanner:
+    """
+    Planejador D* Lite para um robô que descobre obstáculos enquanto anda.
+
+    Uso:
+        planner = IncrementalPlanner(maze)
+        path = planner.path()            # planeja de 'S' até 'E'
+        planner.update_cell(2, 3, 1)     # nova parede descoberta
+        planner.move_start(path[1])      # o robô avançou uma célula
+        path = planner.path()            # repara só a parte afetada
+
+    Contadores do último `plan()`:
+        expansions (int): Nós retirados da fila e processados.
+        pushes (int): Entradas inseridas na fila.
+    """
+
+    def __init__(self, maze, start=None, end=None):
+        self.grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+        grid = self.grid
+        size = grid.rows * grid.cols
+        self.start = tuple(start) if start is not None else grid.start
+        self.end = tuple(end) if end is not None else grid.end
+        if self.start is None or self.end is None:
+            raise ValueError("Ponto inicial 'S' ou final 'E' não encontrado.")
+
+        self.g = array("d", [float('inf')]) * size
+        self.rhs = array("d", [float('inf')]) * size
+        self.km = 0.0
+        self._last_start = self.start
+        self._open_set = []
+        # nó -> chave atual na fila (entradas com outra chave são obsoletas)
+        self._queued = {}
+        self._dirty = True
+        self.expansions = 0
+        self.pushes = 0
+
+        goal = self._index(self.end)
+        self.rhs[goal] = 0.0
+        self._push(goal, (heuristic(self.start, self.end), 0.0))
+
+    def _index(self, node):
+        return node[0] * self.grid.cols + node[1]
+
+    def _neighbors(self, idx):
+        """Vizinhos transitáveis (8 direções) e o custo do movimento."""
+        grid = self.grid
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        r, c = divmod(idx, cols)
+        for dr, dc, move_cost in MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                neighbor = nr * cols + nc
+                if passable[neighbor]:
+                    yield neighbor, move_cost
+
+    def _key(self, idx):
+        best = min(self.g[idx], self.rhs[idx])
+        return (best + heuristic(self.start, divmod(idx, self.grid.cols)) + self.km, best)
+
+    def _push(self, idx, key):
+        self._queued[idx] = key
+        heapq.heappush(self._open_set, (key, idx))
+        self.pushes += 1
+
+    def _update_vertex(self, idx):
+        g = self.g
+        rhs = self.rhs
+        if idx != self._index(self.end):
+            best = float('inf')
+            if self.grid.passable[idx]:
+                cost = self.grid.cost
+                for neighbor, move_cost in self._neighbors(idx):
+                    value = move_cost * cost[neighbor] + g[neighbor]
+                    if value < best:
+                        best = value
+            rhs[idx] = best
+        self._queued.pop(idx, None)
+        if g[idx] != rhs[idx]:
+            self._push(idx, self._key(idx))
+
+    def _top(self):
+        """Menor entrada válida da fila, descartando as obsoletas."""
+        open_set = self._open_set
+        queued = self._queued
+        while open_set:
+            key, idx = open_set[0]
+            if queued.get(idx) == key:
+                return key, idx
+            heapq.heappop(open_set)
+        return None
+
+    def _sync_start(self):
+        """
+        Corrige as chaves da fila pelo quanto o início andou desde a última
+        sincronização, para que as chaves antigas continuem limites inferiores.
+        """
+        if self.start != self._last_start:
+            self.km += heuristic(self._last_start, self.start)
+            self._last_start = self.start
+
+    def plan(self):
+        """
+        Repara o caminho após as mudanças acumuladas.
+
+        Retorna:
+            bool: True se existe caminho do início atual até 'E'.
+        """
+        g = self.g
+        rhs = self.rhs
+        self._sync_start()
+        start = self._index(self.start)
+        self.expansions = 0
+        self.pushes = 0
+
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            key_old, idx = top
+            if key_old[0] > self._key(start)[0] + KEY_EPSILON and rhs[start] == g[start]:
+                break
+            heapq.heappop(self._open_set)
+            del self._queued[idx]
+            self.expansions += 1
+
+            key_new = self._key(idx)
+            if key_old < key_new:
+                self._push(idx, key_new)
+            elif g[idx] > rhs[idx]:
+                g[idx] = rhs[idx]
+                for neighbor, _ in self._neighbors(idx):
+                    self._update_vertex(neighbor)
+            else:
+                g[idx] = float('inf')
+                self._update_vertex(idx)
+                for neighbor, _ in self._neighbors(idx):
+                    self._update_vertex(neighbor)
+
+        self._dirty = False
+        return g[start] != float('inf')
+
+    def update_cell(self, r, c, new_value):
+        """
+        Registra a mudança de uma célula ('S', 'E', 0, 1, 5...). Só a célula
+        e suas vizinhas são reavaliadas; o reparo acontece no próximo `plan()`.
+        """
+        self._sync_start()
+
+        grid = self.grid
+        idx = r * grid.cols + c
+        grid.set_cell(r, c, new_value)
+        # As arestas que entram e saem da célula mudaram: reavalia a célula
+        # e todas as vizinhas, inclusive as que deixaram de ser transitáveis
+        for dr, dc, _ in MOVES:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < grid.rows and 0 <= nc < grid.cols:
+                self._update_vertex(nr * grid.cols + nc)
+        self._update_vertex(idx)
+        self._dirty = True
+
+    def move_start(self, new_pos):
+        """Move o início (posição atual do robô) sem descartar o estado da busca."""
+        self.start = tuple(new_pos)
+        self._dirty = True
+
+    def cost(self):
+        """Custo do melhor caminho atual até 'E' (inf se não houver)."""
+        if self._dirty:
+            self.plan()
+        return self.g[self._index(self.start)]
+
+    def path(self):
+        """
+        Caminho [(linha, coluna), ...] do início atual até 'E', replanejando
+        se houver mudanças pendentes. Retorna [] se não houver caminho.
+        """
+        if self._dirty and not self.plan():
+            return []
+        g = self.g
+        cols = self.grid.cols
+        cost = self.grid.cost
+        current = self._index(self.start)
+        goal = self._index(self.end)
+        if g[current] == float('inf'):
+            return []
+
+        path = [self.start]
+        seen = {current}
+        while current != goal:
+            best = None
+            best_value = float('inf')
+            for neighbor, move_cost in self._neighbors(current):
+                value = move_cost * cost[neighbor] + g[neighbor]
+                if value < best_value:
+                    best, best_value = neighbor, value
+            if best is None or best in seen:
+                return []
+            seen.add(best)
+            current = best
+            path.append(divmod(current, cols))
+        return path
+
+    def came_from_dict(self):
+        """Cadeia {nó: nó_anterior} no formato de `reconstruct_path`."""
+        path = self.path()
+        if not path:
+            return None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from
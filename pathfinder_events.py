@@ -0,0 +1,118 @@
+import json
+
+from pathfinder import Grid, SearchEngine, heuristic
+
+#-- Fluxo de eventos da busca --
+# Em vez de devolver os conjuntos aberto e fechado inteiros a cada passo, a
+# busca é descrita por eventos pequenos, um por expansão:
+#
+#     {"closed": idx, "opened": [idx, ...], "updated": [idx, ...],
+#      "g": ..., "f": ..., "expansions": n, "open_set_size": n}
+#
+# com os índices planos (r * cols + c) do nó expandido, dos nós que entraram
+# no conjunto aberto pela primeira vez e dos que já estavam nele (ou tinham
+# sido fechados) e receberam um custo melhor. O último evento traz só
+# {"path": [[r, c], ...]} ou {"path": false}.
+#
+# Os eventos podem ser gravados num arquivo JSON Lines (a primeira linha é
+# um cabeçalho com o labirinto) e reproduzidos depois sem refazer a busca.
+
+FORMAT_VERSION = 1
+
+# Situação de cada célula durante a busca
+_UNSEEN, _OPEN, _CLOSED = 0, 1, 2
+
+def search_events(grid, start, end, h=None):
+    """
+    Executa o A* do `SearchEngine` gerando um evento por expansão.
+
+    Argumentos:
+        grid (Grid): O labirinto.
+        start, end (tuple): Células de início e fim.
+        h (callable | None): Heurística alternativa, como em `SearchEngine.search`.
+
+    Retorna:
+        generator: Os eventos descritos no cabeçalho do módulo.
+    """
+    engine = SearchEngine(grid)
+    status = bytearray(grid.rows * grid.cols)
+    opened = []
+    updated = []
+    expanded = []
+    open_count = 0
+
+    def on_push(idx, g, f):
+        nonlocal open_count
+        state = status[idx]
+        if state == _UNSEEN:
+            opened.append(idx)
+        else:
+            updated.append(idx)
+        if state != _OPEN:
+            status[idx] = _OPEN
+            open_count += 1
+
+    def on_expand(idx, g):
+        nonlocal open_count
+        status[idx] = _CLOSED
+        open_count -= 1
+        expanded.append((idx, g))
+
+    engine.begin(start, end, on_expand=on_expand, on_push=on_push)
+    # O push inicial de `start` acontece em `begin`; ele sai no primeiro evento
+    found = None
+    while found is None:
+        found = engine.run(max_expansions=1)
+        if expanded:
+            idx, g = expanded.pop()
+            f = g + (heuristic(divmod(idx, grid.cols), end) if h is None else h(idx))
+            yield {
+                "closed": idx,
+                "opened": opened,
+                "updated": updated,
+                "g": g,
+                "f": f,
+                "expansions": engine.stats.expansions,
+                "open_set_size": open_count,
+            }
+            opened = []
+            updated = []
+    yield {"path": [list(node) for node in engine.path()] if found else False}
+
+def record_events(events, filename, grid):
+    """
+    Repassa `events` adiante gravando cada um em `filename` (JSON Lines).
+    O arquivo é fechado quando o fluxo termina ou o gerador é descartado.
+    """
+    with open(filename, "w") as f:
+        header = {"version": FORMAT_VERSION, "rows": grid.rows, "cols": grid.cols,
+                  "maze": grid.to_maze()}
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        for event in events:
+            f.write(json.dumps(event, separators=(",", ":")) + "\n")
+            yield event
+
+def read_events(filename):
+    """
+    Abre um arquivo gravado por `record_events`.
+
+    Retorna:
+        tuple: (grid, eventos), com os eventos lidos sob demanda.
+
+    Levanta:
+        ValueError: Se o arquivo for de outra versão do formato.
+    """
+    f = open(filename)
+    header = json.loads(f.readline())
+    if header.get("version") != FORMAT_VERSION:
+        f.close()
+        raise ValueError(f"Versão de registro de eventos não suportada: {header.get('version')}")
+    grid = Grid.from_maze(header["maze"])
+
+    def events():
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    return grid, events()
@@ -0,0 +1,102 @@
+from array import array
+from collections import OrderedDict
+
+from pathfinder import Grid, MOVES, distance_field
+
+#-- Campo de fluxo (flow field) para muitos inícios e um só objetivo --
+# Um único Dijkstra reverso a partir de 'E' dá, para cada célula, o custo até
+# 'E' e a direção do próximo passo. Qualquer agente lê o seu caminho seguindo
+# as direções, em O(tamanho do caminho) e sem nenhuma busca.
+
+# Código da direção (índice em MOVES) para cada deslocamento (dr, dc)
+_DIRECTION_CODES = {(dr, dc): code for code, (dr, dc, _) in enumerate(MOVES)}
+
+class FlowField:
+    """
+    Campo de distâncias até `goal` com a direção do próximo passo.
+
+    Atributos:
+        dist (array('f')): Custo de cada célula até o objetivo (inf se
+                           inalcançável).
+        direction (array('b')): Índice em MOVES do próximo passo (-1 no
+                                objetivo e nas células inalcançáveis).
+        version (int): `grid.version` no momento do cálculo.
+    """
+
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = tuple(goal)
+        self.version = grid.version
+        cols = grid.cols
+        dist, parent = distance_field(grid, goal, reverse=True)
+        self.dist = array("f", dist)
+        direction = array("b", [-1]) * len(parent)
+        codes = _DIRECTION_CODES
+        for idx, next_idx in enumerate(parent):
+            if next_idx != -1:
+                r, c = divmod(idx, cols)
+                nr, nc = divmod(next_idx, cols)
+                direction[idx] = codes[(nr - r, nc - c)]
+        self.direction = direction
+
+    def is_valid(self):
+        """False se o grid mudou depois do cálculo."""
+        return self.version == self.grid.version
+
+    def cost_from(self, start):
+        """Custo do caminho de `start` até o objetivo (inf se não houver)."""
+        return self.dist[start[0] * self.grid.cols + start[1]]
+
+    def path_from(self, start):
+        """
+        Caminho [(linha, coluna), ...] de `start` até o objetivo, seguindo o
+        campo. Retorna [] se o objetivo for inalcançável a partir de `start`.
+        """
+        if self.cost_from(start) == float('inf'):
+            return []
+        direction = self.direction
+        cols = self.grid.cols
+        r, c = start
+        path = [(r, c)]
+        code = direction[r * cols + c]
+        while code != -1:
+            dr, dc, _ = MOVES[code]
+            r += dr
+            c += dc
+            path.append((r, c))
+            code = direction[r * cols + c]
+        return path
+
+class FlowFieldCache:
+    """
+    Campos de fluxo guardados por (versão do grid, objetivo), com no máximo
+    `max_fields` campos (o menos usado recentemente sai primeiro). Qualquer
+    `set_cell` no grid invalida todos os campos.
+    """
+
+    def __init__(self, maze, max_fields=16):
+        self.grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+        self.max_fields = max_fields
+        self._fields = OrderedDict()
+
+    def get(self, goal):
+        """Campo de fluxo até `goal`, recalculado se o grid mudou."""
+        grid = self.grid
+        key = (grid.version, tuple(goal))
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        # Campos de versões antigas nunca mais serão usados
+        for old_key in [k for k in self._fields if k[0] != grid.version]:
+            del self._fields[old_key]
+        field = FlowField(grid, goal)
+        self._fields[key] = field
+        while len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def path(self, start, goal):
+        """Caminho de `start` até `goal` pelo campo em cache."""
+        return self.get(goal).path_from(start)
@@ -1,9 +1,12 @@
+import argparse
 import pygame
-import heapq
-import math
 import sys
 import time # Para medir o tempo de execução
 
+from pathfinder import Grid, find_start_and_end
+from pathfinder_bench import weighted_field
+from pathfinder_events import read_events, record_events, search_events
+
 # --- Constantes do Pygame ---
 # Cores (R, G, B)
 PRETO = (0, 0, 0)
@@ -23,134 +26,24 @@ TAMANHO_CELULA = 40 # Aumentado para melhor visualização
 MARGEM = 1 # Margem entre as células
 PAINEL_LARGURA = 250 # Largura do painel lateral de informações
 
-# --- Funções do A* (do pathfinder.py) ---
-# (Mantidas as mesmas do último commit, corrigido o bug do closed_set)
-
-def find_start_and_end(maze):
-    start = None
-    end = None
-    for r_idx, row in enumerate(maze):
-        for c_idx, cell in enumerate(row):
-            if cell == 'S':
-                start = (r_idx, c_idx)
-            elif cell == 'E':
-                end = (r_idx, c_idx)
-            if start and end:
-                return start, end
-    return start, end
-
-def heuristic(a, b):
-    (r1, c1) = a
-    (r2, c2) = b
-    dr = abs(r1 - r2)
-    dc = abs(c1 - c2)
-    D = 1
-    D2 = math.sqrt(2)
-    return D * (max(dr, dc) - min(dr, dc)) + D2 * min(dr, dc)
-
-def get_neighbors(maze, node):
-    neighbors = []
-    (r, c) = node
-    num_rows = len(maze)
-    num_cols = len(maze[0])
-    moves = [
-        (-1, 0, 1), (1, 0, 1), (0, -1, 1), (0, 1, 1),
-        (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)),
-        (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2))
-    ]
-    for dr, dc, move_cost in moves:
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < num_rows and 0 <= nc < num_cols:
-            if maze[nr][nc] != 1:
-                neighbors.append(((nr, nc), move_cost))
-    return neighbors
-
-def get_terrain_cost(cell_value):
-    if cell_value in ('S', 'E', 0):
-        return 1
-    if isinstance(cell_value, int):
-        return cell_value
-    return float('inf')
-
-def reconstruct_path(came_from, current):
-    path = []
-    while current in came_from:
-        path.append(current)
-        current = came_from[current]
-        if current is None:
-            break
-    return path[::-1]
-
-# --- Função A* como Gerador (Generator) ---
-# Retorna mais informações para a GUI
-def a_star_search_realtime(maze, start, end):
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    
-    came_from = {start: None}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, end)}
-    
-    open_set_hash = {start}
-    closed_set_hash = set()
-    
-    # Adicionando contadores para estatísticas
-    nodes_visited_count = 0
-    current_node_f = 0
-    current_node_g = 0
-    
-    while open_set:
-        # Atualiza informações do nó atual para exibição
-        current_f, current = open_set[0] # Pega o próximo a ser processado (sem tirar da heap)
-        current_node_f = f_score.get(current, float('inf'))
-        current_node_g = g_score.get(current, float('inf'))
-
-        yield {
-            "open_set": open_set_hash,
-            "closed_set": closed_set_hash,
-            "nodes_visited": nodes_visited_count,
-            "open_set_size": len(open_set),
-            "current_f_score": current_node_f,
-            "current_g_score": current_node_g,
-            "path": None # Por enquanto o caminho final é None
-        }
-        
-        current = heapq.heappop(open_set)[1]
-        open_set_hash.remove(current)
-        closed_set_hash.add(current)
-        nodes_visited_count += 1
-        
-        if current == end:
-            path = reconstruct_path(came_from, current)
-            yield {
-                "open_set": open_set_hash,
-                "closed_set": closed_set_hash,
-                "nodes_visited": nodes_visited_count,
-                "open_set_size": len(open_set),
-                "current_f_score": f_score.get(current, float('inf')),
-                "current_g_score": g_score.get(current, float('inf')),
-                "path": path # Caminho final
-            }
-            return
-
-        for neighbor, move_cost in get_neighbors(maze, current):
-            terrain_cost = get_terrain_cost(maze[neighbor[0]][neighbor[1]])
-            step_cost = move_cost * terrain_cost
-            tentative_g_score = g_score[current] + step_cost
-            
-            if tentative_g_score < g_score.get(neighbor, float('inf')):
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, end)
-                
-                if neighbor not in open_set_hash:
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-                    open_set_hash.add(neighbor)
-
-    yield {"path": None, "nodes_visited": nodes_visited_count, "open_set_size": len(open_set)}
-    return
-
 # --- Funções de Desenho do Pygame ---
+# O terreno é desenhado uma única vez numa superfície em cache; a cada quadro
+# só as células que mudaram de estado são repintadas e só os retângulos
+# alterados são enviados para a tela com `pygame.display.update(rects)`.
+# Labirintos grandes usam células menores (até CELULA_MINIMA pixels, sem
+# margem) e, se ainda não couberem, uma janela de visualização que as setas
+# do teclado deslocam.
+
+LARGURA_MAXIMA = 1000 # Área máxima do labirinto na tela, em pixels
+ALTURA_MAXIMA = 800
+CELULA_MINIMA = 1 # Menor tamanho de célula antes de recorrer à janela de visualização
+CELULA_TEXTO = 20 # Tamanho mínimo de célula para escrever o custo do terreno
+MAX_RETANGULOS = 512 # Acima disso, atualiza a área do labirinto inteira de uma vez
+MATRIZ_MAXIMA = 15 # Maior lado do labirinto exibido como texto no painel
+
+# Estados de célula pintados por cima do terreno
+TERRENO, ABERTO, FECHADO, CAMINHO = 0, 1, 2, 3
+CORES_ESTADO = {ABERTO: TURQUESA, FECHADO: CINZA_ESCURO, CAMINHO: LARANJA}
 
 def get_color_for_cell(cell_value):
     if cell_value == 'S':
@@ -159,190 +52,339 @@ def get_color_for_cell(cell_value):
         return VERDE
     if cell_value == 1:
         return VERMELHO
-    if cell_value == 5:
-        return MARROM
+    if cell_value != 0:
+        return MARROM # Terreno difícil (qualquer custo diferente de 1)
     return BRANCO
 
-def draw_grid(screen, maze, offset_x=0, offset_y=0):
-    num_rows = len(maze)
-    num_cols = len(maze[0])
-    
-    for r in range(num_rows):
-        for c in range(num_cols):
-            color = get_color_for_cell(maze[r][c])
-            pygame.draw.rect(screen, color,
-                             [(MARGEM + TAMANHO_CELULA) * c + MARGEM + offset_x,
-                              (MARGEM + TAMANHO_CELULA) * r + MARGEM + offset_y,
-                              TAMANHO_CELULA,
-                              TAMANHO_CELULA])
-            # (NOVO) Desenhar texto da célula se for 0 ou 5
-            if maze[r][c] in (0, 5):
-                font = pygame.font.SysFont("Arial", 12)
-                text_surface = font.render(str(maze[r][c]), True, PRETO)
-                text_rect = text_surface.get_rect(center=((MARGEM + TAMANHO_CELULA) * c + MARGEM + offset_x + TAMANHO_CELULA // 2,
-                                                          (MARGEM + TAMANHO_CELULA) * r + MARGEM + offset_y + TAMANHO_CELULA // 2))
-                screen.blit(text_surface, text_rect)
-
-
-def draw_state(screen, state_data, start, end, offset_x=0, offset_y=0):
-    if "closed_set" in state_data:
-        for (r, c) in state_data["closed_set"]:
-            if (r, c) != start and (r, c) != end:
-                pygame.draw.rect(screen, CINZA_ESCURO,
-                                 [(MARGEM + TAMANHO_CELULA) * c + MARGEM + offset_x,
-                                  (MARGEM + TAMANHO_CELULA) * r + MARGEM + offset_y,
-                                  TAMANHO_CELULA,
-                                  TAMANHO_CELULA])
-
-    if "open_set" in state_data:
-        for (r, c) in state_data["open_set"]:
-            if (r, c) != start:
-                pygame.draw.rect(screen, TURQUESA,
-                                 [(MARGEM + TAMANHO_CELULA) * c + MARGEM + offset_x,
-                                  (MARGEM + TAMANHO_CELULA) * r + MARGEM + offset_y,
-                                  TAMANHO_CELULA,
-                                  TAMANHO_CELULA])
-
-def draw_final_path(screen, path, start, end, offset_x=0, offset_y=0):
-    for (r, c) in path:
-        if (r, c) != start and (r, c) != end:
-            pygame.draw.rect(screen, LARANJA,
-                             [(MARGEM + TAMANHO_CELULA) * c + MARGEM + offset_x,
-                              (MARGEM + TAMANHO_CELULA) * r + MARGEM + offset_y,
-                              TAMANHO_CELULA,
-                              TAMANHO_CELULA])
-
-def draw_info_panel(screen, maze, state_data, start_time, total_time, final_path, font):
-    """Desenha o painel lateral com informações."""
-    
-    # Posição inicial do painel
-    panel_x = (len(maze[0]) * (TAMANHO_CELULA + MARGEM) + MARGEM) + 10 # 10 pixels de margem
-    y_offset = 10
-    
-    # Título
-    title_surface = font.render("A* PathFinder Info", True, AMARELO)
-    screen.blit(title_surface, (panel_x, y_offset))
-    y_offset += 30
-
-    # Labirinto (visualização textual)
-    maze_text_title = font.render("Maze Matrix:", True, BRANCO)
-    screen.blit(maze_text_title, (panel_x, y_offset))
-    y_offset += 20
-    
-    for row in maze:
-        row_str = " ".join(map(str, row))
-        row_surface = font.render(row_str, True, CINZA)
-        screen.blit(row_surface, (panel_x, y_offset))
-        y_offset += 18
-    y_offset += 10
-    
+class TextCache:
+    """Fontes e textos já renderizados, reaproveitados entre quadros."""
+
+    def __init__(self, max_surfaces=4096):
+        self.max_surfaces = max_surfaces
+        self._fonts = {}
+        self._surfaces = {}
+
+    def font(self, size, name="Arial"):
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = self._fonts[key] = pygame.font.SysFont(name, size)
+        return font
+
+    def render(self, text, color, size=16):
+        key = (text, color, size)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.max_surfaces:
+                self._surfaces.clear()
+            surface = self._surfaces[key] = self.font(size).render(text, True, color)
+        return surface
+
+class GridRenderer:
+    """
+    Desenha um `Grid` dentro de `area` (pygame.Rect) na tela.
+
+    Argumentos:
+        screen (pygame.Surface): A tela.
+        grid (Grid): O labirinto.
+        area (pygame.Rect): Região da tela reservada para o labirinto.
+        text_cache (TextCache): Cache de fontes e textos.
+
+    O estado de cada célula (TERRENO, ABERTO, FECHADO ou CAMINHO) fica em
+    `state`; `set_cell_state` só repinta quando o estado muda, e `flush`
+    envia à tela apenas os retângulos sujos.
+    """
+
+    def __init__(self, screen, grid, area, text_cache):
+        self.screen = screen
+        self.grid = grid
+        self.area = area
+        self.text_cache = text_cache
+        fit = min(area.width // grid.cols, area.height // grid.rows)
+        self.cell = max(CELULA_MINIMA, min(TAMANHO_CELULA, fit))
+        self.margin = MARGEM if self.cell >= 8 else 0
+        self.pitch = self.cell + self.margin
+        self.view_rows = min(grid.rows, (area.height - self.margin) // self.pitch)
+        self.view_cols = min(grid.cols, (area.width - self.margin) // self.pitch)
+        self.top = 0
+        self.left = 0
+        self.state = bytearray(grid.rows * grid.cols)
+        self.dirty = []
+        self.terrain = None
+        self._pixels = None
+
+    def is_viewport(self):
+        """True se o labirinto não cabe inteiro na área (há rolagem)."""
+        return self.view_rows < self.grid.rows or self.view_cols < self.grid.cols
+
+    def _render_terrain(self):
+        """Pré-renderiza o terreno da janela de visualização numa superfície."""
+        grid = self.grid
+        cell = self.cell
+        margin = self.margin
+        pitch = self.pitch
+        rows = range(self.top, self.top + self.view_rows)
+        cols = range(self.left, self.left + self.view_cols)
+        width = self.view_cols * pitch + margin
+        height = self.view_rows * pitch + margin
+
+        if margin:
+            # Poucas células grandes: retângulos com margem e o custo escrito
+            surface = pygame.Surface((width, height))
+            surface.fill(PRETO)
+            for y, r in enumerate(rows):
+                for x, c in enumerate(cols):
+                    value = grid.cell_value(r, c)
+                    rect = pygame.Rect(x * pitch + margin, y * pitch + margin, cell, cell)
+                    surface.fill(get_color_for_cell(value), rect)
+                    if cell >= CELULA_TEXTO and value not in ('S', 'E', 1):
+                        text = self.text_cache.render(str(value), PRETO, 12)
+                        surface.blit(text, text.get_rect(center=rect.center))
+        else:
+            # Muitas células pequenas: a imagem do grid inteiro, um pixel por
+            # célula, é feita uma só vez; a janela recorta e amplia um trecho
+            if self._pixels is None:
+                self._pixels = self._render_pixels()
+            view = self._pixels.subsurface((self.left, self.top, self.view_cols, self.view_rows))
+            surface = pygame.transform.scale(view, (width, height))
+        self.terrain = surface
+
+    def _render_pixels(self):
+        """Imagem do grid com um pixel por célula, montada linha a linha."""
+        grid = self.grid
+        cols = grid.cols
+        colors = {}
+        for value in set(grid.cost):
+            # Células bloqueadas têm custo inf
+            colors[value] = bytes(VERMELHO if value == float('inf') else
+                                  get_color_for_cell(0 if value == 1 else value))
+        cost = grid.cost
+        pixels = bytearray()
+        for r in range(grid.rows):
+            base = r * cols
+            pixels += b"".join([colors[value] for value in cost[base:base + cols]])
+        for node, color in ((grid.start, AZUL), (grid.end, VERDE)):
+            if node is not None:
+                offset = (node[0] * cols + node[1]) * 3
+                pixels[offset:offset + 3] = bytes(color)
+        return pygame.image.frombuffer(bytes(pixels), (cols, grid.rows), "RGB")
+
+    def cell_rect(self, r, c):
+        """Retângulo da célula (r, c) na tela (a célula deve estar visível)."""
+        return pygame.Rect(self.area.x + (c - self.left) * self.pitch + self.margin,
+                           self.area.y + (r - self.top) * self.pitch + self.margin,
+                           self.cell, self.cell)
+
+    def is_visible(self, r, c):
+        return (self.top <= r < self.top + self.view_rows and
+                self.left <= c < self.left + self.view_cols)
+
+    def _paint(self, r, c):
+        rect = self.cell_rect(r, c)
+        kind = self.state[r * self.grid.cols + c]
+        if kind == TERRENO or (r, c) == self.grid.start or (r, c) == self.grid.end:
+            self.screen.blit(self.terrain, rect, rect.move(-self.area.x, -self.area.y))
+        else:
+            self.screen.fill(CORES_ESTADO[kind], rect)
+        self.dirty.append(rect)
+
+    def set_cell_state(self, r, c, kind):
+        """Muda o estado de uma célula, repintando-a se estiver visível."""
+        self.set_index_state(r * self.grid.cols + c, kind)
+
+    def set_index_state(self, idx, kind):
+        """Como `set_cell_state`, pelo índice plano da célula."""
+        if self.state[idx] == kind:
+            return
+        self.state[idx] = kind
+        r, c = divmod(idx, self.grid.cols)
+        if self.is_visible(r, c):
+            self._paint(r, c)
+
+    def apply_event(self, event):
+        """Aplica um evento de `search_events` (nó fechado e nós abertos)."""
+        set_index_state = self.set_index_state
+        for idx in event["opened"]:
+            set_index_state(idx, ABERTO)
+        for idx in event["updated"]:
+            set_index_state(idx, ABERTO)
+        set_index_state(event["closed"], FECHADO)
+
+    def clear_state(self):
+        """Volta todas as células ao terreno e redesenha."""
+        self.state = bytearray(len(self.state))
+        self.draw()
+
+    def draw(self):
+        """Redesenha a janela inteira: terreno em cache mais os estados."""
+        if self.terrain is None:
+            self._render_terrain()
+        self.screen.fill(PRETO, self.area)
+        self.screen.blit(self.terrain, self.area.topleft)
+        state = self.state
+        cols = self.grid.cols
+        for r in range(self.top, self.top + self.view_rows):
+            base = r * cols
+            for c in range(self.left, self.left + self.view_cols):
+                if state[base + c]:
+                    self._paint(r, c)
+        self.dirty = [self.area]
+
+    def scroll(self, dr, dc):
+        """Desloca a janela de visualização em (dr, dc) células."""
+        top = min(max(self.top + dr, 0), self.grid.rows - self.view_rows)
+        left = min(max(self.left + dc, 0), self.grid.cols - self.view_cols)
+        if (top, left) != (self.top, self.left):
+            self.top = top
+            self.left = left
+            self.terrain = None
+            self.draw()
+
+    def flush(self):
+        """Envia à tela só os retângulos alterados desde o último `flush`."""
+        if not self.dirty:
+            return
+        if len(self.dirty) > MAX_RETANGULOS:
+            # A área inteira cobre as células; os retângulos fora dela (o
+            # painel lateral) continuam sendo enviados
+            area = self.area
+            pygame.display.update([area] + [rect for rect in self.dirty
+                                             if not area.contains(rect)])
+        else:
+            pygame.display.update(self.dirty)
+        self.dirty = []
+
+def draw_info_panel(screen, rect, grid, state_data, start_time, total_time, final_path, text_cache,
+                    steps_per_frame=1):
+    """Desenha o painel lateral com informações e retorna o retângulo alterado."""
+    screen.fill(PRETO, rect)
+    panel_x = rect.x + 10 # 10 pixels de margem
+    y_offset = rect.y + 10
+
+    def line(text, color, height):
+        nonlocal y_offset
+        screen.blit(text_cache.render(text, color), (panel_x, y_offset))
+        y_offset += height
+
+    line("A* PathFinder Info", AMARELO, 30)
+
+    # Labirinto (visualização textual), só para labirintos pequenos
+    if grid.rows <= MATRIZ_MAXIMA and grid.cols <= MATRIZ_MAXIMA:
+        line("Maze Matrix:", BRANCO, 20)
+        for row in grid.to_maze():
+            line(" ".join(map(str, row)), CINZA, 18)
+        y_offset += 10
+    else:
+        line(f"Maze: {grid.rows} x {grid.cols}", BRANCO, 30)
+
     # Tempo de Execução
     if final_path:
-        time_str = f"Time: {total_time:.4f}s"
+        line(f"Time: {total_time:.4f}s", BRANCO, 30)
     else:
-        time_str = f"Time: {time.time() - start_time:.4f}s (running)"
-    time_surface = font.render(time_str, True, BRANCO)
-    screen.blit(time_surface, (panel_x, y_offset))
-    y_offset += 30
-    
-    # Nós Visitados
-    nodes_visited_str = f"Nodes Visited: {state_data.get('nodes_visited', 0)}"
-    nodes_visited_surface = font.render(nodes_visited_str, True, BRANCO)
-    screen.blit(nodes_visited_surface, (panel_x, y_offset))
-    y_offset += 25
-
-    # Open Set Size
-    open_set_size_str = f"Open Set Size: {state_data.get('open_set_size', 0)}"
-    open_set_size_surface = font.render(open_set_size_str, True, BRANCO)
-    screen.blit(open_set_size_surface, (panel_x, y_offset))
-    y_offset += 25
+        line(f"Time: {time.time() - start_time:.4f}s (running)", BRANCO, 30)
+
+    line(f"Nodes Visited: {state_data.get('nodes_visited', 0)}", BRANCO, 25)
+    line(f"Open Set Size: {state_data.get('open_set_size', 0)}", BRANCO, 25)
+    line(f"Steps/Frame: {steps_per_frame}", BRANCO, 25)
 
     # Current Node Scores (se estiver explorando)
     if state_data.get('path') is None: # Se ainda não encontrou o caminho final
-        current_f = state_data.get('current_f_score', 0)
-        current_g = state_data.get('current_g_score', 0)
-        
-        f_score_str = f"Current F: {current_f:.2f}"
-        g_score_str = f"Current G: {current_g:.2f}"
-        
-        f_surface = font.render(f_score_str, True, CINZA)
-        screen.blit(f_surface, (panel_x, y_offset))
-        y_offset += 25
-        
-        g_surface = font.render(g_score_str, True, CINZA)
-        screen.blit(g_surface, (panel_x, y_offset))
-        y_offset += 25
-    
+        line(f"Current F: {state_data.get('current_f_score', 0):.2f}", CINZA, 25)
+        line(f"Current G: {state_data.get('current_g_score', 0):.2f}", CINZA, 25)
+
     # Status
     status_str = "Status: Exploring..."
     if final_path:
         status_str = "Status: Path Found!"
     elif state_data.get('path') is False: # Se o A* indicou explicitamente que não há caminho
         status_str = "Status: No Solution!"
-    
-    status_surface = font.render(status_str, True, BRANCO)
-    screen.blit(status_surface, (panel_x, y_offset))
-    y_offset += 30
+    line(status_str, BRANCO, 30)
 
     # Controles
-    controls_title = font.render("Controls:", True, AMARELO)
-    screen.blit(controls_title, (panel_x, y_offset))
-    y_offset += 25
-    
-    controls_q = font.render("Q: Quit", True, CINZA)
-    screen.blit(controls_q, (panel_x, y_offset))
-    y_offset += 20
-    
-    controls_r = font.render("R: Restart", True, CINZA)
-    screen.blit(controls_r, (panel_x, y_offset))
-    y_offset += 20
-    
-    
+    line("Controls:", AMARELO, 25)
+    line("Q: Quit", CINZA, 20)
+    line("R: Restart", CINZA, 20)
+    line("F: Fast-forward", CINZA, 20)
+    line("+/-: Speed", CINZA, 20)
+    line("Arrows: Scroll", CINZA, 20)
+    return rect
+
+
 # --- Função Principal (Main Loop) ---
 
-def main():
-    labirinto_exemplo = [
-        ['S', 0, 1, 0, 0],
-        [0, 0, 1, 0, 1],
-        [1, 5, 5, 5, 0], # Terreno difícil
-        [1, 0, 0, 'E', 1],
-        [0, 0, 0, 0, 0],
-        [0, 1, 0, 1, 0],
-        [0, 0, 0, 0, 0]
-    ]
-
-    num_rows = len(labirinto_exemplo)
-    num_cols = len(labirinto_exemplo[0])
-    
-    start_node, end_node = find_start_and_end(labirinto_exemplo)
-    
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Visualização do A* com Pygame.")
+    parser.add_argument("--size", type=int, default=None,
+                        help="Gera um labirinto N x N com terreno variado em vez do exemplo.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", type=int, default=1,
+                        help="Expansões por quadro.")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Em vez de --steps, expande enquanto couber neste tempo por quadro.")
+    parser.add_argument("--fps", type=int, default=5)
+    parser.add_argument("--record", help="Grava os eventos da busca neste arquivo.")
+    parser.add_argument("--replay", help="Reproduz um arquivo gravado com --record.")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        labirinto, eventos = read_events(args.replay)
+    elif args.size:
+        labirinto = weighted_field(args.size, args.size, seed=args.seed)
+    else:
+        labirinto = Grid.from_maze([
+            ['S', 0, 1, 0, 0],
+            [0, 0, 1, 0, 1],
+            [1, 5, 5, 5, 0], # Terreno difícil
+            [1, 0, 0, 'E', 1],
+            [0, 0, 0, 0, 0],
+            [0, 1, 0, 1, 0],
+            [0, 0, 0, 0, 0]
+        ])
+
+    start_node, end_node = find_start_and_end(labirinto)
+
     if not start_node or not end_node:
         print("Erro: 'S' ou 'E' não encontrado.")
         return
 
+    if not args.replay:
+        eventos = search_events(labirinto, start_node, end_node)
+        if args.record:
+            eventos = record_events(eventos, args.record, labirinto)
+
     pygame.init()
     pygame.font.init() # Inicializa o módulo de fontes
 
-    # Define o tamanho da tela (largura do labirinto + largura do painel)
-    largura_labirinto = num_cols * (TAMANHO_CELULA + MARGEM) + MARGEM
-    altura_total = num_rows * (TAMANHO_CELULA + MARGEM) + MARGEM
-    
+    # Define o tamanho da tela (área do labirinto + largura do painel)
+    fit = min(LARGURA_MAXIMA // labirinto.cols, ALTURA_MAXIMA // labirinto.rows)
+    cell = max(CELULA_MINIMA, min(TAMANHO_CELULA, fit))
+    pitch = cell + (MARGEM if cell >= 8 else 0)
+    largura_labirinto = min(labirinto.cols * pitch + MARGEM, LARGURA_MAXIMA)
+    altura_total = min(labirinto.rows * pitch + MARGEM, ALTURA_MAXIMA)
+
     largura_total = largura_labirinto + PAINEL_LARGURA
     screen = pygame.display.set_mode((largura_total, altura_total))
     pygame.display.set_caption("A* PathFinder - Visualização Detalhada")
-    
-    font = pygame.font.SysFont("Arial", 16) # Fonte para o texto do painel
 
-    a_star_generator = a_star_search_realtime(labirinto_exemplo, start_node, end_node)
-    
+    text_cache = TextCache()
+    renderer = GridRenderer(screen, labirinto, pygame.Rect(0, 0, largura_labirinto, altura_total),
+                            text_cache)
+    panel_rect = pygame.Rect(largura_labirinto, 0, PAINEL_LARGURA, altura_total)
+
     running = True
     clock = pygame.time.Clock()
-    
+
     final_path = None
     explorando = True
+    avancar_ate_o_fim = False
+    passos_por_quadro = max(1, args.steps)
     start_time = time.time() # Inicia o contador de tempo
     total_time = 0
-    current_state_data = {} # Para armazenar o último estado do gerador
+    current_state_data = {} # Resumo do último evento, para o painel
+
+    screen.fill(PRETO)
+    renderer.draw()
+    pygame.display.flip()
 
     # --- Loop Principal ---
     while running:
@@ -353,51 +395,77 @@ def main():
                 if event.key == pygame.K_q:
                     running = False
                 if event.key == pygame.K_r:
-                    main() # Reinicia a simulação
+                    main(argv) # Reinicia a simulação
                     return
-
-        # Lógica de atualização
+                if event.key == pygame.K_f:
+                    avancar_ate_o_fim = True
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    passos_por_quadro *= 2
+                if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    passos_por_quadro = max(1, passos_por_quadro // 2)
+                step = max(1, renderer.view_rows // 4)
+                if event.key == pygame.K_UP:
+                    renderer.scroll(-step, 0)
+                if event.key == pygame.K_DOWN:
+                    renderer.scroll(step, 0)
+                if event.key == pygame.K_LEFT:
+                    renderer.scroll(0, -step)
+                if event.key == pygame.K_RIGHT:
+                    renderer.scroll(0, step)
+
+        # Lógica de atualização: várias expansões por quadro, limitadas pela
+        # quantidade de passos ou pelo tempo disponível
         if explorando:
-            try:
-                current_state_data = next(a_star_generator)
-                
-                # Se o gerador retornou um caminho, o algoritmo terminou
-                if current_state_data.get("path") is not None:
-                    final_path = current_state_data["path"]
+            if args.budget_ms is not None:
+                limite = time.perf_counter() + args.budget_ms / 1000
+            passos = 0
+            for evento in eventos:
+                if "path" in evento:
                     explorando = False
                     total_time = time.time() - start_time # Finaliza o tempo
-                    if final_path is None: # Se "path" é explicitamente None, não há solução
-                        print("Sem solução encontrada!")
-                    else:
+                    current_state_data["path"] = evento["path"]
+                    if evento["path"]:
+                        final_path = [tuple(node) for node in evento["path"]]
                         print(f"Caminho encontrado em {total_time:.4f} segundos!")
-
-            except StopIteration:
+                    else:
+                        print("Sem solução encontrada!")
+                    break
+                renderer.apply_event(evento)
+                current_state_data = {
+                    "nodes_visited": evento["expansions"],
+                    "open_set_size": evento["open_set_size"],
+                    "current_f_score": evento["f"],
+                    "current_g_score": evento["g"],
+                    "path": None,
+                }
+                passos += 1
+                if avancar_ate_o_fim:
+                    continue
+                if args.budget_ms is not None:
+                    if time.perf_counter() >= limite:
+                        break
+                elif passos >= passos_por_quadro:
+                    break
+            else:
                 explorando = False
-                total_time = time.time() - start_time
-                if final_path is None: # Se o gerador parou e não encontrou caminho
-                    print("Sem solução encontrada!")
-        
-        # Lógica de desenho
-        screen.fill(PRETO) # Limpa a tela
-        
-        # Desenha o labirinto (com offset para o painel de info)
-        draw_grid(screen, labirinto_exemplo) 
-        
-        if explorando:
-            draw_state(screen, current_state_data, start_node, end_node)
-        
-        if final_path:
-            draw_final_path(screen, final_path, start_node, end_node)
+
+            # Com o caminho encontrado, só ele fica pintado
+            if final_path:
+                renderer.clear_state()
+                for (r, c) in final_path:
+                    renderer.set_cell_state(r, c, CAMINHO)
 
         # Desenha o painel de informações
-        draw_info_panel(screen, labirinto_exemplo, current_state_data, start_time, total_time, final_path, font)
+        renderer.dirty.append(draw_info_panel(screen, panel_rect, labirinto, current_state_data,
+                                              start_time, total_time, final_path, text_cache,
+                                              passos_por_quadro))
 
-        pygame.display.flip()
-        clock.tick(5) # Velocidade da simulação (15 FPS)
+        renderer.flush()
+        clock.tick(args.fps) # Velocidade da simulação (quadros por segundo)
 
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
 
-    main()
\ No newline at end of file
+    main()
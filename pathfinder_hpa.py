@@ -0,0 +1,466 @@
+import heapq
+import pickle
+
+from pathfinder import Grid, MOVES, SQRT2, heuristic
+
+#-- Busca hierárquica (HPA*) --
+# O grid é dividido em clusters de `cluster_size` x `cluster_size` células.
+# Em cada fronteira entre clusters vizinhos são escolhidas células de
+# transição (entradas); o grafo abstrato liga as entradas de um mesmo cluster
+# pelo custo do menor caminho interno e as entradas de clusters vizinhos pelo
+# custo do passo que atravessa a fronteira. Uma consulta busca nesse grafo
+# pequeno e só depois refina, cluster a cluster, o caminho escolhido.
+
+# Segmentos de entrada com este comprimento ou mais ganham duas transições
+# (uma em cada ponta) em vez de uma só no meio
+LONG_ENTRANCE = 6
+
+FORMAT_VERSION = 1
+
+def _local_dijkstra(grid, bounds, source, target=-1, reverse=False):
+    """
+    Dijkstra restrito a um retângulo do grid.
+
+    Argumentos:
+        grid (Grid): O labirinto.
+        bounds (tuple): (r0, r1, c0, c1), limites semiabertos do retângulo.
+        source (int): Índice plano de origem.
+        target (int): Se informado, para assim que este índice sai da heap.
+        reverse (bool): Calcula o custo de cada célula ATÉ `source`
+                        (o custo de terreno é cobrado ao entrar na célula).
+
+    Retorna:
+        tuple: (dist, parent), dicionários indexados pelo índice plano.
+    """
+    r0, r1, c0, c1 = bounds
+    cols = grid.cols
+    passable = grid.passable
+    cost = grid.cost
+    dist = {source: 0.0}
+    parent = {source: -1}
+    open_set = [(0.0, source)]
+    while open_set:
+        d, u = heapq.heappop(open_set)
+        if d > dist[u]:
+            continue
+        if u == target:
+            break
+        r, c = divmod(u, cols)
+        for dr, dc, move_cost in MOVES:
+            nr, nc = r + dr, c + dc
+            if not (r0 <= nr < r1 and c0 <= nc < c1):
+                continue
+            v = nr * cols + nc
+            if not passable[v]:
+                continue
+            nd = d + move_cost * (cost[u] if reverse else cost[v])
+            if nd < dist.get(v, float('inf')):
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(open_set, (nd, v))
+    return dist, parent
+
+class HierarchicalGraph:
+    """
+    Grafo abstrato do HPA* sobre um `Grid`, reaproveitável entre consultas.
+
+    Segue a interface dos motores de busca: `search(start, end)` retorna
+    True/False e o caminho refinado fica em `path()` / `came_from_dict()`.
+    `cost` guarda o custo do último caminho e `expansions` / `pushes` contam
+    o trabalho feito no grafo abstrato.
+
+    O caminho é quase ótimo (as transições representam segmentos inteiros de
+    fronteira), mas a busca é completa: se existe caminho no grid, existe
+    no grafo abstrato.
+
+    Levanta:
+        TypeError: Se o grid for esparso (`TiledGrid`): o grafo cobre o mundo
+                   inteiro.
+    """
+
+    def __init__(self, grid, cluster_size=10, build=True):
+        if getattr(grid, "sparse", False):
+            raise TypeError("HierarchicalGraph não aceita grids esparsos (TiledGrid): "
+                            "o grafo abstrato cobre o mundo inteiro.")
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.cluster_cols = -(-grid.cols // cluster_size)
+        # chave da fronteira -> lista de transições (a, b)
+        self.borders = {}
+        # cluster -> {nó: [(nó, custo), ...]} com os custos internos
+        self.intra = {}
+        # nó -> {nó vizinho em outro cluster: custo}
+        self.inter = {}
+        self._path = []
+        self.cost = None
+        self.expansions = 0
+        self.pushes = 0
+        # `grid.version` de quando a abstração foi construída
+        self._version = None
+        if build:
+            self.build()
+
+    # --- Geometria dos clusters ---
+
+    def cluster_of(self, idx):
+        r, c = divmod(idx, self.grid.cols)
+        return (r // self.cluster_size, c // self.cluster_size)
+
+    def _bounds(self, cluster):
+        k = self.cluster_size
+        cr, cc = cluster
+        return (cr * k, min((cr + 1) * k, self.grid.rows),
+                cc * k, min((cc + 1) * k, self.grid.cols))
+
+    def _border_keys(self, cluster):
+        """Chaves de todas as fronteiras (lados e cantos) que tocam o cluster."""
+        cr, cc = cluster
+        keys = [('h', cr, cc), ('h', cr - 1, cc), ('v', cr, cc), ('v', cr, cc - 1),
+                ('d', cr, cc), ('d', cr - 1, cc - 1), ('a', cr, cc - 1), ('a', cr - 1, cc)]
+        return [key for key in keys if self._border_clusters(key) is not None]
+
+    def _border_clusters(self, key):
+        """Os dois clusters separados pela fronteira, ou None se ela não existe."""
+        kind, cr, cc = key
+        if kind == 'h':
+            pair = ((cr, cc), (cr + 1, cc))
+        elif kind == 'v':
+            pair = ((cr, cc), (cr, cc + 1))
+        elif kind == 'd':
+            pair = ((cr, cc), (cr + 1, cc + 1))
+        else:
+            pair = ((cr, cc + 1), (cr + 1, cc))
+        for r, c in pair:
+            if not (0 <= r < self.cluster_rows and 0 <= c < self.cluster_cols):
+                return None
+        return pair
+
+    def _cluster_nodes(self, cluster):
+        """Células de transição (nós abstratos) que pertencem ao cluster."""
+        nodes = set()
+        for key in self._border_keys(cluster):
+            for a, b in self.borders.get(key, ()):
+                for idx in (a, b):
+                    if self.cluster_of(idx) == cluster:
+                        nodes.add(idx)
+        return sorted(nodes)
+
+    # --- Construção ---
+
+    def _build_border(self, key):
+        """Calcula as transições de uma fronteira."""
+        grid = self.grid
+        cols = grid.cols
+        passable = grid.passable
+        k = self.cluster_size
+        kind, cr, cc = key
+
+        if kind in ('d', 'a'):
+            r = (cr + 1) * k - 1
+            c = (cc + 1) * k - 1
+            if kind == 'd':
+                a, b = r * cols + c, (r + 1) * cols + c + 1
+            else:
+                a, b = r * cols + c + 1, (r + 1) * cols + c
+            return [(a, b)] if passable[a] and passable[b] else []
+
+        if kind == 'h':
+            ra = (cr + 1) * k - 1
+            c0, c1 = cc * k, min((cc + 1) * k, cols)
+            side_a = [ra * cols + c for c in range(c0, c1)]
+            side_b = [(ra + 1) * cols + c for c in range(c0, c1)]
+        else:
+            ca = (cc + 1) * k - 1
+            r0, r1 = cr * k, min((cr + 1) * k, grid.rows)
+            side_a = [r * cols + ca for r in range(r0, r1)]
+            side_b = [r * cols + ca + 1 for r in range(r0, r1)]
+
+        # Segmentos máximos onde as duas células frente a frente estão livres
+        length = len(side_a)
+        segment = [-1] * length
+        transitions = []
+        i = 0
+        while i < length:
+            if not (passable[side_a[i]] and passable[side_b[i]]):
+                i += 1
+                continue
+            j = i
+            while j + 1 < length and passable[side_a[j + 1]] and passable[side_b[j + 1]]:
+                j += 1
+            for t in range(i, j + 1):
+                segment[t] = i
+            if j - i + 1 >= LONG_ENTRANCE:
+                transitions.append((side_a[i], side_b[i]))
+                transitions.append((side_a[j], side_b[j]))
+            else:
+                mid = (i + j) // 2
+                transitions.append((side_a[mid], side_b[mid]))
+            i = j + 1
+
+        # Travessias só na diagonal (o movimento diagonal não exige que os
+        # vizinhos retos estejam livres) que nenhum segmento já cobre
+        for i in range(length - 1):
+            if segment[i] != -1 and segment[i] == segment[i + 1]:
+                continue
+            for a, b in ((side_a[i], side_b[i + 1]), (side_a[i + 1], side_b[i])):
+                if passable[a] and passable[b]:
+                    transitions.append((a, b))
+        return transitions
+
+    def _build_cluster(self, cluster):
+        """Custos internos entre todos os pares de nós abstratos do cluster."""
+        nodes = self._cluster_nodes(cluster)
+        bounds = self._bounds(cluster)
+        edges = {}
+        for u in nodes:
+            dist, _ = _local_dijkstra(self.grid, bounds, u)
+            edges[u] = [(v, dist[v]) for v in nodes if v != u and v in dist]
+        if edges:
+            self.intra[cluster] = edges
+        else:
+            self.intra.pop(cluster, None)
+
+    def _crossing_cost(self, a, b):
+        """Custo do passo de `a` para `b` (vizinhos em clusters diferentes)."""
+        cols = self.grid.cols
+        ar, ac = divmod(a, cols)
+        br, bc = divmod(b, cols)
+        move_cost = SQRT2 if ar != br and ac != bc else 1
+        return move_cost * self.grid.cost[b]
+
+    def _link(self, transitions):
+        inter = self.inter
+        for a, b in transitions:
+            inter.setdefault(a, {})[b] = self._crossing_cost(a, b)
+            inter.setdefault(b, {})[a] = self._crossing_cost(b, a)
+
+    def _unlink(self, transitions):
+        inter = self.inter
+        for a, b in transitions:
+            for u, v in ((a, b), (b, a)):
+                edges = inter.get(u)
+                if edges is not None:
+                    edges.pop(v, None)
+                    if not edges:
+                        del inter[u]
+
+    def build(self):
+        """Constrói todas as fronteiras e os custos internos de cada cluster."""
+        self.borders = {}
+        self.intra = {}
+        self.inter = {}
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                for kind in ('h', 'v', 'd', 'a'):
+                    key = (kind, cr, cc)
+                    if self._border_clusters(key) is None:
+                        continue
+                    transitions = self._build_border(key)
+                    if transitions:
+                        self.borders[key] = transitions
+                        self._link(transitions)
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                self._build_cluster((cr, cc))
+        self._version = self.grid.version
+
+    def update_cell(self, r, c, value):
+        """
+        Altera a célula (r, c) do grid e atualiza só o cluster dela: suas
+        fronteiras e, se as entradas mudarem, os clusters vizinhos afetados.
+        """
+        self.grid.set_cell(r, c, value)
+        cluster = self.cluster_of(r * self.grid.cols + c)
+        dirty = {cluster}
+        for key in self._border_keys(cluster):
+            old = self.borders.get(key, [])
+            new = self._build_border(key)
+            self._unlink(old)
+            self._link(new)
+            if new:
+                self.borders[key] = new
+            else:
+                self.borders.pop(key, None)
+            if set(old) != set(new):
+                dirty.update(self._border_clusters(key))
+        for cl in dirty:
+            self._build_cluster(cl)
+        self._version = self.grid.version
+
+    # --- Consulta ---
+
+    def search(self, start, end):
+        """
+        Busca no grafo abstrato e refina o caminho escolhido. Se o grid mudou
+        por fora (`set_cell` sem `update_cell`), a abstração é reconstruída
+        antes da busca.
+
+        Retorna:
+            bool: True se `end` foi alcançado.
+        """
+        if self.grid.version != self._version:
+            self.build()
+        grid = self.grid
+        cols = grid.cols
+        passable = grid.passable
+        start = tuple(start)
+        end = tuple(end)
+        self._path = []
+        self.cost = None
+        self.expansions = 0
+        self.pushes = 0
+
+        s = start[0] * cols + start[1]
+        g = end[0] * cols + end[1]
+        if not (passable[s] and passable[g]):
+            return False
+
+        # Liga 'S' e 'E' temporariamente às entradas dos seus clusters
+        start_cluster = self.cluster_of(s)
+        goal_cluster = self.cluster_of(g)
+        dist, _ = _local_dijkstra(grid, self._bounds(start_cluster), s)
+        start_nodes = self._cluster_nodes(start_cluster)
+        if start_cluster == goal_cluster:
+            start_nodes.append(g)
+        start_edges = [(v, dist[v]) for v in start_nodes if v != s and v in dist]
+        rdist, _ = _local_dijkstra(grid, self._bounds(goal_cluster), g, reverse=True)
+        goal_edges = {v: rdist[v] for v in self._cluster_nodes(goal_cluster)
+                      if v != g and v in rdist}
+
+        intra = self.intra
+        inter = self.inter
+        came_from = {s: None}
+        g_score = {s: 0.0}
+        open_set = [(heuristic(start, end), s)]
+        closed = set()
+        pushes = 1
+        expansions = 0
+        found = s == g
+
+        while open_set and not found:
+            current = heapq.heappop(open_set)[1]
+            if current in closed:
+                continue
+            closed.add(current)
+            expansions += 1
+            if current == g:
+                found = True
+                break
+
+            if current == s:
+                edges = list(start_edges)
+            else:
+                edges = list(intra.get(self.cluster_of(current), {}).get(current, ()))
+            edges.extend(inter.get(current, {}).items())
+            if current in goal_edges:
+                edges.append((g, goal_edges[current]))
+
+            current_g = g_score[current]
+            for neighbor, edge_cost in edges:
+                tentative_g_score = current_g + edge_cost
+                if tentative_g_score < g_score.get(neighbor, float('inf')):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    f_score = tentative_g_score + heuristic(divmod(neighbor, cols), end)
+                    heapq.heappush(open_set, (f_score, neighbor))
+                    pushes += 1
+
+        self.expansions = expansions
+        self.pushes = pushes
+        if not found:
+            return False
+
+        abstract_path = []
+        node = g
+        while node is not None:
+            abstract_path.append(node)
+            node = came_from[node]
+        abstract_path.reverse()
+        self.cost = g_score[g]
+        self._path = self._refine(abstract_path)
+        return True
+
+    def _refine(self, abstract_path):
+        """Expande o caminho abstrato em células, um cluster por vez."""
+        cols = self.grid.cols
+        cells = [abstract_path[0]]
+        for u, v in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(u)
+            if cluster != self.cluster_of(v):
+                # Passo que atravessa a fronteira
+                cells.append(v)
+                continue
+            _, parent = _local_dijkstra(self.grid, self._bounds(cluster), u, target=v)
+            segment = []
+            node = v
+            while node != u:
+                segment.append(node)
+                node = parent[node]
+            cells.extend(reversed(segment))
+        return [divmod(idx, cols) for idx in cells]
+
+    def path(self):
+        """Caminho [(linha, coluna), ...] da última busca ([] se não houver)."""
+        return list(self._path)
+
+    def came_from_dict(self):
+        """Cadeia {nó: nó_anterior} no formato de `reconstruct_path`."""
+        if not self._path:
+            return None
+        came_from = {self._path[0]: None}
+        for prev, node in zip(self._path, self._path[1:]):
+            came_from[node] = prev
+        return came_from
+
+    # --- Persistência ---
+
+    def save(self, filename):
+        """
+        Grava a abstração em disco (pickle), junto com o hash do grid para
+        validar o arquivo ao carregar.
+        """
+        data = {
+            "version": FORMAT_VERSION,
+            "content_hash": self.grid.content_hash(),
+            "cluster_size": self.cluster_size,
+            "borders": self.borders,
+            "intra": self.intra,
+        }
+        with open(filename, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename, grid):
+        """
+        Carrega uma abstração gravada por `save` para o mesmo `grid`.
+        Só carregue arquivos de origem confiável (o formato é pickle).
+
+        Levanta:
+            ValueError: Se o arquivo for de outra versão ou de outro grid.
+        """
+        with open(filename, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Versão de arquivo HPA* não suportada: {data.get('version')}")
+        if data["content_hash"] != grid.content_hash():
+            raise ValueError("O arquivo HPA* foi gerado para outro labirinto.")
+        graph = cls(grid, data["cluster_size"], build=False)
+        graph.borders = data["borders"]
+        graph.intra = data["intra"]
+        for transitions in graph.borders.values():
+            graph._link(transitions)
+        graph._version = grid.version
+        return graph
+
+def hpa_search(maze, start, end, cluster_size=10):
+    """
+    Alternativa a `a_star_search` usando HPA*. Constrói o grafo abstrato a
+    cada chamada; para várias consultas, reutilize um `HierarchicalGraph`.
+    Retorna (came_from, end) ou (None, None).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    graph = HierarchicalGraph(grid, cluster_size)
+    if not graph.search(start, end):
+        return None, None
+    return graph.came_from_dict(), tuple(end)
@@ -0,0 +1,310 @@
+from array import array
+
+from pathfinder import Grid, MOVES, heuristic, path_cost
+
+#-- Busca com memória limitada (IDA* com tabela de transposição) --
+# O A* guarda todas as células tocadas; em mapas grandes isso esgota a
+# memória de máquinas pequenas. O IDA* faz buscas em profundidade com um
+# limite de f crescente e só guarda o caminho atual, ao custo de reexpandir
+# nós. Uma tabela de transposição reduz as reexpansões guardando, por célula:
+#     - o menor g com que ela foi alcançada na iteração atual; chegar de novo
+#       com g igual ou pior não precisa ser explorado;
+#     - um limite inferior do custo dela até o objetivo, aprendido quando a
+#       subárvore dela termina sem achar o objetivo (o menor f além do limite,
+#       menos g). Ele continua válido quando o limite sobe, então vale para
+#       todas as iterações da mesma busca e substitui a heurística: as
+#       subárvores já esgotadas são cortadas logo na raiz na iteração
+#       seguinte, em vez de refeitas.
+# Sem caminho, esses limites sobem aos poucos pelos ciclos e nunca chegam a
+# inf, então a tabela também marca as células que tinham vizinhos nunca
+# expandidos: quando nenhuma está marcada, tudo o que a origem alcança já foi
+# visto e não há caminho. A prova exige que nada tenha saído da tabela; na
+# primeira substituição a busca volta a usar só a heurística, como o IDA*
+# comum, que termina quando nenhum f passa do limite.
+# A tabela tem tamanho fixo (`max_nodes` posições, 25 bytes cada) e
+# endereçamento direto: cada célula tem uma única posição (índice % tamanho)
+# e a mais recente substitui a anterior, perdendo o que foi aprendido. Com
+# pouca memória a tabela esquece mais e a busca fica mais lenta, mas não
+# cresce: a memória é `max_nodes` mais o caminho atual.
+#
+# Com custos de terreno reais, o f mínimo acima do limite muda pouco de uma
+# iteração para a outra e o IDA* pode precisar de muitas iterações. Com
+# `growth` > 0, cada novo limite é pelo menos (1 + growth) vezes esse mínimo:
+# bem menos iterações, e o caminho custa no máximo (1 + growth) vezes o ótimo
+# (`bound`). O padrão, `DEFAULT_GROWTH`, troca até 10% de custo por uma
+# busca curta; use `growth=0` para o caminho ótimo.
+
+# Folga para comparar valores de f em ponto flutuante com o limite
+_EPSILON = 1e-9
+
+# Folga padrão de cada novo limite: caminho no máximo 10% acima do ótimo
+DEFAULT_GROWTH = 0.1
+
+class IDAStarEngine:
+    """
+    IDA* com tabela de transposição limitada sobre um `Grid`.
+
+    Argumentos:
+        grid (Grid): O labirinto.
+        max_nodes (int): Posições da tabela de transposição. Abaixo de uma
+                         fração razoável das células alcançáveis, as
+                         reexpansões crescem depressa; `growth` compensa.
+        growth (float): Folga relativa de cada novo limite (0 = ótimo;
+                        padrão `DEFAULT_GROWTH`).
+
+    Depois de `search`, `path()` / `came_from_dict()` trazem o caminho, `cost`
+    o seu custo e `bound` o limite de subotimalidade. `expansions`,
+    `iterations` e `peak_depth` (maior profundidade da pilha, que é o que a
+    busca guarda além da tabela) medem o trabalho e a memória.
+    """
+
+    def __init__(self, grid, max_nodes=100000, growth=DEFAULT_GROWTH):
+        self.grid = grid
+        self.max_nodes = max(1, max_nodes)
+        self.growth = growth
+        # Índices de mundos enormes (`pathfinder_tiles`) não cabem em 32 bits
+        typecode = "i" if grid.rows * grid.cols < 2 ** 31 else "q"
+        self._keys = array(typecode, [-1]) * self.max_nodes
+        # g na iteração `_stamps` e limite inferior até o objetivo
+        self._values = array("d", [0.0]) * self.max_nodes
+        self._stamps = array("i", [0]) * self.max_nodes
+        self._bounds = array("d", [0.0]) * self.max_nodes
+        # 1 se a célula tinha vizinho fora da tabela na última expansão
+        self._open = bytearray(self.max_nodes)
+        self._open_count = 0
+        self._learning = True
+        self._empty_keys = array(typecode, [-1]) * self.max_nodes
+        self._path = []
+        self.cost = float('inf')
+        self.bound = float('inf')
+        self.expansions = 0
+        self.iterations = 0
+        self.peak_depth = 0
+
+    def _children(self, idx, g, end):
+        """
+        Sucessores (f, índice, g) de `idx`, do menor f para o maior; f usa o
+        limite aprendido da tabela quando a célula está nela.
+        """
+        keys = self._keys
+        bounds = self._bounds
+        size = len(keys)
+        learning = self._learning
+        grid = self.grid
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        cost = grid.cost
+        r, c = divmod(idx, cols)
+        children = []
+        for dr, dc, move_cost in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                neighbor = nr * cols + nc
+                if passable[neighbor]:
+                    child_g = g + move_cost * cost[neighbor]
+                    slot = neighbor % size
+                    if learning and keys[slot] == neighbor:
+                        estimate = bounds[slot]
+                    else:
+                        estimate = heuristic((nr, nc), end)
+                    children.append((child_g + estimate, neighbor, child_g))
+        children.sort()
+        return children
+
+    def _insert(self, slot, idx, g, estimate):
+        """Põe `idx` na posição `slot` da tabela, substituindo quem estiver lá."""
+        if self._keys[slot] != -1:
+            # Uma célula esquecida invalida a prova de que não há caminho
+            # (ver `_iteration`): daqui em diante, só a heurística
+            self._learning = False
+            self._open_count -= self._open[slot]
+        self._keys[slot] = idx
+        self._values[slot] = g
+        self._stamps[slot] = self.iterations
+        self._bounds[slot] = estimate
+        self._open[slot] = 1
+        self._open_count += 1
+
+    def _learn(self, idx, g, estimate, learned, children):
+        """
+        Guarda em `idx`, ao fim da sua subárvore, o limite inferior
+        `learned` - g (se for melhor que o atual) e se algum vizinho nunca
+        foi expandido.
+        """
+        keys = self._keys
+        size = len(keys)
+        slot = idx % size
+        if keys[slot] != idx:
+            # Substituída por outra célula durante a subárvore
+            self._insert(slot, idx, g, estimate)
+        if learned - g > self._bounds[slot]:
+            self._bounds[slot] = learned - g
+        is_open = 0
+        for _, child, _ in children:
+            if keys[child % size] != child:
+                is_open = 1
+                break
+        self._open_count += is_open - self._open[slot]
+        self._open[slot] = is_open
+
+    def _iteration(self, start_idx, end_idx, end, threshold):
+        """
+        Busca em profundidade limitada a f <= `threshold`.
+
+        Retorna:
+            tuple: (caminho em índices ou None, menor f acima do limite,
+                    False se ficou provado que não há caminho).
+
+        Sem substituições na tabela, ela guarda todas as células já
+        expandidas, cada uma marcada se, na última expansão, tinha algum
+        vizinho fora da tabela. Um caminho até o objetivo (que nunca entra na
+        tabela) sai dela em algum ponto, pela célula marcada; sem nenhuma
+        marcada, não há caminho.
+        """
+        keys = self._keys
+        values = self._values
+        stamps = self._stamps
+        size = len(keys)
+        stamp = self.iterations
+        slot = start_idx % size
+        if keys[slot] != start_idx:
+            self._insert(slot, start_idx, 0.0, heuristic(divmod(start_idx, self.grid.cols), end))
+        values[slot] = 0.0
+        stamps[slot] = stamp
+        # Quadro: [índice, g, filhos, próximo filho, menor f da subárvore
+        # além do que foi explorado, f com que o quadro entrou]
+        stack = [[start_idx, 0.0, self._children(start_idx, 0.0, end), 0, float('inf'),
+                  self._bounds[slot]]]
+        on_path = {start_idx}
+        next_threshold = float('inf')
+        limit = threshold + _EPSILON
+        expansions = 0
+        peak = self.peak_depth
+
+        while stack:
+            frame = stack[-1]
+            idx, g, children, i, best, entry_f = frame
+            if i == len(children):
+                stack.pop()
+                on_path.discard(idx)
+                # Nenhum caminho por `idx` custa menos que `best`
+                self._learn(idx, g, entry_f - g, best, children)
+                if stack and best < stack[-1][4]:
+                    stack[-1][4] = best
+                continue
+            f_score, child, child_g = children[i]
+            if f_score > limit:
+                # Filhos ordenados por f: os seguintes também passam do limite
+                if f_score < next_threshold:
+                    next_threshold = f_score
+                if f_score < best:
+                    frame[4] = f_score
+                frame[3] = len(children)
+                continue
+            frame[3] = i + 1
+            slot = child % size
+            if child in on_path or (keys[slot] == child and stamps[slot] == stamp and
+                                    values[slot] <= child_g + _EPSILON):
+                # Ciclo ou célula já alcançada nesta iteração com g melhor:
+                # não é explorada, mas o seu f continua um limite válido
+                if f_score < best:
+                    frame[4] = f_score
+                continue
+            if keys[slot] != child:
+                self._insert(slot, child, child_g, f_score - child_g)
+            values[slot] = child_g
+            stamps[slot] = stamp
+            expansions += 1
+            if child == end_idx:
+                self.expansions += expansions
+                self.peak_depth = max(peak, len(stack) + 1)
+                return [frame[0] for frame in stack] + [child], next_threshold, True
+            stack.append([child, child_g, self._children(child, child_g, end), 0,
+                          float('inf'), f_score])
+            on_path.add(child)
+            if len(stack) > peak:
+                peak = len(stack)
+
+        self.expansions += expansions
+        self.peak_depth = peak
+        return None, next_threshold, not self._learning or self._open_count > 0
+
+    def search(self, start, end):
+        """
+        Executa o IDA* de `start` até `end`.
+
+        Retorna:
+            bool: True se `end` foi alcançado.
+        """
+        self._path = []
+        self.cost = float('inf')
+        self.bound = float('inf')
+        self.expansions = 0
+        self.iterations = 0
+        self.peak_depth = 0
+        grid = self.grid
+        if grid.connectivity is not None and not grid.connectivity.connected(start, end):
+            return False
+        cols = grid.cols
+        start = tuple(start)
+        end = tuple(end)
+        start_idx = start[0] * cols + start[1]
+        end_idx = end[0] * cols + end[1]
+        if start_idx == end_idx:
+            self._path = [start]
+            self.cost = 0.0
+            self.bound = 1.0
+            return True
+        # Os limites aprendidos dependem do objetivo: valem só nesta busca
+        self._keys[:] = self._empty_keys
+        self._open_count = 0
+        self._learning = True
+
+        threshold = heuristic(start, end)
+        lower = threshold
+        while True:
+            self.iterations += 1
+            path, next_threshold, is_open = self._iteration(start_idx, end_idx, end, threshold)
+            if path is not None:
+                break
+            if next_threshold == float('inf') or not is_open:
+                return False
+            # Nenhum caminho custa menos que `next_threshold`
+            lower = next_threshold
+            threshold = next_threshold * (1 + self.growth)
+
+        self._path = [divmod(idx, cols) for idx in path]
+        self.cost = path_cost(grid, self._path)
+        self.bound = max(1.0, self.cost / lower) if lower > 0 else 1.0
+        return True
+
+    def path(self):
+        """Caminho [(linha, coluna), ...] da última busca ([] se nenhum)."""
+        return list(self._path)
+
+    def came_from_dict(self):
+        """Cadeia {nó: nó_anterior} no formato de `reconstruct_path`."""
+        if not self._path:
+            return None
+        came_from = {self._path[0]: None}
+        for prev, node in zip(self._path, self._path[1:]):
+            came_from[node] = prev
+        return came_from
+
+def memory_bounded_search(maze, start, end, max_nodes=100000, growth=DEFAULT_GROWTH):
+    """
+    Alternativa a `a_star_search` com memória limitada (IDA*). Mesmo
+    retorno: (came_from, end) ou (None, None).
+
+    Argumentos:
+        max_nodes (int): Máximo de células na tabela de transposição.
+        growth (float): Folga de cada novo limite; o caminho custa no máximo
+                        (1 + growth) vezes o ótimo.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = IDAStarEngine(grid, max_nodes, growth)
+    if not engine.search(start, end):
+        return None, None
+    return engine.came_from_dict(), tuple(end)
@@ -0,0 +1,288 @@
+import argparse
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+from pathfinder import Grid
+
+#-- Formato binário de labirinto (mmap) --
+# Um labirinto grande em lista de listas ocupa gigabytes, e refazer o parsing
+# do texto a cada execução leva minutos. O arquivo binário guarda o grid já no
+# formato dos arrays planos de `Grid` e é aberto com `mmap`: nada é lido na
+# abertura, e a busca só carrega as páginas que visitar.
+#
+# Layout (little-endian):
+#     cabeçalho de 32 bytes: "PFMZ", versão (u16), bytes por custo (u8: 1 ou
+#         4), reservado (u8), linhas (u32), colunas (u32), 'S' e 'E' como
+#         (linha, coluna) em i32, com -1 quando ausentes
+#     plano de custos: linhas * colunas valores uint8 ou float32
+#     plano de passagem: linhas * colunas bytes (1 = transitável)
+#
+# No plano float32 os obstáculos têm custo inf, como em `Grid.from_maze`; no
+# uint8 (custos inteiros de 1 a 255, um quarto do tamanho) eles têm custo 0.
+# Nos dois casos quem decide se uma célula é obstáculo é o plano de passagem.
+# O `Grid` de `open_grid` sempre tem `cost` em float32: o plano uint8 é
+# convertido uma vez na abertura (com inf nos obstáculos), e só o plano de
+# passagem continua mapeado.
+#
+# `convert_text_maze` gera o arquivo a partir do texto de
+# `display_maze_with_path` (ou de um labirinto impresso linha a linha) lendo
+# uma linha por vez, sem montar o labirinto na memória.
+
+MAGIC = b"PFMZ"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHBxIIiiii")
+
+# Bytes por custo de cada formato do plano de custos
+DTYPES = {"uint8": 1, "float32": 4}
+
+# Símbolos de uma célula no texto: (transitável, custo). '*' marca o caminho
+# por cima de uma célula livre.
+_TOKENS = {"S": (1, 1.0), "E": (1, 1.0), "*": (1, 1.0), "0": (1, 1.0),
+           "1": (0, float('inf'))}
+
+def _header(rows, cols, start, end, dtype):
+    start = start if start is not None else (-1, -1)
+    end = end if end is not None else (-1, -1)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, DTYPES[dtype], rows, cols,
+                        start[0], start[1], end[0], end[1])
+
+def _float32_bytes(values):
+    plane = array("f", values)
+    if sys.byteorder == "big":
+        plane.byteswap()
+    return plane.tobytes()
+
+def _uint8_tables():
+    """
+    Tabelas de `bytes.translate` com cada um dos 4 bytes do float32 (na ordem
+    da máquina) de um custo uint8; o custo 0 (obstáculo) vira inf.
+    """
+    encoded = [array("f", [float('inf') if value == 0 else value]).tobytes()
+               for value in range(256)]
+    return [bytes(code[k] for code in encoded) for k in range(4)]
+
+_FLOAT32_TABLES = _uint8_tables()
+
+def _uint8_to_float32(plane):
+    """Plano de custos uint8 convertido para um array('f') do `Grid`."""
+    raw = bytes(plane)
+    packed = bytearray(4 * len(raw))
+    for k, table in enumerate(_FLOAT32_TABLES):
+        packed[k::4] = raw.translate(table)
+    cost = array("f")
+    cost.frombytes(packed)
+    return cost
+
+def _uint8_cost(value, where):
+    if value == float('inf'):
+        return 0
+    if value != int(value) or not 1 <= value <= 255:
+        raise ValueError(f"Custo {value} ({where}) não cabe no formato uint8; use dtype='float32'.")
+    return int(value)
+
+def save_grid(maze, filename, dtype=None):
+    """
+    Grava um labirinto no formato binário.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        filename (str): Arquivo de saída.
+        dtype (str | None): "uint8" ou "float32". Com None, usa uint8 se todos
+                            os custos forem inteiros de 1 a 255.
+
+    Levanta:
+        ValueError: Se algum custo não couber em uint8.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    passable = grid.passable
+    cost = grid.cost
+    if dtype is None:
+        dtype = "uint8"
+        for value in set(cost):
+            if value != float('inf') and (value != int(value) or not 1 <= value <= 255):
+                dtype = "float32"
+                break
+    if dtype not in DTYPES:
+        raise ValueError(f"Formato de custo desconhecido: {dtype}")
+
+    cols = grid.cols
+    with open(filename, "wb") as f:
+        f.write(_header(grid.rows, cols, grid.start, grid.end, dtype))
+        for r in range(grid.rows):
+            base = r * cols
+            row = cost[base:base + cols]
+            if dtype == "uint8":
+                f.write(bytes([_uint8_cost(value, f"linha {r}") if passable[base + c] else 0
+                               for c, value in enumerate(row)]))
+            else:
+                f.write(_float32_bytes(row))
+        f.write(passable)
+
+def open_grid(filename, mode="r"):
+    """
+    Abre um arquivo gravado por `save_grid` ou `convert_text_maze` sem
+    copiá-lo: `passable` e `cost` do Grid são `memoryview`s sobre o mmap. Um
+    plano de custos uint8 é a exceção: vira um array('f') na memória (uma cópia
+    de 4 bytes por célula), para manter `cost` em float32 como em todo `Grid`.
+
+    Argumentos:
+        filename (str): O arquivo.
+        mode (str): "r" (só leitura) ou "c" (cópia na escrita: `set_cell`
+                    funciona e as alterações ficam só na memória).
+
+    Retorna:
+        Grid: O labirinto mapeado.
+
+    Levanta:
+        ValueError: Se o arquivo não for um labirinto binário desta versão.
+    """
+    if mode not in ("r", "c"):
+        raise ValueError(f"Modo de abertura desconhecido: {mode}")
+    with open(filename, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0,
+                         access=mmap.ACCESS_READ if mode == "r" else mmap.ACCESS_COPY)
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{filename} não é um labirinto binário.")
+    magic, version, width, rows, cols, sr, sc, er, ec = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} não é um labirinto binário.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versão de labirinto binário não suportada: {version}")
+    if width not in DTYPES.values():
+        raise ValueError(f"Formato de custo desconhecido no arquivo: {width} bytes")
+    if width == 4 and sys.byteorder == "big":
+        raise ValueError("O plano float32 só pode ser mapeado em máquinas little-endian.")
+    size = rows * cols
+    if len(data) != _HEADER.size + (width + 1) * size:
+        raise ValueError(f"{filename} está truncado ou corrompido.")
+
+    view = memoryview(data)
+    cost_end = _HEADER.size + width * size
+    cost = view[_HEADER.size:cost_end]
+    return Grid(rows, cols,
+                passable=view[cost_end:cost_end + size],
+                cost=cost.cast("f") if width == 4 else _uint8_to_float32(cost),
+                start=(sr, sc) if sr >= 0 else None,
+                end=(er, ec) if er >= 0 else None)
+
+#-- Conversão do texto --
+
+def _fast_tables():
+    """Tabelas de `bytes.translate` para linhas só com símbolos de 1 caractere."""
+    passable = bytearray(b"\xff") * 256
+    cost = bytearray(b"\xff") * 256
+    for char in b"SE*0":
+        passable[char] = 1
+        cost[char] = 1
+    passable[ord("1")] = 0
+    cost[ord("1")] = 0
+    for digit in range(2, 10):
+        passable[ord(str(digit))] = 1
+        cost[ord(str(digit))] = digit
+    return bytes(passable), bytes(cost)
+
+_PASSABLE_TABLE, _COST_TABLE = _fast_tables()
+
+def _parse_row(tokens, number, dtype):
+    """Planos de custo e de passagem de uma linha do texto."""
+    compact = "".join(tokens)
+    if len(compact) == len(tokens) and compact.isascii():
+        # Caminho rápido: cada célula é um caractere ('S', 'E', '*', 0 a 9)
+        raw = compact.encode("ascii")
+        passable = raw.translate(_PASSABLE_TABLE)
+        if b"\xff" not in passable:
+            costs = raw.translate(_COST_TABLE)
+            if dtype == "uint8":
+                return costs, passable
+            plane = array("f", list(costs))
+            blocked = passable.find(0)
+            while blocked != -1:
+                plane[blocked] = float('inf')
+                blocked = passable.find(0, blocked + 1)
+            if sys.byteorder == "big":
+                plane.byteswap()
+            return plane.tobytes(), passable
+
+    passable = bytearray(len(tokens))
+    costs = []
+    for c, token in enumerate(tokens):
+        cell = _TOKENS.get(token)
+        if cell is None:
+            try:
+                value = float(token)
+            except ValueError:
+                raise ValueError(f"Célula inválida '{token}' na linha {number}.") from None
+            cell = (0, value) if value == float('inf') else (1, value)
+        passable[c] = cell[0]
+        costs.append(cell[1])
+    if dtype == "uint8":
+        return bytes([_uint8_cost(value, f"linha {number}") for value in costs]), bytes(passable)
+    return _float32_bytes(costs), bytes(passable)
+
+def convert_text_maze(source, filename, dtype="uint8"):
+    """
+    Converte um labirinto em texto (uma linha por linha do grid, células
+    separadas por espaço, como em `display_maze_with_path`) para o formato
+    binário, uma linha por vez. Linhas vazias e títulos terminados em ':'
+    são ignorados; '*' conta como célula livre.
+
+    Argumentos:
+        source (str | arquivo de texto): Caminho ou arquivo já aberto.
+        filename (str): Arquivo binário de saída.
+        dtype (str): "uint8" (custos inteiros de 1 a 255) ou "float32".
+
+    Retorna:
+        Grid: O labirinto convertido, já aberto com `open_grid`.
+
+    Levanta:
+        ValueError: Se as linhas tiverem tamanhos diferentes, se houver uma
+                    célula inválida ou um custo que não caiba no formato.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Formato de custo desconhecido: {dtype}")
+    text = open(source) if isinstance(source, str) else source
+    rows = 0
+    cols = None
+    start = end = None
+    with open(filename, "wb") as out, tempfile.TemporaryFile() as passable_plane:
+        out.write(bytes(_HEADER.size))
+        for number, line in enumerate(text, 1):
+            tokens = line.split()
+            if not tokens or line.rstrip().endswith(":"):
+                continue
+            if cols is None:
+                cols = len(tokens)
+            elif len(tokens) != cols:
+                raise ValueError(f"A linha {number} tem {len(tokens)} células; esperado {cols}.")
+            if start is None and "S" in tokens:
+                start = (rows, tokens.index("S"))
+            if end is None and "E" in tokens:
+                end = (rows, tokens.index("E"))
+            costs, passable = _parse_row(tokens, number, dtype)
+            out.write(costs)
+            passable_plane.write(passable)
+            rows += 1
+        passable_plane.seek(0)
+        shutil.copyfileobj(passable_plane, out)
+        out.seek(0)
+        out.write(_header(rows, cols or 0, start, end, dtype))
+    if isinstance(source, str):
+        text.close()
+    return open_grid(filename)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte labirintos em texto para o formato binário.")
+    parser.add_argument("source", help="Labirinto em texto (como em display_maze_with_path).")
+    parser.add_argument("output", help="Arquivo binário de saída.")
+    parser.add_argument("--dtype", choices=sorted(DTYPES), default="uint8")
+    args = parser.parse_args(argv)
+    grid = convert_text_maze(args.source, args.output, args.dtype)
+    print(f"{args.output}: {grid.rows}x{grid.cols}, S={grid.start}, E={grid.end}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,431 @@
+import heapq
+import itertools
+
+from pathfinder import Grid, MOVES, SQRT2, heuristic
+
+#-- Planejamento cooperativo de vários agentes --
+# Cada agente é planejado no espaço-tempo (linha, coluna, t): a cada passo
+# de tempo ele faz um dos 8 movimentos de MOVES (custo do movimento vezes o
+# custo de terreno da célula de chegada, como em `get_neighbors` /
+# `get_terrain_cost`) ou espera no lugar (WAIT_COST). Ao chegar ao objetivo
+# o agente fica estacionado lá para sempre.
+#
+# A tabela de reservas guarda o que os agentes já planejados ocupam, com cada
+# estado codificado num único inteiro:
+#     vértice (célula, t)         -> t * size + célula
+#     movimento (a -> b, chega t) -> (t * size + a) * size + b
+# Isso evita tuplas e deixa as consultas em conjuntos de inteiros. São
+# proibidos dois agentes na mesma célula no mesmo instante (conflito de
+# vértice) e dois agentes trocando de lugar no mesmo passo (conflito de
+# aresta).
+#
+# `CooperativePlanner` planeja os agentes um a um, por prioridade (rápido,
+# escala para centenas de agentes, não é ótimo). `cbs_search` usa Conflict-
+# Based Search: ótimo na soma dos custos, indicado para equipes pequenas.
+# A heurística é a distância exata até o objetivo ignorando os outros agentes,
+# calculada sob demanda por um A* reverso retomável por objetivo.
+
+WAIT_COST = 1.0
+
+class ReservationTable:
+    """
+    Reservas no espaço-tempo de um grid com `size` células.
+
+    Atributos:
+        vertices (set[int]): Estados (célula, t) ocupados.
+        moves (set[int]): Movimentos (a -> b chegando em t) proibidos.
+        parked (dict): célula -> instante a partir do qual um agente fica
+                       estacionado nela.
+        last (dict): célula -> último instante com reserva de vértice.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.vertices = set()
+        self.moves = set()
+        self.parked = {}
+        self.last = {}
+
+    def block_vertex(self, idx, t):
+        self.vertices.add(t * self.size + idx)
+        if t > self.last.get(idx, -1):
+            self.last[idx] = t
+
+    def block_move(self, a, b, t):
+        """Proíbe o movimento a -> b que chega em `t`."""
+        self.moves.add((t * self.size + a) * self.size + b)
+
+    def park(self, idx, t):
+        if t < self.parked.get(idx, t + 1):
+            self.parked[idx] = t
+
+    def reserve(self, path):
+        """
+        Reserva o caminho [índice no instante 0, 1, ...] de um agente,
+        incluindo a troca de lugar em cada passo e o estacionamento final.
+        """
+        for t, idx in enumerate(path):
+            self.block_vertex(idx, t)
+            if t and path[t - 1] != idx:
+                # Outro agente não pode fazer o movimento inverso ao mesmo tempo
+                self.block_move(idx, path[t - 1], t)
+        self.park(path[-1], len(path) - 1)
+
+    def is_free(self, a, b, t):
+        """True se um agente pode ir de `a` para `b` chegando em `t`."""
+        size = self.size
+        if t * size + b in self.vertices or (t * size + a) * size + b in self.moves:
+            return False
+        return self.parked.get(b, t + 1) > t
+
+    def can_park(self, idx, t):
+        """True se um agente pode ficar em `idx` de `t` em diante."""
+        return self.last.get(idx, -1) < t and idx not in self.parked
+
+class _ReverseResumable:
+    """
+    Distância exata de cada célula até `goal_idx`, calculada sob demanda por
+    um A* reverso retomável (RRA*): a busca parte do objetivo em direção ao
+    início do agente e só avança quando uma célula ainda não fechada é
+    consultada. Indexável como um array: h[índice].
+    """
+
+    def __init__(self, grid, goal_idx, target_idx):
+        self.grid = grid
+        self.target = divmod(target_idx, grid.cols)
+        self.dist = {}
+        self.g_score = {goal_idx: 0.0}
+        self.open_set = [(self._estimate(goal_idx), goal_idx)]
+
+    def _estimate(self, idx):
+        return heuristic(divmod(idx, self.grid.cols), self.target)
+
+    def __getitem__(self, idx):
+        dist = self.dist
+        found = dist.get(idx)
+        if found is not None:
+            return found
+        grid = self.grid
+        rows = grid.rows
+        cols = grid.cols
+        passable = grid.passable
+        cost = grid.cost
+        g_score = self.g_score
+        open_set = self.open_set
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        while open_set:
+            _, current = heappop(open_set)
+            if current in dist:
+                continue
+            current_g = g_score[current]
+            dist[current] = current_g
+            r, c = divmod(current, cols)
+            # Para trás, o passo vizinho -> current custa o terreno de current
+            for dr, dc, move_cost in MOVES:
+                nr = r + dr
+                nc = c + dc
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    neighbor = nr * cols + nc
+                    if passable[neighbor] and neighbor not in dist:
+                        tentative_g_score = current_g + move_cost * cost[current]
+                        if tentative_g_score < g_score.get(neighbor, float('inf')):
+                            g_score[neighbor] = tentative_g_score
+                            heappush(open_set, (tentative_g_score + self._estimate(neighbor),
+                                                neighbor))
+            if current == idx:
+                return current_g
+        return float('inf')
+
+class _Heuristics:
+    """Uma `_ReverseResumable` por objetivo, em cache."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self._tables = {}
+
+    def get(self, goal_idx, start_idx):
+        table = self._tables.get(goal_idx)
+        if table is None:
+            table = self._tables[goal_idx] = _ReverseResumable(self.grid, goal_idx, start_idx)
+        return table
+
+def _space_time_search(grid, start_idx, goal_idx, h, table, max_time):
+    """
+    A* no espaço-tempo respeitando `table`.
+
+    Retorna:
+        tuple: (caminho em índices, um por instante, custo, expansões) ou
+               (None, inf, expansões) se não houver plano até `max_time`.
+    """
+    rows = grid.rows
+    cols = grid.cols
+    size = rows * cols
+    passable = grid.passable
+    cost = grid.cost
+    vertices = table.vertices
+    moves = table.moves
+    parked = table.parked
+    inf = float('inf')
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    if start_idx in vertices or h[start_idx] == inf:
+        return None, inf, 0
+    # O agente só pode estacionar no objetivo depois da última reserva dele;
+    # cada passo custa pelo menos 1, então os passos que faltam até lá também
+    # são um limite inferior (combinado com h via max, continua consistente)
+    park_after = table.last.get(goal_idx, -1) + 1
+    g_score = {start_idx: 0.0}
+    came_from = {start_idx: -1}
+    closed = set()
+    open_set = [(h[start_idx], 0, start_idx)]
+    expansions = 0
+
+    while open_set:
+        _, neg_t, key = heappop(open_set)
+        if key in closed:
+            continue
+        closed.add(key)
+        expansions += 1
+        t = -neg_t
+        idx = key - t * size
+        current_g = g_score[key]
+
+        if idx == goal_idx and table.can_park(idx, t):
+            path = []
+            while key != -1:
+                path.append(key % size)
+                key = came_from[key]
+            path.reverse()
+            return path, current_g, expansions
+        if t >= max_time:
+            continue
+
+        nt = t + 1
+        base = nt * size
+        move_base = (nt * size + idx) * size
+        r, c = divmod(idx, cols)
+        successors = [(idx, WAIT_COST)]
+        for dr, dc, move_cost in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                neighbor = nr * cols + nc
+                if passable[neighbor]:
+                    successors.append((neighbor, move_cost * cost[neighbor]))
+        for neighbor, step_cost in successors:
+            next_key = base + neighbor
+            if next_key in vertices or move_base + neighbor in moves or \
+               parked.get(neighbor, nt + 1) <= nt:
+                continue
+            tentative_g_score = current_g + step_cost
+            if tentative_g_score < g_score.get(next_key, inf):
+                g_score[next_key] = tentative_g_score
+                came_from[next_key] = key
+                estimate = h[neighbor]
+                if park_after - nt > estimate:
+                    estimate = park_after - nt
+                # Em empate de f, o estado mais adiante no tempo sai primeiro
+                heappush(open_set, (tentative_g_score + estimate, -nt, next_key))
+
+    return None, inf, expansions
+
+def schedule_cost(maze, path):
+    """
+    Custo de um plano [(linha, coluna) no instante 0, 1, ...]: movimentos
+    como em `path_cost` e WAIT_COST por espera.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    total = 0.0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        if (r1, c1) == (r2, c2):
+            total += WAIT_COST
+        else:
+            move_cost = SQRT2 if r1 != r2 and c1 != c2 else 1
+            total += move_cost * grid.terrain_cost(r2, c2)
+    return total
+
+class CooperativePlanner:
+    """
+    Planejamento por prioridade com tabela de reservas compartilhada.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        max_time (int | None): Horizonte de cada agente. Por padrão, o custo
+                               do caminho livre do agente mais rows + cols
+                               passos de folga para esperas e desvios.
+
+    Atributos:
+        table (ReservationTable): Reservas dos agentes já planejados.
+        expansions (int): Estados expandidos em todos os planejamentos.
+    """
+
+    def __init__(self, maze, max_time=None):
+        self.grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+        self.max_time = max_time
+        self.table = ReservationTable(self.grid.rows * self.grid.cols)
+        self.expansions = 0
+        self._heuristics = _Heuristics(self.grid)
+
+    def _horizon(self, h, start_idx):
+        if self.max_time is not None or h[start_idx] == float('inf'):
+            return self.max_time or 0
+        return int(h[start_idx]) + self.grid.rows + self.grid.cols
+
+    def add_agent(self, start, goal):
+        """
+        Planeja mais um agente, depois de todos os anteriores, e reserva o
+        seu plano.
+
+        Retorna:
+            list | None: Posição [(linha, coluna), ...] em cada instante, ou
+                         None se não houver plano sem colisões no horizonte.
+        """
+        grid = self.grid
+        cols = grid.cols
+        start_idx = start[0] * cols + start[1]
+        goal_idx = goal[0] * cols + goal[1]
+        h = self._heuristics.get(goal_idx, start_idx)
+        path, _, expansions = _space_time_search(grid, start_idx, goal_idx, h, self.table,
+                                                 self._horizon(h, start_idx))
+        self.expansions += expansions
+        if path is None:
+            return None
+        self.table.reserve(path)
+        return [divmod(idx, cols) for idx in path]
+
+    def plan(self, agents):
+        """
+        Planeja os agentes [(início, objetivo), ...] na ordem dada (a ordem é
+        a prioridade).
+
+        Retorna:
+            list: Um plano por agente (None para os que não tiveram plano).
+        """
+        # Os inícios são reservados no instante 0 antes de tudo, para nenhum
+        # agente de prioridade maior passar por cima de um agente ainda parado
+        cols = self.grid.cols
+        for start, _ in agents:
+            self.table.block_vertex(start[0] * cols + start[1], 0)
+        plans = []
+        for start, goal in agents:
+            self.table.vertices.discard(start[0] * cols + start[1])
+            plans.append(self.add_agent(start, goal))
+        return plans
+
+#-- Conflict-Based Search (CBS) --
+
+def _position(path, t):
+    return path[t] if t < len(path) else path[-1]
+
+def _first_conflict(paths):
+    """
+    Primeiro conflito entre os planos (listas de índices por instante).
+
+    Retorna:
+        tuple | None: ("vertex", i, j, célula, t) ou
+                      ("move", i, j, a, b, t) com o agente i indo de a para b
+                      e o j de b para a, chegando em t.
+    """
+    horizon = max(len(path) for path in paths)
+    for t in range(horizon):
+        occupied = {}
+        for agent, path in enumerate(paths):
+            idx = _position(path, t)
+            other = occupied.get(idx)
+            if other is not None:
+                return ("vertex", other, agent, idx, t)
+            occupied[idx] = agent
+        if t:
+            moving = {}
+            for agent, path in enumerate(paths):
+                a = _position(path, t - 1)
+                b = _position(path, t)
+                if a != b:
+                    other = moving.get((b, a))
+                    if other is not None:
+                        return ("move", other, agent, b, a, t)
+                    moving[(a, b)] = agent
+    return None
+
+def cbs_search(maze, agents, max_time=None, max_nodes=10000):
+    """
+    Conflict-Based Search: planos sem colisões com a menor soma de custos.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        agents (list): [(início, objetivo), ...].
+        max_time (int | None): Horizonte de cada agente (padrão como em
+                               `CooperativePlanner`).
+        max_nodes (int): Limite de nós da árvore de restrições; o custo da
+                         CBS cresce rápido com o número de conflitos.
+
+    Retorna:
+        list | None: Um plano [(linha, coluna), ...] por agente, ou None se
+                     não houver solução (ou se `max_nodes` for atingido).
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    cols = grid.cols
+    size = grid.rows * cols
+    heuristics = _Heuristics(grid)
+    starts = [start[0] * cols + start[1] for start, _ in agents]
+    goals = [goal[0] * cols + goal[1] for _, goal in agents]
+
+    def horizon(agent):
+        distance = heuristics.get(goals[agent], starts[agent])[starts[agent]]
+        if max_time is not None or distance == float('inf'):
+            return max_time or 0
+        return int(distance) + grid.rows + grid.cols
+
+    def replan(agent, constraints):
+        table = ReservationTable(size)
+        for constraint in constraints:
+            if constraint[0] == "vertex":
+                table.block_vertex(constraint[1], constraint[2])
+            else:
+                table.block_move(constraint[1], constraint[2], constraint[3])
+        path, path_cost, _ = _space_time_search(grid, starts[agent], goals[agent],
+                                                heuristics.get(goals[agent], starts[agent]), table,
+                                                horizon(agent))
+        return path, path_cost
+
+    paths = []
+    costs = []
+    for agent in range(len(agents)):
+        path, path_cost = replan(agent, ())
+        if path is None:
+            return None
+        paths.append(path)
+        costs.append(path_cost)
+
+    counter = itertools.count()
+    open_set = [(sum(costs), next(counter), [()] * len(agents), paths, costs)]
+    nodes = 0
+    while open_set and nodes < max_nodes:
+        total, _, constraints, paths, costs = heapq.heappop(open_set)
+        nodes += 1
+        conflict = _first_conflict(paths)
+        if conflict is None:
+            return [[divmod(idx, cols) for idx in path] for path in paths]
+
+        if conflict[0] == "vertex":
+            _, i, j, idx, t = conflict
+            branches = ((i, ("vertex", idx, t)), (j, ("vertex", idx, t)))
+        else:
+            _, i, j, a, b, t = conflict
+            branches = ((i, ("move", a, b, t)), (j, ("move", b, a, t)))
+
+        for agent, constraint in branches:
+            child_constraints = list(constraints)
+            child_constraints[agent] = constraints[agent] + (constraint,)
+            path, path_cost = replan(agent, child_constraints[agent])
+            if path is None:
+                continue
+            child_paths = list(paths)
+            child_costs = list(costs)
+            child_paths[agent] = path
+            child_costs[agent] = path_cost
+            heapq.heappush(open_set, (total - costs[agent] + path_cost, next(counter),
+                                      child_constraints, child_paths, child_costs))
+    return None
@@ -0,0 +1,326 @@
+import heapq
+import math
+import time
+from array import array
+
+from pathfinder import Grid, MOVES, SQRT2, SearchStats, SparseArray
+
+#-- Busca com vários objetivos (e vários inícios) --
+# Para saber qual de K saídas é a mais próxima, uma única busca basta: todos
+# os inícios entram na fila com g = 0 e a busca para no primeiro objetivo
+# expandido, que é o de menor custo entre todos os pares (início, objetivo).
+#
+# A heurística é a menor distância octile até qualquer objetivo, que continua
+# admissível e consistente. Com muitos objetivos, calculá-la nó a nó custaria
+# O(K); `GoalIndex` agrupa os objetivos em baldes quadrados e visita os
+# baldes em anéis de distância crescente, parando quando nenhum anel restante
+# pode ter um objetivo mais perto. Cada célula calcula a heurística uma vez.
+
+# A partir de quantos objetivos a heurística usa o índice espacial
+MANY_GOALS = 16
+
+def _octile(dr, dc):
+    if dr < 0:
+        dr = -dr
+    if dc < 0:
+        dc = -dc
+    if dr > dc:
+        return (dr - dc) + SQRT2 * dc
+    return (dc - dr) + SQRT2 * dr
+
+def find_starts_and_ends(maze):
+    """
+    Como `find_start_and_end`, mas com todas as células 'S' e 'E'.
+
+    Retorna:
+        tuple: (starts, ends), listas de tuplas (linha, coluna). Um `Grid` só
+               guarda um 'S' e um 'E', então dele vêm no máximo um de cada.
+    """
+    if isinstance(maze, Grid):
+        return ([maze.start] if maze.start is not None else [],
+                [maze.end] if maze.end is not None else [])
+    starts = []
+    ends = []
+    for r, row in enumerate(maze):
+        for c, cell in enumerate(row):
+            if cell == 'S':
+                starts.append((r, c))
+            elif cell == 'E':
+                ends.append((r, c))
+    return starts, ends
+
+class GoalIndex:
+    """
+    Índice espacial de objetivos em baldes de `bucket_size` x `bucket_size`
+    células, para a menor distância octile até qualquer um deles.
+    """
+
+    def __init__(self, goals, bucket_size=None):
+        goals = list(goals)
+        if bucket_size is None:
+            # Por volta de um objetivo por balde na área ocupada por eles
+            rows = max(r for r, _ in goals) - min(r for r, _ in goals) + 1
+            cols = max(c for _, c in goals) - min(c for _, c in goals) + 1
+            bucket_size = max(4, int(math.sqrt(rows * cols / len(goals))))
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        for r, c in goals:
+            self.buckets.setdefault((r // bucket_size, c // bucket_size), []).append((r, c))
+        keys = self.buckets.keys()
+        self._min_br = min(br for br, _ in keys)
+        self._max_br = max(br for br, _ in keys)
+        self._min_bc = min(bc for _, bc in keys)
+        self._max_bc = max(bc for _, bc in keys)
+
+    def nearest(self, r, c):
+        """Retorna (distância octile, objetivo) do objetivo mais próximo de (r, c)."""
+        size = self.bucket_size
+        buckets = self.buckets
+        br = r // size
+        bc = c // size
+        # Anel que ainda pode ter baldes com objetivos
+        last_ring = max(br - self._min_br, self._max_br - br, bc - self._min_bc, self._max_bc - bc)
+        best = float('inf')
+        best_goal = None
+        ring = 0
+        while ring <= last_ring:
+            # Um objetivo no anel k está a pelo menos (k - 1) * size + 1
+            # células de distância em linha ou coluna
+            if ring > 0 and (ring - 1) * size + 1 >= best:
+                break
+            for key in self._ring(br, bc, ring):
+                for goal in buckets.get(key, ()):
+                    distance = _octile(goal[0] - r, goal[1] - c)
+                    if distance < best:
+                        best = distance
+                        best_goal = goal
+            ring += 1
+        return best, best_goal
+
+    @staticmethod
+    def _ring(br, bc, ring):
+        if ring == 0:
+            yield br, bc
+            return
+        for dc in range(-ring, ring + 1):
+            yield br - ring, bc + dc
+            yield br + ring, bc + dc
+        for dr in range(-ring + 1, ring):
+            yield br + dr, bc - ring
+            yield br + dr, bc + ring
+
+class MultiGoalEngine:
+    """
+    A* de vários inícios até o objetivo mais próximo de um conjunto, sobre um
+    `Grid`.
+
+    Depois de `search`, `path()` / `came_from_dict()` trazem o caminho,
+    `reached` o objetivo alcançado, `cost` o custo e `stats` os contadores
+    (`SearchStats`, como no `SearchEngine`).
+    """
+
+    def __init__(self, grid, stats=None):
+        size = grid.rows * grid.cols
+        self.grid = grid
+        self.stats = stats if stats is not None else SearchStats()
+        if getattr(grid, "sparse", False):
+            self.g_score = SparseArray(float('inf'))
+            self.came_from = SparseArray(-1)
+            self.closed = SparseArray(0)
+            self.goal_mask = SparseArray(0)
+            self.estimates = SparseArray(-1.0)
+        else:
+            self.g_score = array("d", [float('inf')]) * size
+            self.came_from = array("i", [-1]) * size
+            self.closed = bytearray(size)
+            self.goal_mask = bytearray(size)
+            # Heurística já calculada de cada célula (-1: ainda não)
+            self.estimates = array("d", [-1.0]) * size
+        self._touched = []
+        self._goals = []
+        self.goal = -1
+        self.reached = None
+        self.cost = float('inf')
+
+    def _reset(self):
+        t0 = time.perf_counter()
+        inf = float('inf')
+        if isinstance(self.g_score, SparseArray):
+            for state in (self.g_score, self.came_from, self.closed, self.goal_mask, self.estimates):
+                state.clear()
+        else:
+            for idx in self._touched:
+                self.g_score[idx] = inf
+                self.came_from[idx] = -1
+                self.closed[idx] = 0
+                self.estimates[idx] = -1.0
+            for idx in self._goals:
+                self.goal_mask[idx] = 0
+        self._touched = []
+        self._goals = []
+        self.goal = -1
+        self.reached = None
+        self.cost = float('inf')
+        self.stats.reset()
+        self.stats.reset_time = time.perf_counter() - t0
+
+    def _estimator(self, goals):
+        """Função (r, c) -> menor distância octile até `goals`."""
+        if len(goals) > MANY_GOALS:
+            nearest = GoalIndex(goals).nearest
+            return lambda r, c: nearest(r, c)[0]
+        if len(goals) == 1:
+            (gr, gc), = goals
+            return lambda r, c: _octile(gr - r, gc - c)
+        return lambda r, c: min(_octile(gr - r, gc - c) for gr, gc in goals)
+
+    def search(self, starts, goals):
+        """
+        Busca do conjunto `starts` até o objetivo mais barato de `goals`.
+
+        Argumentos:
+            starts (list[tuple]): Células de início (todas com custo 0).
+            goals (list[tuple]): Células candidatas a objetivo.
+
+        Retorna:
+            bool: True se algum objetivo foi alcançado.
+        """
+        self._reset()
+        grid = self.grid
+        cols = grid.cols
+        passable = grid.passable
+        starts = [tuple(s) for s in starts if passable[s[0] * cols + s[1]]]
+        goals = [tuple(g) for g in goals if passable[g[0] * cols + g[1]]]
+        if grid.connectivity is not None:
+            # Só interessam objetivos na componente de algum início
+            components = {grid.connectivity.component(s) for s in starts}
+            goals = [g for g in goals if grid.connectivity.component(g) in components]
+        if not starts or not goals:
+            return False
+
+        t0 = time.perf_counter()
+        rows = grid.rows
+        cost = grid.cost
+        g_score = self.g_score
+        came_from = self.came_from
+        closed = self.closed
+        goal_mask = self.goal_mask
+        estimates = self.estimates
+        touched = self._touched
+        stats = self.stats
+        estimate_of = self._estimator(goals)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        for r, c in goals:
+            goal_mask[r * cols + c] = 1
+            self._goals.append(r * cols + c)
+
+        open_set = []
+        for r, c in starts:
+            idx = r * cols + c
+            if g_score[idx] == 0:
+                continue # Início repetido
+            g_score[idx] = 0.0
+            touched.append(idx)
+            estimates[idx] = estimate_of(r, c)
+            open_set.append((estimates[idx], idx))
+        heapq.heapify(open_set)
+        pushes = len(open_set)
+        expansions = 0
+        stale_pops = 0
+        relaxations = 0
+        max_open_set = 0
+
+        while open_set:
+            if len(open_set) > max_open_set:
+                max_open_set = len(open_set)
+            current = heappop(open_set)[1]
+            if closed[current]:
+                stale_pops += 1
+                continue
+            closed[current] = 1
+            expansions += 1
+            if goal_mask[current]:
+                self.goal = current
+                break
+
+            current_g = g_score[current]
+            r, c = divmod(current, cols)
+            for dr, dc, move_cost in MOVES:
+                nr = r + dr
+                nc = c + dc
+                if not (0 <= nr < rows and 0 <= nc < cols):
+                    continue
+                neighbor = nr * cols + nc
+                if not passable[neighbor]:
+                    continue
+                relaxations += 1
+                tentative_g_score = current_g + move_cost * cost[neighbor]
+                if tentative_g_score < g_score[neighbor]:
+                    if g_score[neighbor] == float('inf'):
+                        touched.append(neighbor)
+                    g_score[neighbor] = tentative_g_score
+                    came_from[neighbor] = current
+                    closed[neighbor] = 0
+                    estimate = estimates[neighbor]
+                    if estimate < 0:
+                        estimate = estimates[neighbor] = estimate_of(nr, nc)
+                    heappush(open_set, (tentative_g_score + estimate, neighbor))
+                    pushes += 1
+
+        stats.expansions = expansions
+        stats.pushes = pushes
+        stats.stale_pops = stale_pops
+        stats.relaxations = relaxations
+        stats.max_open_set = max_open_set
+        stats.search_time = time.perf_counter() - t0
+        if self.goal == -1:
+            return False
+        self.reached = divmod(self.goal, cols)
+        self.cost = g_score[self.goal]
+        return True
+
+    def path(self):
+        """Caminho [(linha, coluna), ...] do início usado até `reached`."""
+        if self.goal == -1:
+            return []
+        cols = self.grid.cols
+        path = []
+        idx = self.goal
+        while idx != -1:
+            path.append(divmod(idx, cols))
+            idx = self.came_from[idx]
+        path.reverse()
+        return path
+
+    def came_from_dict(self):
+        """Cadeia {nó: nó_anterior} no formato de `reconstruct_path`."""
+        path = self.path()
+        if not path:
+            return None
+        came_from = {path[0]: None}
+        for prev, node in zip(path, path[1:]):
+            came_from[node] = prev
+        return came_from
+
+def nearest_goal_search(maze, starts=None, goals=None):
+    """
+    Alternativa a `a_star_search` para vários 'S' e 'E': uma só busca até o
+    objetivo mais próximo.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto.
+        starts, goals (list[tuple] | None): Inícios e objetivos; por padrão,
+                                            todas as células 'S' e 'E'.
+
+    Retorna:
+        tuple: (came_from, objetivo alcançado) para `reconstruct_path`, ou
+               (None, None) se nenhum objetivo for alcançável.
+    """
+    found_starts, found_goals = find_starts_and_ends(maze)
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    engine = MultiGoalEngine(grid)
+    if not engine.search(found_starts if starts is None else starts,
+                         found_goals if goals is None else goals):
+        return None, None
+    return engine.came_from_dict(), engine.reached
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from pathfinder import SearchEngine, path_cost
+from pathfinder_anyangle import AnyAngleEngine
+from pathfinder_async import async_search
+from pathfinder_bidirectional import BidirectionalEngine
+from pathfinder_bucket import BucketEngine
+from pathfinder_connectivity import attach_connectivity
+from pathfinder_hpa import HierarchicalGraph
+from pathfinder_ida import IDAStarEngine
+from pathfinder_jps import JumpPointEngine
+from pathfinder_mapfile import MAGIC, convert_text_maze, open_grid
+from pathfinder_tiles import TiledGrid
+
+#-- Servidor de consultas (JSON lines) --
+# Rodar um processo Python por consulta paga a importação, a leitura do
+# labirinto e os índices a cada vez. O servidor carrega o labirinto uma vez,
+# mantém os motores e as estruturas pré-calculadas (índice de conectividade,
+# grafo do HPA*, blocos em cache) vivos entre as consultas e responde a
+# consultas em JSON, uma por linha, lidas da entrada padrão ou de um socket
+# Unix. Nada da interface gráfica é importado.
+#
+# Consulta: {"id": ..., "start": [r, c], "end": [r, c], "engine": "astar",
+#            "max_expansions": N, "budget_ms": T}
+#     Só "id" é ecoado; "start"/"end" têm como padrão o 'S' e o 'E' do
+#     labirinto, "engine" é uma das chaves de ENGINES, e os orçamentos (ver
+#     `pathfinder_async`) só valem para o "astar".
+# Resposta: {"id", "status", "path", "cost", "best_node", "frontier_size",
+#            "stats", "elapsed_ms"}, com status "found", "no_path", "budget"
+#            ou "error" (com a mensagem em "error").
+#
+# As consultas chegam em sequência mas rodam ao mesmo tempo: cada uma vira
+# uma tarefa do asyncio e a resposta sai assim que fica pronta, fora de ordem
+# (use o "id" para casá-las). As buscas do "astar" cedem o loop a cada
+# `every` expansões, então uma consulta cara não segura as baratas. Os demais
+# motores buscam de uma vez e por isso rodam numa thread (`run_in_executor`):
+# um IDA* de segundos divide o interpretador com as outras consultas em vez de
+# parar o loop. Cada consulta usa uma instância do seu motor tirada de um
+# conjunto reaproveitado, então duas buscas nunca dividem o mesmo estado.
+#
+# Com um mundo em blocos (`TiledGrid`) só valem os motores de estado esparso;
+# os de DENSE_ONLY pré-calculam o mundo inteiro e são recusados com um erro.
+
+ENGINES = {
+    "astar": SearchEngine,
+    "jps": JumpPointEngine,
+    "bidirectional": BidirectionalEngine,
+    "bucket": BucketEngine,
+    "hpa": HierarchicalGraph,
+    "ida": IDAStarEngine,
+    "theta": AnyAngleEngine,
+}
+
+# Motores que pré-calculam estruturas do tamanho do mundo (ver `pathfinder_tiles`)
+DENSE_ONLY = frozenset(("jps", "hpa"))
+
+def load_grid(source, max_bytes=64 * 1024 * 1024):
+    """
+    Abre o labirinto do servidor.
+
+    Argumentos:
+        source (str): Diretório de blocos (`pathfinder_tiles`), arquivo
+                      binário (`pathfinder_mapfile`) ou labirinto em texto.
+        max_bytes (int): Limite do cache de blocos, para diretórios.
+
+    Retorna:
+        Grid: O labirinto.
+    """
+    if os.path.isdir(source):
+        return TiledGrid.open(source, max_bytes)
+    with open(source, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    if binary:
+        return open_grid(source)
+    # O texto é convertido para um binário temporário; o mmap continua
+    # válido depois que o arquivo é removido
+    fd, filename = tempfile.mkstemp(suffix=".pfm")
+    os.close(fd)
+    try:
+        try:
+            return convert_text_maze(source, filename)
+        except ValueError:
+            # Custos que não cabem em uint8
+            return convert_text_maze(source, filename, dtype="float32")
+    finally:
+        os.unlink(filename)
+
+class QueryServer:
+    """
+    Responde consultas de caminho sobre um labirinto carregado uma vez.
+
+    Argumentos:
+        grid (Grid): O labirinto.
+        every (int): Expansões do "astar" entre as cessões do loop.
+        max_pending (int): Consultas em andamento por conexão; a leitura
+                           espera quando o limite é atingido.
+
+    `queries` e `errors` contam as consultas respondidas.
+    """
+
+    def __init__(self, grid, every=1000, max_pending=64):
+        self.grid = grid
+        self.every = every
+        self.max_pending = max_pending
+        self.queries = 0
+        self.errors = 0
+        # nome do motor -> instâncias livres
+        self._pools = {}
+
+    def _check_engine(self, name):
+        if name not in ENGINES:
+            raise ValueError(f"Motor desconhecido: {name}")
+        if name in DENSE_ONLY and getattr(self.grid, "sparse", False):
+            raise ValueError(f"O motor {name} não aceita um mundo em blocos (TiledGrid).")
+
+    def engine(self, name):
+        """
+        Cria uma instância do motor `name` e a deixa no conjunto usado pelas
+        consultas (a preparação, como o grafo do HPA*, fica paga de antemão).
+
+        Levanta:
+            ValueError: Se o motor não existir ou não aceitar este labirinto.
+        """
+        self._check_engine(name)
+        engine = ENGINES[name](self.grid)
+        self._release(name, engine)
+        return engine
+
+    def _acquire(self, name):
+        try:
+            return self._pools.get(name, []).pop()
+        except IndexError:
+            return ENGINES[name](self.grid)
+
+    def _release(self, name, engine):
+        self._pools.setdefault(name, []).append(engine)
+
+    def _point(self, query, field, default):
+        point = query.get(field, default)
+        if point is None:
+            raise ValueError(f"Consulta sem '{field}' e labirinto sem ponto padrão.")
+        # bool é subclasse de int, e "12" ou [1.5, 2] não são coordenadas
+        if not isinstance(point, (list, tuple)) or len(point) != 2 or \
+           any(type(v) is not int for v in point):
+            raise ValueError(f"'{field}' deve ser [linha, coluna], com dois inteiros.")
+        r, c = point
+        if not self.grid.in_bounds(r, c):
+            raise ValueError(f"'{field}' {[r, c]} fora do labirinto.")
+        return (r, c)
+
+    async def _astar(self, start, end, max_expansions, deadline):
+        engine = self._acquire("astar")
+        try:
+            return await async_search(engine, start, end, self.every, max_expansions, deadline)
+        finally:
+            self._release("astar", engine)
+
+    def _run(self, name, start, end):
+        # Roda numa thread do executor; o conjunto é uma lista, e pop/append
+        # são atômicos
+        engine = self._acquire(name)
+        try:
+            found = engine.search(start, end)
+            path = engine.path() if found else []
+            stats = getattr(engine, "stats", None)
+            if stats is not None:
+                stats = stats.as_dict()
+            else:
+                stats = {"expansions": engine.expansions, "pushes": getattr(engine, "pushes", None)}
+            # O Theta* devolve pontos de virada, não células vizinhas
+            cost = engine.cost if name == "theta" and found else None
+        finally:
+            self._release(name, engine)
+        return {"status": "found" if found else "no_path", "path": path,
+                "best_node": None, "frontier_size": 0, "stats": stats, "cost": cost}
+
+    async def answer(self, query):
+        """
+        Resposta (dict) a uma consulta já decodificada.
+
+        Levanta:
+            ValueError: Se a consulta for inválida.
+        """
+        grid = self.grid
+        if not isinstance(query, dict):
+            raise ValueError("A consulta deve ser um objeto JSON.")
+        start = self._point(query, "start", grid.start)
+        end = self._point(query, "end", grid.end)
+        name = query.get("engine", "astar")
+        if not isinstance(name, str):
+            raise ValueError("'engine' deve ser o nome de um motor.")
+        self._check_engine(name)
+        max_expansions = query.get("max_expansions")
+        if max_expansions is not None and (type(max_expansions) is not int or max_expansions < 0):
+            raise ValueError("'max_expansions' deve ser um inteiro não negativo.")
+        budget_ms = query.get("budget_ms")
+        if budget_ms is not None and (type(budget_ms) not in (int, float) or
+                                      not 0 <= budget_ms < float('inf')):
+            raise ValueError("'budget_ms' deve ser um número não negativo.")
+        if name != "astar" and (max_expansions is not None or budget_ms is not None):
+            raise ValueError(f"O motor {name} não aceita orçamento; use 'astar'.")
+
+        if not (grid.is_passable(*start) and grid.is_passable(*end)):
+            result = {"status": "no_path", "path": [], "best_node": None,
+                      "frontier_size": 0, "stats": None}
+        elif name == "astar":
+            deadline = None if budget_ms is None else time.perf_counter() + budget_ms / 1000
+            result = await self._astar(start, end, max_expansions, deadline)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self._run, name, start, end)
+        if result.get("cost") is None:
+            result["cost"] = path_cost(grid, result["path"]) if result["status"] == "found" else None
+        return result
+
+    async def handle_line(self, line):
+        """Resposta (linha JSON, sem o '\\n') a uma linha de consulta."""
+        t0 = time.perf_counter()
+        query_id = None
+        try:
+            query = json.loads(line)
+            if isinstance(query, dict):
+                query_id = query.get("id")
+            response = await self.answer(query)
+        except Exception as e:
+            # Consulta inválida (ValueError, inclusive JSON malformado) ou
+            # falha do motor: responde com o erro sem derrubar o servidor
+            self.errors += 1
+            response = {"status": "error", "error": str(e)}
+        self.queries += 1
+        response["id"] = query_id
+        response["elapsed_ms"] = (time.perf_counter() - t0) * 1000
+        return json.dumps(response)
+
+    async def serve_lines(self, readline, write):
+        """
+        Atende uma sequência de consultas.
+
+        Argumentos:
+            readline: Corrotina que retorna a próxima linha (vazia no fim).
+            write (callable): Recebe cada linha de resposta (com '\\n').
+        """
+        pending = set()
+        slots = asyncio.Semaphore(self.max_pending)
+
+        async def respond(line):
+            try:
+                write(await self.handle_line(line) + "\n")
+            finally:
+                slots.release()
+
+        while True:
+            line = await readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            await slots.acquire()
+            task = asyncio.ensure_future(respond(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+    async def serve_stdio(self):
+        """Consultas da entrada padrão, respostas na saída padrão."""
+        loop = asyncio.get_running_loop()
+        stdin = sys.stdin
+        stdout = sys.stdout
+
+        async def readline():
+            # Numa thread: a entrada pode ser um arquivo, que o loop não monitora
+            return await loop.run_in_executor(None, stdin.readline)
+
+        def write(text):
+            stdout.write(text)
+            stdout.flush()
+
+        await self.serve_lines(readline, write)
+
+    async def serve_unix(self, path):
+        """Aceita conexões no socket Unix `path` até o processo ser encerrado."""
+        async def connection(reader, writer):
+            async def readline():
+                return (await reader.readline()).decode()
+
+            try:
+                await self.serve_lines(readline, lambda text: writer.write(text.encode()))
+                await writer.drain()
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(connection, path)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de consultas de caminho em JSON lines.")
+    parser.add_argument("maze", help="Labirinto binário, diretório de blocos ou texto.")
+    parser.add_argument("--socket", help="Atende num socket Unix em vez da entrada padrão.")
+    parser.add_argument("--preload", nargs="+", choices=sorted(ENGINES), default=[],
+                        help="Motores criados antes da primeira consulta (ex.: hpa).")
+    parser.add_argument("--no-connectivity", action="store_true",
+                        help="Não calcula o índice de conectividade na partida.")
+    parser.add_argument("--every", type=int, default=1000)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--tile-cache-mb", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    grid = load_grid(args.maze, args.tile_cache_mb * 1024 * 1024)
+    if not args.no_connectivity and not getattr(grid, "sparse", False):
+        attach_connectivity(grid)
+    server = QueryServer(grid, args.every, args.max_pending)
+    for name in args.preload:
+        try:
+            server.engine(name)
+        except ValueError as e:
+            parser.error(str(e))
+    print(f"{args.maze}: {grid.rows}x{grid.cols} pronto em "
+          f"{time.perf_counter() - t0:.3f}s", file=sys.stderr)
+
+    try:
+        if args.socket:
+            asyncio.run(server.serve_unix(args.socket))
+        else:
+            asyncio.run(server.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.queries} consultas, {server.errors} erros", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from pathfinder import Grid
+from pathfinder_mapfile import open_grid, save_grid
+
+#-- Mundo em blocos com carga sob demanda --
+# Áreas grandes demais para um único `Grid` são divididas em blocos
+# quadrados de `tile_size` x `tile_size` células, cada um num arquivo do
+# formato de `pathfinder_mapfile`. O `TiledGrid` se passa por um `Grid`
+# (mesmos índices planos r * cols + c em `passable` e `cost`), mas cada
+# acesso descobre o bloco da célula e o pede ao `TileCache`, que carrega o
+# arquivo na primeira vez e guarda os blocos mais usados até `max_bytes`,
+# descartando o menos recente (LRU). Blocos sem arquivo valem o terreno
+# padrão do mundo e não ocupam memória.
+#
+# Os motores que respeitam `grid.sparse` (`SearchEngine`, `BucketEngine`,
+# `MultiGoalEngine`, `BidirectionalEngine`, `AnyAngleEngine`) guardam o estado
+# da busca em dicionários em vez de arrays do tamanho do mundo, e o IDA*
+# (`pathfinder_ida`) já tem memória limitada; com eles a memória ocupada
+# cresce com a área visitada e não com o tamanho do mundo. O
+# `JumpPointEngine` e o `HierarchicalGraph` pré-calculam estruturas do mundo
+# inteiro e levantam TypeError com um `TiledGrid`.
+#
+# Diretório de blocos:
+#     tiles.json: {"rows", "cols", "tile_size", "default", "start", "end"}
+#     <linha do bloco>_<coluna do bloco>.pfm: um arquivo por bloco presente,
+#         sempre com tile_size x tile_size células (os da borda são
+#         completados com o terreno padrão)
+
+MANIFEST = "tiles.json"
+
+def _tile_name(tr, tc):
+    return f"{tr}_{tc}.pfm"
+
+def _default_tile(tile_size, default):
+    """Bloco (passable, cost) preenchido com o valor de célula `default`."""
+    cell = Grid(1, 1)
+    cell.set_cell(0, 0, default)
+    size = tile_size * tile_size
+    return bytes(cell.passable) * size, array("f", cell.cost) * size
+
+def _owned(tile):
+    """Copia os planos de um bloco (possivelmente mapeado) para a memória."""
+    cost = tile.cost
+    if isinstance(cost, memoryview):
+        plane = array("f")
+        plane.frombytes(cost.cast("B"))
+        cost = plane
+    return bytes(tile.passable), cost
+
+class DirectoryTileProvider:
+    """
+    Fornece os blocos gravados por `save_tiles` num diretório.
+
+    Argumentos:
+        directory (str): Diretório com `tiles.json` e os arquivos dos blocos.
+
+    Levanta:
+        ValueError: Se o manifesto não descrever um mundo em blocos.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        try:
+            self.rows = manifest["rows"]
+            self.cols = manifest["cols"]
+            self.tile_size = manifest["tile_size"]
+        except KeyError as missing:
+            raise ValueError(f"{MANIFEST} sem o campo {missing}.") from None
+        self.default = manifest.get("default", 0)
+        self.start = tuple(manifest["start"]) if manifest.get("start") else None
+        self.end = tuple(manifest["end"]) if manifest.get("end") else None
+        # Listar o diretório uma vez evita um stat por bloco ausente
+        self._present = set(name for name in os.listdir(directory) if name.endswith(".pfm"))
+
+    def load(self, tr, tc):
+        """
+        Carrega o bloco (tr, tc).
+
+        Retorna:
+            Grid | None: O bloco, ou None se ele não existir (terreno padrão).
+        """
+        name = _tile_name(tr, tc)
+        if name not in self._present:
+            return None
+        tile = open_grid(os.path.join(self.directory, name))
+        if tile.rows != self.tile_size or tile.cols != self.tile_size:
+            raise ValueError(f"O bloco {name} tem {tile.rows}x{tile.cols} células; "
+                             f"esperado {self.tile_size}x{self.tile_size}.")
+        return tile
+
+class TileCache:
+    """
+    Cache LRU de blocos com limite de memória.
+
+    Argumentos:
+        provider: Objeto com `load(tr, tc)` que retorna o bloco como `Grid`
+                  (ou None para um bloco ausente).
+        max_bytes (int): Memória máxima estimada dos blocos residentes. O
+                         bloco em uso fica sempre, mesmo acima do limite.
+
+    Contadores:
+        loads, hits, evictions, absent (int).
+    """
+
+    def __init__(self, provider, max_bytes=64 * 1024 * 1024):
+        self.provider = provider
+        self.max_bytes = max_bytes
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.absent = 0
+        # (tr, tc) -> ((passable, cost), bytes estimados)
+        self._tiles = OrderedDict()
+        self._bytes = 0
+        # Buscas em threads (ver `pathfinder_server`) dividem o cache
+        self._lock = threading.Lock()
+
+    def stats(self):
+        """Contadores e ocupação atual do cache."""
+        return {
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "absent": self.absent,
+            "tiles": len(self._tiles),
+            "bytes": self._bytes,
+        }
+
+    def get(self, key):
+        """
+        Planos (passable, cost) do bloco `key` = (tr, tc), carregando-o se
+        preciso. Retorna None se o bloco não existir.
+        """
+        with self._lock:
+            entry = self._tiles.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._tiles.move_to_end(key)
+                return entry[0]
+            tile = self.provider.load(*key)
+            if tile is None:
+                self.absent += 1
+                return None
+            self.loads += 1
+            planes = _owned(tile)
+            size = sys.getsizeof(planes[0]) + sys.getsizeof(planes[1])
+            self._tiles[key] = (planes, size)
+            self._bytes += size
+            while len(self._tiles) > 1 and self._bytes > self.max_bytes:
+                _, (_, evicted) = self._tiles.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+            return planes
+
+class _TilePlane:
+    """Plano `passable` (layer 0) ou `cost` (layer 1) de um `TiledGrid`."""
+
+    __slots__ = ("world", "layer")
+
+    def __init__(self, world, layer):
+        self.world = world
+        self.layer = layer
+
+    def __len__(self):
+        return self.world.rows * self.world.cols
+
+    def __getitem__(self, idx):
+        world = self.world
+        size = world.tile_size
+        r, c = divmod(idx, world.cols)
+        tr, lr = divmod(r, size)
+        tc, lc = divmod(c, size)
+        # Caminho rápido: células vizinhas quase sempre caem no mesmo bloco. A
+        # tupla é lida de uma vez porque outra thread pode trocar o último bloco
+        last_tr, last_tc, tile = world._last
+        if tr != last_tr or tc != last_tc:
+            tile = world._tile(tr, tc)
+        return tile[self.layer][lr * size + lc]
+
+class TiledGrid(Grid):
+    """
+    `Grid` só de leitura cujas células vêm de blocos carregados sob demanda.
+
+    Argumentos:
+        rows, cols (int): Dimensões do mundo.
+        tile_size (int): Lado dos blocos, em células.
+        provider: Fonte dos blocos (ver `TileCache`).
+        default: Valor de célula dos blocos ausentes (0, 1, 5...).
+        start, end (tuple | None): Coordenadas de 'S' e 'E'.
+        max_bytes (int): Limite de memória do cache de blocos.
+
+    `passable` e `cost` aceitam os mesmos índices planos de um `Grid`, então
+    `in_bounds`, `is_passable`, `terrain_cost`, `cell_value`, `neighbors`,
+    `path_cost` e os motores de busca funcionam sem mudança. `tile_stats()`
+    traz os contadores do cache.
+    """
+
+    __slots__ = ("tile_size", "default", "cache", "_default_tile", "_last")
+
+    # Os motores de busca guardam o estado em dicionários (ver `SparseArray`)
+    sparse = True
+
+    def __init__(self, rows, cols, tile_size, provider, default=0, start=None, end=None,
+                 max_bytes=64 * 1024 * 1024):
+        self.rows = rows
+        self.cols = cols
+        self.tile_size = tile_size
+        self.default = default
+        self.start = start
+        self.end = end
+        self.connectivity = None
+        self.version = 0
+        self.cache = TileCache(provider, max_bytes)
+        self._default_tile = _default_tile(tile_size, default)
+        # (tr, tc, planos) do último bloco acessado
+        self._last = (-1, -1, None)
+        self.passable = _TilePlane(self, 0)
+        self.cost = _TilePlane(self, 1)
+
+    @classmethod
+    def open(cls, directory, max_bytes=64 * 1024 * 1024):
+        """Abre o mundo gravado por `save_tiles` em `directory`."""
+        provider = DirectoryTileProvider(directory)
+        return cls(provider.rows, provider.cols, provider.tile_size, provider,
+                   provider.default, provider.start, provider.end, max_bytes)
+
+    def _tile(self, tr, tc):
+        tile = self.cache.get((tr, tc))
+        if tile is None:
+            tile = self._default_tile
+        self._last = (tr, tc, tile)
+        return tile
+
+    def tile_stats(self):
+        """Contadores do cache de blocos (loads, hits, evictions, absent...)."""
+        return self.cache.stats()
+
+    def set_cell(self, r, c, value):
+        raise TypeError("TiledGrid é só de leitura; edite os blocos com save_tiles.")
+
+    def content_hash(self):
+        raise TypeError("TiledGrid não calcula hash do conteúdo; use o diretório dos blocos.")
+
+def save_tiles(maze, directory, tile_size=256, default=0):
+    """
+    Divide um labirinto em blocos gravados em `directory` (criado se não
+    existir). Blocos só com o terreno padrão não são gravados.
+
+    Argumentos:
+        maze (list[list] | Grid): O labirinto (pode vir de `open_grid`).
+        directory (str): Diretório de saída.
+        tile_size (int): Lado dos blocos, em células.
+        default: Valor de célula dos blocos ausentes e do preenchimento
+                 dos blocos da borda.
+
+    Retorna:
+        int: Número de blocos gravados.
+    """
+    grid = maze if isinstance(maze, Grid) else Grid.from_maze(maze)
+    os.makedirs(directory, exist_ok=True)
+    empty_passable, empty_cost = _default_tile(tile_size, default)
+    empty_cost_bytes = empty_cost.tobytes()
+    rows = grid.rows
+    cols = grid.cols
+    written = 0
+    for tr in range((rows + tile_size - 1) // tile_size):
+        for tc in range((cols + tile_size - 1) // tile_size):
+            tile = Grid(tile_size, tile_size, bytearray(empty_passable), array("f", empty_cost))
+            r0 = tr * tile_size
+            c0 = tc * tile_size
+            width = min(tile_size, cols - c0)
+            for lr in range(min(tile_size, rows - r0)):
+                src = (r0 + lr) * cols + c0
+                dst = lr * tile_size
+                tile.passable[dst:dst + width] = grid.passable[src:src + width]
+                tile.cost[dst:dst + width] = array("f", grid.cost[src:src + width])
+            if tile.passable == empty_passable and tile.cost.tobytes() == empty_cost_bytes:
+                continue
+            save_grid(tile, os.path.join(directory, _tile_name(tr, tc)))
+            written += 1
+    with open(os.path.join(directory, MANIFEST), "w") as f:
+        json.dump({"rows": rows, "cols": cols, "tile_size": tile_size, "default": default,
+                   "start": grid.start, "end": grid.end}, f)
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Divide um labirinto binário em blocos.")
+    parser.add_argument("source", help="Labirinto binário (ver pathfinder_mapfile).")
+    parser.add_argument("output", help="Diretório dos blocos.")
+    parser.add_argument("--tile-size", type=int, default=256)
+    parser.add_argument("--default", type=int, default=0,
+                        help="Valor de célula dos blocos ausentes (padrão: 0, livre).")
+    args = parser.parse_args(argv)
+    grid = open_grid(args.source)
+    written = save_tiles(grid, args.output, args.tile_size, args.default)
+    print(f"{args.output}: {grid.rows}x{grid.cols}, {written} blocos de "
+          f"{args.tile_size}x{args.tile_size} gravados")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Testes de regressão dos motores de busca.
+
+Cada motor ótimo é comparado com `distance_field` (Dijkstra completo) e com
+`a_star_search` em labirintos aleatórios com semente fixa, com paredes e
+terrenos de custo 2 e 5. Também cobre a ida e volta do formato binário
+(`pathfinder_mapfile`) e o `batch_search` sobre um grid mapeado.
+
+Execute com:
+    python -m pytest -q
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from pathfinder import (Grid, SearchEngine, a_star_search, distance_field,
+                        path_cost, reconstruct_path)
+from pathfinder_alt import LandmarkHeuristic
+from pathfinder_batch import batch_search
+from pathfinder_bidirectional import BidirectionalEngine
+from pathfinder_bucket import BucketEngine
+from pathfinder_dstar import IncrementalPlanner
+from pathfinder_flowfield import FlowField
+from pathfinder_jps import JumpPointEngine
+from pathfinder_mapfile import open_grid, save_grid
+from pathfinder_multigoal import MultiGoalEngine
+
+SEED = 2024
+MAZES = 40
+TERRAIN = (0, 0, 0, 0, 1, 1, 2, 5)
+
+#-- Auxiliares --
+def random_maze(rng, rows, cols, terrain=TERRAIN):
+    """
+    Labirinto aleatório (lista de listas) com 'S' e 'E' em células distintas.
+
+    Retorna:
+        tuple: (maze, start, end).
+    """
+    maze = [[rng.choice(terrain) for _ in range(cols)] for _ in range(rows)]
+    cells = rng.sample([(r, c) for r in range(rows) for c in range(cols)], 2)
+    (sr, sc), (er, ec) = cells
+    maze[sr][sc] = 'S'
+    maze[er][ec] = 'E'
+    return maze, cells[0], cells[1]
+
+def random_mazes(seed=SEED, count=MAZES):
+    """Gera `count` labirintos de tamanhos variados a partir de `seed`."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield random_maze(rng, rng.randint(5, 30), rng.randint(5, 30))
+
+def optimal_cost(grid, start, end):
+    """Custo ótimo de `start` até `end` (inf se não houver caminho)."""
+    dist, _ = distance_field(grid, start)
+    return dist[end[0] * grid.cols + end[1]]
+
+class EngineTestCase(unittest.TestCase):
+    """Base com as verificações comuns de caminho e custo."""
+
+    def assertValidPath(self, grid, path, start, end):
+        self.assertEqual(path[0], tuple(start))
+        self.assertEqual(path[-1], tuple(end))
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            self.assertEqual(max(abs(r1 - r2), abs(c1 - c2)), 1)
+            self.assertTrue(grid.is_passable(r2, c2))
+
+    def assertOptimal(self, grid, path, start, end, expected):
+        self.assertValidPath(grid, path, start, end)
+        self.assertAlmostEqual(path_cost(grid, path), expected, places=6)
+
+#-- Motores ótimos --
+class ReferenceTest(EngineTestCase):
+
+    def test_a_star_matches_distance_field(self):
+        for maze, start, end in random_mazes():
+            grid = Grid.from_maze(maze)
+            expected = optimal_cost(grid, start, end)
+            came_from, goal = a_star_search(maze, start, end)
+            if expected == float('inf'):
+                self.assertIsNone(came_from)
+                continue
+            self.assertOptimal(grid, reconstruct_path(came_from, goal), start, end, expected)
+
+class SingleGoalEnginesTest(EngineTestCase):
+    """Motores de um início e um objetivo, com a interface de `SearchEngine`."""
+
+    def check_engine(self, make_engine, **search_kwargs):
+        for maze, start, end in random_mazes():
+            grid = Grid.from_maze(maze)
+            engine = make_engine(grid)
+            expected = optimal_cost(grid, start, end)
+            found = engine.search(start, end, **search_kwargs)
+            self.assertEqual(found, expected != float('inf'))
+            if found:
+                self.assertOptimal(grid, engine.path(), start, end, expected)
+
+    def test_search_engine(self):
+        self.check_engine(SearchEngine)
+
+    def test_jump_point_engine(self):
+        self.check_engine(JumpPointEngine)
+
+    def test_jump_point_engine_after_set_cell(self):
+        rng = random.Random(SEED)
+        for maze, start, end in random_mazes():
+            grid = Grid.from_maze(maze)
+            engine = JumpPointEngine(grid)
+            engine.search(start, end)
+            r, c = rng.randrange(grid.rows), rng.randrange(grid.cols)
+            if (r, c) not in (start, end):
+                grid.set_cell(r, c, rng.choice((0, 1, 5)))
+            expected = optimal_cost(grid, start, end)
+            self.assertEqual(engine.search(start, end), expected != float('inf'))
+            if expected != float('inf'):
+                self.assertOptimal(grid, engine.path(), start, end, expected)
+
+    def test_bidirectional_engine(self):
+        self.check_engine(BidirectionalEngine)
+
+    def test_alt_heuristic(self):
+        for maze, start, end in random_mazes():
+            grid = Grid.from_maze(maze)
+            landmarks = LandmarkHeuristic(grid, k=4)
+            engine = SearchEngine(grid)
+            expected = optimal_cost(grid, start, end)
+            found = engine.search(start, end, h=landmarks.for_goal(end))
+            self.assertEqual(found, expected != float('inf'))
+            if found:
+                self.assertOptimal(grid, engine.path(), start, end, expected)
+
+    def test_bucket_engine(self):
+        # A fila de baldes arredonda os passos: o custo real fica dentro de
+        # `tolerance` do ótimo
+        for maze, start, end in random_mazes():
+            grid = Grid.from_maze(maze)
+            engine = BucketEngine(grid)
+            expected = optimal_cost(grid, start, end)
+            found = engine.search(start, end)
+            self.assertEqual(found, expected != float('inf'))
+            if found:
+                path = engine.path()
+                self.assertValidPath(grid, path, start, end)
+                cost = path_cost(grid, path)
+                self.assertGreaterEqual(cost, expected - 1e-9)
+                self.assertLessEqual(cost, expected * (1 + engine.tolerance) + 1e-9)
+
+class IncrementalPlannerTest(EngineTestCase):
+
+    def test_replans_after_update_cell(self):
+        rng = random.Random(SEED)
+        for maze, start, end in random_mazes():
+            planner = IncrementalPlanner(maze)
+            grid = planner.grid
+            planner.path()
+            for _ in range(3):
+                r, c = rng.randrange(grid.rows), rng.randrange(grid.cols)
+                if (r, c) not in (start, end):
+                    planner.update_cell(r, c, rng.choice((0, 1, 5)))
+                expected = optimal_cost(grid, start, end)
+                path = planner.path()
+                if expected == float('inf'):
+                    self.assertEqual(path, [])
+                else:
+                    self.assertOptimal(grid, path, start, end, expected)
+
+class MultiGoalEngineTest(EngineTestCase):
+
+    def test_reaches_cheapest_goal(self):
+        rng = random.Random(SEED)
+        for maze, start, end in random_mazes():
+            grid = Grid.from_maze(maze)
+            cells = [(r, c) for r in range(grid.rows) for c in range(grid.cols)
+                     if grid.is_passable(r, c) and (r, c) != start]
+            goals = rng.sample(cells, min(4, len(cells)))
+            dist, _ = distance_field(grid, start)
+            expected = min(dist[r * grid.cols + c] for r, c in goals)
+            engine = MultiGoalEngine(grid)
+            found = engine.search([start], goals)
+            self.assertEqual(found, expected != float('inf'))
+            if found:
+                self.assertIn(engine.reached, goals)
+                self.assertOptimal(grid, engine.path(), start, engine.reached, expected)
+
+class FlowFieldTest(EngineTestCase):
+
+    def test_cost_and_path_from_every_cell(self):
+        for maze, start, end in random_mazes(count=10):
+            grid = Grid.from_maze(maze)
+            field = FlowField(grid, end)
+            for r in range(grid.rows):
+                for c in range(grid.cols):
+                    if not grid.is_passable(r, c):
+                        continue
+                    expected = optimal_cost(grid, (r, c), end)
+                    # `dist` é float32
+                    if expected == float('inf'):
+                        self.assertEqual(field.cost_from((r, c)), expected)
+                        self.assertEqual(field.path_from((r, c)), [])
+                        continue
+                    self.assertAlmostEqual(field.cost_from((r, c)), expected, places=3)
+                    self.assertOptimal(grid, field.path_from((r, c)), (r, c), end, expected)
+
+#-- Formato binário --
+class MappedGridTestCase(EngineTestCase):
+    """Base que grava grids num diretório temporário e os abre mapeados."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def round_trip(self, grid, dtype, mode="r"):
+        filename = os.path.join(self.directory.name, f"maze.{dtype}.bin")
+        save_grid(grid, filename, dtype)
+        return open_grid(filename, mode)
+
+    def assertSameGrid(self, mapped, grid):
+        self.assertEqual((mapped.rows, mapped.cols), (grid.rows, grid.cols))
+        self.assertEqual((mapped.start, mapped.end), (grid.start, grid.end))
+        self.assertEqual(bytes(mapped.passable), bytes(grid.passable))
+        self.assertEqual(list(mapped.cost), list(grid.cost))
+
+class MapFileTest(MappedGridTestCase):
+
+    def test_round_trip(self):
+        for dtype in ("uint8", "float32"):
+            with self.subTest(dtype=dtype):
+                for maze, start, end in random_mazes(count=5):
+                    grid = Grid.from_maze(maze)
+                    self.assertSameGrid(self.round_trip(grid, dtype), grid)
+
+    def test_float32_keeps_fractional_costs(self):
+        maze, start, end = random_maze(random.Random(SEED), 12, 12)
+        grid = Grid.from_maze(maze)
+        idx = next(i for i in range(grid.rows * grid.cols)
+                   if grid.passable[i] and divmod(i, grid.cols) not in (start, end))
+        grid.cost[idx] = 1.5
+        self.assertSameGrid(self.round_trip(grid, "float32"), grid)
+        with self.assertRaises(ValueError):
+            self.round_trip(grid, "uint8")
+
+    def test_copy_on_write_set_cell(self):
+        for dtype in ("uint8", "float32"):
+            with self.subTest(dtype=dtype):
+                maze, start, end = random_maze(random.Random(SEED), 10, 10)
+                grid = Grid.from_maze(maze)
+                mapped = self.round_trip(grid, dtype, mode="c")
+                r, c = next((r, c) for r in range(10) for c in range(10)
+                            if (r, c) not in (start, end))
+                mapped.set_cell(r, c, 5)
+                self.assertEqual(mapped.terrain_cost(r, c), 5)
+                self.assertSameGrid(self.round_trip(grid, dtype), grid)
+
+    def test_search_on_mapped_grid(self):
+        for dtype in ("uint8", "float32"):
+            with self.subTest(dtype=dtype):
+                for maze, start, end in random_mazes(count=10):
+                    mapped = self.round_trip(Grid.from_maze(maze), dtype)
+                    expected = optimal_cost(mapped, start, end)
+                    engine = SearchEngine(mapped)
+                    self.assertEqual(engine.search(start, end), expected != float('inf'))
+                    if expected != float('inf'):
+                        self.assertOptimal(mapped, engine.path(), start, end, expected)
+
+#-- Lote --
+class BatchSearchTest(MappedGridTestCase):
+
+    def test_batch_search_on_mapped_grid(self):
+        rng = random.Random(SEED)
+        maze, start, end = random_maze(rng, 30, 30)
+        for dtype in ("uint8", "float32"):
+            with self.subTest(dtype=dtype):
+                mapped = self.round_trip(Grid.from_maze(maze), dtype)
+                cells = [(r, c) for r in range(30) for c in range(30) if mapped.is_passable(r, c)]
+                pairs = [tuple(rng.sample(cells, 2)) for _ in range(40)]
+                costs = batch_search(mapped, pairs, workers=2, chunksize=8, return_paths=False)
+                paths = batch_search(mapped, pairs, workers=2, chunksize=8)
+                for (a, b), cost, path in zip(pairs, costs, paths):
+                    expected = optimal_cost(mapped, a, b)
+                    if expected == float('inf'):
+                        self.assertIsNone(cost)
+                        self.assertIsNone(path)
+                    else:
+                        self.assertAlmostEqual(cost, expected, places=6)
+                        self.assertOptimal(mapped, path, a, b, expected)
+
+if __name__ == "__main__":
+    unittest.main()